@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIView
+
+from .serializers import MeSerializer
+
+User = get_user_model()
+
+
+class AsyncMeView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        user = request.user
+        if user.get_deferred_fields():
+            user = await User.objects.aget(pk=user.pk)
+        return Response(MeSerializer(user).data, status=status.HTTP_200_OK)
@@ -0,0 +1,130 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core.metrics import record_cache_lookup
+
+from .premissions import is_admin_user
+from .tokens import TOKEN_VERSION_CLAIM, check_token_version
+
+User = get_user_model()
+
+# token claims that are enough to authorize most requests without loading the row
+USER_CLAIMS = ("username", "role", "is_staff", "is_superuser")
+
+
+class _UserCache:
+    """
+    Tiny per-process TTL cache of authenticated users (user_id -> User).
+    Entries are dropped on User save/delete (see accounts/signals.py); the
+    TTL bounds staleness for changes made in other worker processes.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self._data = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, user_id):
+        entry = self._data.get(str(user_id))
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._data.pop(str(user_id), None)
+            return None
+        # callers may mutate request.user; never hand out the shared instance
+        return copy.copy(user)
+
+    def set(self, user_id, user, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                self._data.clear()
+            self._data[str(user_id)] = (time.monotonic() + ttl, copy.copy(user))
+
+    def invalidate(self, user_id) -> None:
+        # token claims carry the id as a string, model signals as an int
+        self._data.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+user_cache = _UserCache()
+
+
+def user_from_claims(validated_token):
+    """
+    Build a User instance from token claims without touching the DB.
+    Only the claimed fields are populated; every other field is deferred and
+    loaded lazily on first access. Returns None if the token lacks the claims.
+    """
+    if any(claim not in validated_token for claim in (*USER_CLAIMS, TOKEN_VERSION_CLAIM)):
+        return None
+
+    loaded = {
+        User._meta.pk.attname: User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM]),
+        "is_active": True,
+        "token_version": validated_token[TOKEN_VERSION_CLAIM],
+        **{claim: validated_token[claim] for claim in USER_CLAIMS},
+    }
+    # from_db pairs values with fields positionally, in concrete field order
+    field_names = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [loaded[name] for name in field_names])
+
+
+def get_full_user(user):
+    """
+    Fresh, fully loaded copy of the authenticated user, for endpoints that
+    read or write fields beyond the token claims (e.g. MeView.patch).
+    """
+    return User.objects.get(pk=user.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request `SELECT ... FROM accounts_user`:
+      1. tokens carrying USER_CLAIMS resolve to a claims-backed (deferred) User,
+         after a cached token_version check (role/password/active changes revoke)
+      2. otherwise the user comes from a short-TTL per-worker cache
+      3. cache miss -> the regular simplejwt DB lookup
+    """
+
+    def get_user(self, validated_token):
+        if getattr(settings, "JWT_TRUST_USER_CLAIMS", True):
+            user = user_from_claims(validated_token)
+            if user is not None:
+                check_token_version(validated_token)
+                return user
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        record_cache_lookup("jwt_user", user is not None)
+        if user is not None:
+            return user
+
+        user = super().get_user(validated_token)
+        user_cache.set(user_id, user, getattr(settings, "JWT_USER_CACHE_TTL", 30))
+        return user
+
+
+def request_is_admin(request) -> bool:
+    """Admin check for plain Django views and middleware, where DRF authentication has not run."""
+    # session (Django admin) or bearer token
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return is_admin_user(user)
+    try:
+        auth = CachedJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return bool(auth) and is_admin_user(auth[0])
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from PASSWORD_PBKDF2_ITERATIONS.
+    Keeps the "pbkdf2_sha256" algorithm name, so existing hashes keep verifying
+    and are re-encoded with the configured count on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", None) or PBKDF2PasswordHasher.iterations
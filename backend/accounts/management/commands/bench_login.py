@@ -0,0 +1,55 @@
+import time
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+
+from accounts.views import LoginView
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Measure logins per second on one core with the configured password hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0, help="duration of each scenario")
+
+    def handle(self, *args, **opts):
+        hasher = get_hasher()
+        params = {k: v for k, v in hasher.safe_summary(hasher.encode("x", hasher.salt())).items() if k not in ("hash", "salt")}
+        self.stdout.write(f"hasher: {hasher.algorithm} {params}")
+
+        with transaction.atomic():
+            User.objects.create_user(username="__bench_login__", password="bench-password-123")
+
+            self._run("authenticate() ok", opts["seconds"],
+                      lambda: authenticate(username="__bench_login__", password="bench-password-123"))
+            self._run("authenticate() wrong password", opts["seconds"],
+                      lambda: authenticate(username="__bench_login__", password="nope"))
+            self._run("authenticate() unknown user", opts["seconds"],
+                      lambda: authenticate(username="__no_such_user__", password="nope"))
+
+            # full view, repeated failures from one client: after LOGIN_MAX_FAILURES
+            # attempts the failure guard answers 429 without hashing
+            factory = APIRequestFactory()
+            view = LoginView.as_view(throttle_classes=[])
+
+            def attack():
+                request = factory.post("/api/auth/login", {"username": "__bench_login__", "password": "nope"}, format="json")
+                return view(request)
+
+            self._run("LoginView repeated failures", opts["seconds"], attack)
+            transaction.set_rollback(True)
+
+    def _run(self, label, seconds, fn):
+        n = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            fn()
+            n += 1
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<32} {n / elapsed:>10.1f} /s per core  ({n} in {elapsed:.2f}s)")
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_delete_phoneotp_alter_user_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -16,6 +16,43 @@ class User(AbstractUser):
     phone = models.CharField(max_length=20, unique=True, null=True, blank=True)
     email = models.EmailField(unique=True, null=True, blank=True)   # 👈 ADD THIS
     role = models.CharField(max_length=20, choices=Role.choices, default=Role.USER)
+    # bumped whenever a field baked into issued tokens changes; see accounts/tokens.py
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    # password is tracked through set_password / set_unusable_password instead:
+    # the hash also changes when a login re-encodes it with new hasher settings
+    TOKEN_STATE_FIELDS = ("role", "is_staff", "is_superuser", "is_active")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_state = instance._loaded_token_state()
+        return instance
+
+    def _loaded_token_state(self):
+        return {f: self.__dict__[f] for f in self.TOKEN_STATE_FIELDS if f in self.__dict__}
+
+    def set_unusable_password(self):
+        super().set_unusable_password()
+        self._password_revoked = True
+
+    def _password_changed(self) -> bool:
+        # set_password keeps the raw password in _password until save(); the
+        # hash upgrade in check_password clears it before saving
+        return self._password is not None or self.__dict__.pop("_password_revoked", False)
+
+    def save(self, *args, **kwargs):
+        password_changed = self._password_changed()
+        before = getattr(self, "_token_state", None) or {}
+        if self.pk:
+            after = self._loaded_token_state()
+            if password_changed or any(after[f] != v for f, v in before.items() if f in after):
+                self.token_version += 1
+                update_fields = kwargs.get("update_fields")
+                if update_fields is not None:
+                    kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._token_state = self._loaded_token_state()
 
     def __str__(self):
         return self.phone or self.username
@@ -1,11 +1,30 @@
 from rest_framework.permissions import BasePermission
 
+# All checks below read only role / is_staff / is_superuser. For users resolved
+# by accounts.authentication.CachedJWTAuthentication these come from token
+# claims, so authorizing a request never loads the accounts_user row.
+
+
+def has_role(user, *roles) -> bool:
+    return bool(user and user.is_authenticated and getattr(user, "role", "") in roles)
+
+
+def is_admin_user(user) -> bool:
+    return bool(
+        user
+        and user.is_authenticated
+        and (
+            getattr(user, "role", "") == "admin"
+            or getattr(user, "is_staff", False)
+            or getattr(user, "is_superuser", False)
+        )
+    )
+
+
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and getattr(request.user, "role", "") == "admin")
+        return has_role(request.user, "admin")
 
 class IsStaffOrAdmin(BasePermission):
     def has_permission(self, request, view):
-        return bool(
-            request.user and request.user.is_authenticated and getattr(request.user, "role", "") in {"staff", "admin"}
-        )
+        return has_role(request.user, "staff", "admin")
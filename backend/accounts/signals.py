@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .tokens import forget_token_version, remember_token_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    if "token_version" not in instance.get_deferred_fields():
+        remember_token_version(instance)
+
+
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    forget_token_version(instance.pk)
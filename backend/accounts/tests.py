@@ -1,3 +1,110 @@
-from django.test import TestCase
+import importlib.util
+import os
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from accounts.authentication import user_from_claims
+from accounts.tokens import tokens_for_user
+from core.testing import QueryBudgetMixin, clear_caches
+
+
+class AccountsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = self.make_user("member", phone="09120000000")
+
+    def test_me_uses_one_query(self):
+        client = self.client_for(self.user)
+        queries, response = self.measure(lambda: client.get("/api/me/"))
+        self.assertEqual(response.data["username"], "member")
+        self.assertLessEqual(queries, 1)
+
+    def test_claims_authorize_without_user_query(self):
+        client = self.client_for(self.user)
+        queries, _ = self.measure(lambda: client.get("/api/registered-orders/"))
+        # the order list itself only; no accounts_user lookup for authentication
+        self.assertEqual(queries, 1)
+
+    def test_claims_user_matches_database_user(self):
+        claims_user = user_from_claims(tokens_for_user(self.user).access_token)
+        for field in ("pk", "username", "role", "is_staff", "is_superuser", "is_active", "token_version"):
+            self.assertEqual(getattr(claims_user, field), getattr(self.user, field), field)
+        # non-admin tokens must not pass admin-only endpoints
+        response = self.client_for(self.user).post("/api/import/seasons/", {})
+        self.assertEqual(response.status_code, 403)
+
+    def test_role_change_revokes_tokens(self):
+        client = self.client_for(self.user)
+        self.assertEqual(client.get("/api/me/").status_code, 200)
+        self.user.role = "admin"
+        self.user.save()
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+        self.assertEqual(self.client_for(self.user).get("/api/me/").status_code, 200)
+
+    def test_hash_upgrade_keeps_tokens_and_password_change_revokes(self):
+        client = self.client_for(self.user)
+        old_hash = self.user.password
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            login = self.client_for().post(
+                "/api/auth/login", {"username": "member", "password": "budget-pass-123"}, format="json",
+            )
+        self.assertEqual(login.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old_hash)  # re-encoded with the new iteration count
+        self.assertEqual(client.get("/api/me/").status_code, 200)
+
+        self.user.set_password("another-pass-456")
+        self.user.save()
+        self.assertEqual(client.get("/api/me/").status_code, 401)
+
+    def test_login_and_failure_guard(self):
+        client = self.client_for()
+        ok = client.post("/api/auth/login", {"username": "member", "password": "budget-pass-123"}, format="json")
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(ok.data["role"], "user")
+
+        statuses = [
+            client.post("/api/auth/login", {"username": "member", "password": "wrong"}, format="json").status_code
+            for _ in range(6)
+        ]
+        self.assertEqual(statuses[:5], [401] * 5)
+        self.assertEqual(statuses[5], 429)
+
+    def test_failure_guard_delays_instead_of_locking_out(self):
+        client = self.client_for()
+        login = lambda password, **extra: client.post(
+            "/api/auth/login", {"username": "member", "password": password}, format="json", **extra,
+        )
+        with mock.patch("accounts.throttling.time.time", return_value=1000.0):
+            self.assertEqual([login("wrong").status_code for _ in range(5)], [401] * 5)
+            blocked = login("budget-pass-123")
+            self.assertEqual((blocked.status_code, blocked["Retry-After"]), (429, "1"))
+            # a forged X-Forwarded-For is not a new client (NUM_PROXIES=0)
+            self.assertEqual(login("wrong", HTTP_X_FORWARDED_FOR="10.9.9.9").status_code, 429)
+        with mock.patch("accounts.throttling.time.time", return_value=1001.0):
+            self.assertEqual(login("budget-pass-123").status_code, 200)
+        # success cleared the username and IP counters
+        self.assertEqual(login("wrong").status_code, 401)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN="scrape-token")
+    def test_metrics_need_token_or_admin(self):
+        self.assertEqual(self.client_for().get("/metrics").status_code, 403)
+        self.assertEqual(self.client_for(self.user).get("/metrics").status_code, 403)
+        scraper = self.client_for()
+        scraper.credentials(HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(scraper.get("/metrics").status_code, 200)
+        admin = self.make_user("metrics-admin", phone="09120000001", role="admin")
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.client_for().get("/metrics").status_code, 403)
+            self.assertEqual(self.client_for(admin).get("/metrics").status_code, 200)
+
+
+class SettingsTests(SimpleTestCase):
+    def test_blank_pbkdf2_iterations_means_default(self):
+        # docker-compose passes an empty PASSWORD_PBKDF2_ITERATIONS= from the env file
+        spec = importlib.util.find_spec("core.settings")
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(os.environ, {"PASSWORD_PBKDF2_ITERATIONS": ""}):
+            spec.loader.exec_module(module)
+        self.assertIsNone(module.PASSWORD_PBKDF2_ITERATIONS)
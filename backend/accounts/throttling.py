@@ -0,0 +1,89 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def _throttle_cache():
+    return caches["throttle"] if "throttle" in settings.CACHES else caches["default"]
+
+
+def _login_username(request) -> str:
+    return str(request.data.get("username", "") or "").strip().lower()
+
+
+class LoginIPThrottle(SimpleRateThrottle):
+    """
+    Login attempts per client IP (REST_FRAMEWORK DEFAULT_THROTTLE_RATES["login_ip"]).
+    The IP is REMOTE_ADDR, or the address NUM_PROXIES hops back in
+    X-Forwarded-For when that many trusted proxies sit in front.
+    """
+    scope = "login_ip"
+
+    def __init__(self):
+        self.cache = _throttle_cache()
+        super().__init__()
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginUsernameThrottle(SimpleRateThrottle):
+    """Login attempts per submitted username, regardless of source IP."""
+    scope = "login_username"
+
+    def __init__(self):
+        self.cache = _throttle_cache()
+        super().__init__()
+
+    def get_cache_key(self, request, view):
+        username = _login_username(request)
+        if not username:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": username}
+
+
+class LoginFailureGuard:
+    """
+    Counts failed logins per username and per IP (kept LOGIN_FAILURE_WINDOW
+    seconds after the last failure). Past LOGIN_MAX_FAILURES, each further
+    attempt has to wait 1, 2, 4 ... seconds (capped at LOGIN_FAILURE_MAX_DELAY)
+    after the previous failure; earlier attempts are rejected before
+    authenticate() runs the password hasher. A delay rather than a lockout,
+    so nobody can lock a user (or everyone behind a shared IP) out by
+    failing on purpose. A successful login clears both counters.
+    """
+
+    def __init__(self, request, username: str):
+        self.cache = _throttle_cache()
+        self.window = getattr(settings, "LOGIN_FAILURE_WINDOW", 900)
+        self.max_failures = getattr(settings, "LOGIN_MAX_FAILURES", 5)
+        self.max_delay = getattr(settings, "LOGIN_FAILURE_MAX_DELAY", 60)
+        ident = LoginIPThrottle().get_ident(request)
+        self.keys = [f"login-fail:ip:{ident}"]
+        if username:
+            self.keys.append(f"login-fail:user:{username.strip().lower()}")
+
+    def retry_after(self) -> int:
+        """Seconds to wait before the next attempt (0: go ahead)."""
+        if self.max_failures <= 0:
+            return 0
+        now = time.time()
+        wait = 0.0
+        for failures, last_at in self.cache.get_many(self.keys).values():
+            if failures >= self.max_failures:
+                delay = min(2 ** (failures - self.max_failures), self.max_delay)
+                wait = max(wait, last_at + delay - now)
+        return math.ceil(wait)
+
+    def record_failure(self) -> None:
+        now = time.time()
+        current = self.cache.get_many(self.keys)
+        self.cache.set_many(
+            {key: (current.get(key, (0, 0))[0] + 1, now) for key in self.keys}, self.window,
+        )
+
+    def reset(self) -> None:
+        self.cache.delete_many(self.keys)
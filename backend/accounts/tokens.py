@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.metrics import record_cache_lookup
+
+User = get_user_model()
+
+TOKEN_VERSION_CLAIM = "ver"
+REVOKED = -1  # cached marker for deleted / inactive users
+
+
+def _version_key(user_id) -> str:
+    return f"token-version:{user_id}"
+
+
+def tokens_for_user(user) -> RefreshToken:
+    """
+    RefreshToken carrying the claims that CachedJWTAuthentication needs to
+    authorize requests without loading the user (copied into the access token).
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh["username"] = user.username
+    refresh["role"] = getattr(user, "role", User.Role.USER)
+    refresh["is_staff"] = bool(user.is_staff)
+    refresh["is_superuser"] = bool(user.is_superuser)
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
+    return refresh
+
+
+def current_token_version(user_id) -> int:
+    """Current token_version of a user: one cache read, DB only on a miss."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    record_cache_lookup("token_version", version is not None)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, getattr(settings, "TOKEN_VERSION_CACHE_TTL", 60))
+    return version
+
+
+def remember_token_version(user) -> None:
+    version = user.token_version if user.is_active else REVOKED
+    cache.set(_version_key(user.pk), version, getattr(settings, "TOKEN_VERSION_CACHE_TTL", 60))
+
+
+def forget_token_version(user_id) -> None:
+    cache.set(_version_key(user_id), REVOKED, getattr(settings, "TOKEN_VERSION_CACHE_TTL", 60))
+
+
+def check_token_version(token) -> None:
+    """Reject tokens issued before the user's role / password / active flag changed."""
+    if TOKEN_VERSION_CLAIM not in token:
+        return
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if current_token_version(user_id) != token[TOKEN_VERSION_CLAIM]:
+        raise AuthenticationFailed("Token is no longer valid; please log in again.", code="token_revoked")
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        check_token_version(self.token_class(attrs["refresh"]))
+        return super().validate(attrs)
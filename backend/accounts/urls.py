@@ -1,13 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-
-from .views import RegisterView, LoginView, MeView
+from .views import RegisterView, LoginView, RefreshView, MeView
 
 urlpatterns = [
     path("auth/register", RegisterView.as_view(), name="register"),
     path("auth/login", LoginView.as_view(), name="login"),
 
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/refresh/", RefreshView.as_view(), name="token_refresh"),
 
     path("me/", MeView.as_view(), name="me"),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from core.async_views import route_by_method
+    from .async_views import AsyncMeView
+
+    urlpatterns[-1] = path("me/", route_by_method(AsyncMeView.as_view(), MeView.as_view()), name="me")
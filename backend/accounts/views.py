@@ -1,10 +1,14 @@
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
 
+from .authentication import get_full_user
+from .throttling import LoginFailureGuard, LoginIPThrottle, LoginUsernameThrottle
+from .tokens import VersionedTokenRefreshSerializer, tokens_for_user
 from .serializers import (
     RegisterSerializer,
     LoginSerializer,
@@ -23,7 +27,7 @@ class RegisterView(APIView):
         s.is_valid(raise_exception=True)
         user = s.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
 
         return Response(
             {
@@ -38,6 +42,7 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
 
     def post(self, request):
         s = LoginSerializer(data=request.data)
@@ -46,14 +51,22 @@ class LoginView(APIView):
         username = s.validated_data["username"]
         password = s.validated_data["password"]
 
+        # cheap precheck: repeated failures are rejected before the password hasher runs
+        guard = LoginFailureGuard(request, username)
+        wait = guard.retry_after()
+        if wait:
+            raise Throttled(wait=wait, detail="تعداد تلاش‌های ناموفق زیاد است. لطفاً بعداً دوباره تلاش کنید.")
+
         user = authenticate(request, username=username, password=password)
         if not user:
+            guard.record_failure()
             return Response(
                 {"detail": "نام کاربری یا رمز عبور اشتباه است."},
                 status=status.HTTP_401_UNAUTHORIZED,
             )
+        guard.reset()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens_for_user(user)
 
         return Response(
             {
@@ -65,14 +78,25 @@ class LoginView(APIView):
         )
 
 
+class RefreshView(TokenRefreshView):
+    # refuses refresh tokens issued before a role / password / active change
+    serializer_class = VersionedTokenRefreshSerializer
+
+
 class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        return Response(MeSerializer(request.user).data, status=status.HTTP_200_OK)
+        user = request.user
+        if user.get_deferred_fields():
+            # claims-backed user: one query for the profile instead of one per field
+            user = get_full_user(user)
+        return Response(MeSerializer(user).data, status=status.HTTP_200_OK)
 
     def patch(self, request):
-        serializer = UpdateProfileSerializer(request.user, data=request.data, partial=True)
+        # never write through a cached / claims-backed instance
+        user = get_full_user(request.user)
+        serializer = UpdateProfileSerializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        return Response(MeSerializer(request.user).data, status=status.HTTP_200_OK)
+        return Response(MeSerializer(user).data, status=status.HTTP_200_OK)
@@ -0,0 +1,466 @@
+"""
+End-to-end API benchmark: latency percentiles, throughput and DB query totals
+per scenario, saved as JSON so runs can be compared across commits.
+
+Scenarios:
+  hscode_search      ?search= on names and code prefixes
+  hscode_autocomplete  short code prefixes, page_size=10 (what the search box sends)
+  marketplace_list   public order list with common filter combinations
+  order_create       POST registered-orders/ with --goods goods per order
+  order_update       PUT the orders created above with a new goods list
+  login              POST auth/login
+  import_<model>_<n> seasons / headings / hscodes import with n-row CSVs
+
+Setup (seed once, then benchmark as often as you like):
+
+    cd backend
+    python manage.py migrate
+    python manage.py seed_perf --codes 20000 --orders 20000
+    python benchmarks/api_suite.py                      # starts gunicorn itself
+    python benchmarks/api_suite.py --compare benchmarks/results/<older>.json
+
+The suite creates two accounts (bench_admin / bench_user) directly in the
+database the server uses, so it needs the same DATABASE_URL. Against an
+already running server pass --base-url; DB query totals are then only
+reported if that server has REQUEST_METRICS_ENABLED=1 (they are read from
+the Server-Timing header).
+
+Imports run with dry_run=true unless --import-commit is given, so the seeded
+catalogue stays identical between runs. Only stdlib.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+BENCH_PASSWORD = "bench-pass-123"
+QUERIES_RE = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+SERVER_ENV = {
+    "REQUEST_METRICS_ENABLED": "1",  # Server-Timing header carries the query count
+    "REQUEST_METRICS_LOG_LEVEL": "ERROR",
+    "LOGIN_RATE_IP": "1000000/min",  # the login scenario is not about throttling
+    "LOGIN_RATE_USERNAME": "1000000/min",
+}
+
+
+# ----------------------------
+# Fixtures (run in a child process with Django set up)
+# ----------------------------
+def prepare_child():
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from accounts.models import User
+    from customs.models import HSCode
+
+    for username, staff in (("bench_admin", True), ("bench_user", False)):
+        user, _ = User.objects.get_or_create(username=username, defaults={"email": f"{username}@example.com"})
+        user.is_staff = staff
+        user.role = User.Role.ADMIN if staff else User.Role.USER
+        user.set_password(BENCH_PASSWORD)
+        user.save()
+
+    sample = list(
+        HSCode.objects.order_by("code").values_list("id", "code", "goods_name_fa", "goods_name_en")[:: 97][:200]
+    )
+    print(json.dumps({
+        "hs_codes": [{"id": i, "code": c, "fa": fa, "en": en} for i, c, fa, en in sample],
+        "hscode_total": HSCode.objects.count(),
+    }))
+
+
+def prepare(env):
+    out = subprocess.run(
+        [sys.executable, __file__, "--prepare-child"],
+        env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    data = json.loads(out.stdout.strip().splitlines()[-1])
+    if not data["hs_codes"]:
+        raise SystemExit("no HS codes in the database; run `python manage.py seed_perf` first")
+    return data
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ----------------------------
+# HTTP
+# ----------------------------
+class Client:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.local = threading.local()
+        self.conns = []
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=900)
+            self.conns.append(conn)
+        return conn
+
+    def close(self):
+        for conn in self.conns:
+            conn.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """Returns (status, seconds, queries or None, parsed JSON or None). Keep-alive per thread."""
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            conn = self._conn()
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self.local.conn = None
+                if attempt == 2:
+                    raise
+                continue
+            elapsed = time.perf_counter() - t0
+            match = QUERIES_RE.search(resp.getheader("Server-Timing") or "")
+            try:
+                data = json.loads(raw) if raw else None
+            except ValueError:
+                data = None
+            return resp.status, elapsed, int(match.group(1)) if match else None, data
+
+    def token(self, username):
+        status, _, _, data = self.request("POST", "/api/auth/login", {"username": username, "password": BENCH_PASSWORD})
+        if status != 200:
+            raise SystemExit(f"login as {username} failed ({status}): {data}")
+        return data["access"]
+
+
+def multipart(fields, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n".encode() + content + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+def summarize(name, samples, wall, concurrency):
+    lat_ms = sorted(s[1] * 1000 for s in samples) or [0.0]
+    q = statistics.quantiles(lat_ms, n=100) if len(lat_ms) > 1 else [lat_ms[0]] * 99
+    queries = [s[2] for s in samples if s[2] is not None]
+    errors = [s[0] for s in samples if s[0] >= 400]
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_statuses": sorted(set(errors)),
+        "rps": round(len(samples) / wall, 2) if wall else 0,
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+        "max_ms": round(lat_ms[-1], 2),
+        "db_queries_total": sum(queries) if queries else None,
+        "db_queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def run(client, name, calls, concurrency):
+    """calls: list of zero-arg callables returning client.request(...) tuples."""
+    samples = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for result in pool.map(lambda call: call(), calls):
+            samples.append(result)
+    result = summarize(name, samples, time.perf_counter() - start, concurrency)
+    print(
+        f"{name:<28} {result['requests']:>6} req  {result['rps']:>9} req/s  "
+        f"p50 {result['p50_ms']:>9}  p95 {result['p95_ms']:>9}  p99 {result['p99_ms']:>9} ms  "
+        f"queries/req {result['db_queries_per_request']}  errors {result['errors']}"
+    )
+    return result, samples
+
+
+def read_scenarios(client, fixtures, opts, rng):
+    codes = fixtures["hs_codes"]
+    user_auth = {"Authorization": f"Bearer {client.token('bench_user')}"}
+
+    def get(path, params, headers=None):
+        return lambda: client.request("GET", f"{path}?{urlencode(params)}", headers=headers)
+
+    search_terms = []
+    for c in codes:
+        search_terms += [c["code"][:4], c["fa"].split()[0], c["en"].split()[0]]
+    autocomplete = [c["code"][:n] for c in codes for n in (2, 3, 4, 6)]
+
+    marketplace_params = [
+        {},
+        {"q": rng.choice(codes)["code"][:4]},
+        {"seller_country": "CN"},
+        {"total_value_min": 1000, "total_value_max": 500000},
+        {"hs_code": rng.choice(codes)["code"]},
+        {"terms_of_delivery": "FOB", "partial_shipment": "false"},
+        {"currency_type": "دلار", "means_of_transport": "دریایی"},
+        {"include_expired": "true"},
+        {"date_from": "2025-06-01", "include_expired": "true"},
+    ]
+
+    n = opts.requests
+    yield "hscode_search", [
+        get("/api/hs-codes/", {"search": rng.choice(search_terms)}, user_auth) for _ in range(n)
+    ]
+    yield "hscode_autocomplete", [
+        get("/api/hs-codes/", {"search": rng.choice(autocomplete), "page_size": 10}, user_auth) for _ in range(n)
+    ]
+    yield "marketplace_list", [
+        get("/api/marketplace/orders/", rng.choice(marketplace_params)) for _ in range(n)
+    ]
+
+
+def write_scenarios(client, fixtures, opts, rng, run_id):
+    codes = fixtures["hs_codes"]
+    auth = {"Authorization": f"Bearer {client.token('bench_user')}"}
+
+    def payload(number, n_goods):
+        return {
+            "order_number": number,
+            "freight_price": "150",
+            "currency_type": "USD",
+            "seller_country": "CN",
+            "date": "2026/01/01",
+            "expire_date": "2027/01/01",
+            "terms_of_delivery": "FOB",
+            "terms_of_payment": "LC",
+            "partial_shipment": False,
+            "means_of_transport": "sea",
+            "country_of_origin": "CN",
+            "standard": "ISO",
+            "goods": [
+                {
+                    "description": f"bench line {g}",
+                    "hs_code_id": rng.choice(codes)["id"],
+                    "quantity": str(rng.randint(1, 500)),
+                    "origin": "CN",
+                    "unit_price": f"{rng.randint(100, 100000) / 100:.2f}",
+                    "unit": "U",
+                    "nw_kg": "1.5",
+                    "gw_kg": "1.8",
+                }
+                for g in range(n_goods)
+            ],
+        }
+
+    n = max(1, opts.requests // 4)
+    bodies = [payload(f"bench-{run_id}-{i}", opts.goods) for i in range(n)]
+    created = []
+
+    def create(body):
+        def call():
+            result = client.request("POST", "/api/registered-orders/", body, auth)
+            if result[0] == 201 and result[3]:
+                created.append(result[3]["uuid"])
+            return result
+        return call
+
+    yield "order_create", [create(b) for b in bodies]
+
+    updates = [payload(f"bench-{run_id}-u{i}", opts.goods) for i in range(len(created))]
+    yield "order_update", [
+        (lambda u=u, body=body: client.request("PUT", f"/api/registered-orders/{u}/", body, auth))
+        for u, body in zip(created, updates)
+    ]
+
+    yield "login", [
+        (lambda: client.request("POST", "/api/auth/login", {"username": "bench_user", "password": BENCH_PASSWORD}))
+        for _ in range(n)
+    ]
+
+
+def import_file(model, rows, fixtures, rng):
+    codes = fixtures["hs_codes"]
+    lines = []
+    if model == "seasons":
+        lines.append("code,description")
+        lines += [f"{(i % 97) + 1},فصل {(i % 97) + 1} bench" for i in range(rows)]
+    elif model == "headings":
+        lines.append("code,season_code,description")
+        lines += [f"{(i % 97) + 1:02d}{(i // 97) % 99 + 1:02d},{(i % 97) + 1},سرفصل bench" for i in range(rows)]
+    else:
+        lines.append("code,goods_name_fa,goods_name_en,profit,customs_duty_rate,import_duty_rate,priority,suq")
+        for i in range(rows):
+            # mostly existing codes (update path) plus new ones (insert path)
+            code = codes[i % len(codes)]["code"] if i % 2 else f"{(i % 97) + 1:02d}99{i:06d}"
+            lines.append(f"{code},کالای {i},goods {i},{rng.choice([4, 10, 26])},{rng.randint(0, 55)},{rng.choice([4, 10])},,U")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def import_scenarios(client, fixtures, opts, rng):
+    auth = {"Authorization": f"Bearer {client.token('bench_admin')}"}
+    for model in opts.import_models.split(","):
+        for rows in (int(x) for x in opts.import_sizes.split(",")):
+            content = import_file(model, rows, fixtures, rng)
+            body, headers = multipart({"dry_run": "false" if opts.import_commit else "true"}, f"{model}.csv", content)
+            headers.update(auth)
+            yield f"import_{model}_{rows}", [
+                (lambda body=body, headers=headers: client.request("POST", f"/api/import/{model}/", body, headers))
+                for _ in range(opts.import_repeat)
+            ]
+
+
+# ----------------------------
+# Server / reporting
+# ----------------------------
+def start_server(opts, env):
+    cmd = [
+        sys.executable, "-m", "gunicorn", "core.wsgi:application",
+        "--config", "gunicorn.conf.py",
+        "--bind", f"127.0.0.1:{opts.port}",
+        "--timeout", "900",
+    ]
+    if opts.workers:
+        cmd += ["--workers", str(opts.workers)]
+    server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", opts.port, timeout=2)
+            conn.request("GET", "/api/marketplace/orders/?page_size=1")
+            conn.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.3)
+    server.kill()
+    raise SystemExit("server did not come up")
+
+
+def compare(results, old_path):
+    old = {r["scenario"]: r for r in json.loads(Path(old_path).read_text())["results"]}
+    print(f"\nvs {old_path}")
+    for r in results:
+        o = old.get(r["scenario"])
+        if not o:
+            continue
+
+        def delta(key):
+            return f"{(r[key] - o[key]) / o[key]:+.0%}" if o.get(key) else "n/a"
+
+        print(
+            f"{r['scenario']:<28} p95 {o['p95_ms']:>9} -> {r['p95_ms']:>9} ms ({delta('p95_ms')})  "
+            f"rps {delta('rps')}  queries/req {o['db_queries_per_request']} -> {r['db_queries_per_request']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of starting gunicorn")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--workers", type=int, default=0, help="gunicorn workers (default: gunicorn.conf.py)")
+    parser.add_argument("--scenarios", default="read,write,import", help="comma-separated groups")
+    parser.add_argument("--requests", type=int, default=400, help="requests per read scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--goods", type=int, default=200, help="goods per created / updated order")
+    parser.add_argument("--import-models", default="seasons,headings,hscodes")
+    parser.add_argument("--import-sizes", default="1000,10000,50000")
+    parser.add_argument("--import-repeat", type=int, default=1)
+    parser.add_argument("--import-commit", action="store_true", help="really write imports (default: dry_run)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help=f"JSON results path (default: {RESULTS_DIR.name}/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    parser.add_argument("--prepare-child", action="store_true", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.prepare_child:
+        prepare_child()
+        return
+
+    env = {**os.environ, **SERVER_ENV}
+    fixtures = prepare(env)
+    rng = random.Random(opts.seed)
+    run_id = uuid.uuid4().hex[:8]  # order numbers are unique per user
+
+    server = None if opts.base_url else start_server(opts, env)
+    base_url = opts.base_url or f"http://127.0.0.1:{opts.port}"
+    client = Client(base_url)
+    groups = {g.strip() for g in opts.scenarios.split(",") if g.strip()}
+    results = []
+    try:
+        if "read" in groups:
+            for name, calls in read_scenarios(client, fixtures, opts, rng):
+                results.append(run(client, name, calls, opts.concurrency)[0])
+        if "write" in groups:
+            for name, calls in write_scenarios(client, fixtures, opts, rng, run_id):
+                concurrency = opts.concurrency if name != "login" else min(opts.concurrency, 4)
+                results.append(run(client, name, calls, concurrency)[0])
+        if "import" in groups:
+            for name, calls in import_scenarios(client, fixtures, opts, rng):
+                results.append(run(client, name, calls, 1)[0])
+    finally:
+        client.close()  # gunicorn waits for idle keep-alive connections on shutdown
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "base_url": base_url,
+            "database": os.environ.get("DATABASE_URL", "sqlite").split("@")[-1],
+            "hscode_total": fixtures["hscode_total"],
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "options": {k: v for k, v in vars(opts).items() if k not in ("prepare_child", "compare")},
+        },
+        "results": results,
+    }
+    output = Path(opts.output) if opts.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\nresults written to {output}")
+
+    if opts.compare:
+        compare(results, opts.compare)
+
+
+if __name__ == "__main__":
+    main()
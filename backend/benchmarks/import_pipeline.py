@@ -0,0 +1,131 @@
+"""
+HS code import pipeline throughput, split by stage.
+
+Runs HSCodeImportAPIView's stages in-process on N generated rows (the dicts
+_read_rows would return for a CSV) and reports rows/s per stage and each
+stage's share of the total:
+
+  validation  clean_rows: columnar normalization / checks, season + heading derivation
+  lookup      plan_rows minus validation: bulk SELECTs of existing codes + classification
+  write       apply_plan: bulk_create / bulk_update
+
+Everything runs in one transaction that is rolled back, so the database is
+left as it was (chapters / headings are created inside it when missing).
+
+    cd backend
+    python benchmarks/import_pipeline.py --rows 100000 --existing 0.5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def make_rows(n, existing_codes, existing_ratio, rng):
+    rows = []
+    for i in range(n):
+        if existing_codes and rng.random() < existing_ratio:
+            code = rng.choice(existing_codes)
+        else:
+            code = f"{(i % 97) + 1:02d}{(i // 97) % 99 + 1:02d}{i:06d}"
+        rows.append({
+            "code": code,
+            "goods_name_fa": f"کالای شماره {i}",
+            "goods_name_en": f"goods number {i}",
+            "profit": rng.choice(["4", "10", "15", "26%", "۳۲"]),
+            "customs_duty_rate": rng.choice(["4", "10", "15.0", "", "26"]),
+            "import_duty_rate": rng.choice(["", "4", "10"]),
+            "priority": rng.choice(["", "1", "2", "3"]),
+            "suq": rng.choice(["", "U", "Kg", "L"]),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--existing", type=float, default=0.5, help="share of rows hitting codes already in the table")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    opts = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from django.db import connection, transaction
+
+    from customs.models import Heading, HSCode, Season
+    from customs.views import HSCodeImportAPIView, ImportReport
+
+    class TimedImport(HSCodeImportAPIView):
+        validation_seconds = 0.0
+
+        def clean_batch(self, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return super().clean_batch(*args, **kwargs)
+            finally:
+                self.validation_seconds += time.perf_counter() - t0
+
+    rng = random.Random(opts.seed)
+    with transaction.atomic():
+        for chapter in range(1, 98):
+            season, _ = Season.objects.get_or_create(code=str(chapter))
+            Heading.objects.bulk_create(
+                [Heading(code=f"{chapter:02d}{h:02d}", season=season) for h in range(1, 100)],
+                ignore_conflicts=True,
+            )
+        existing = list(HSCode.objects.values_list("code", flat=True)[:opts.rows])
+        rows = make_rows(opts.rows, existing, opts.existing, rng)
+
+        view = TimedImport()
+        report = ImportReport()
+        t0 = time.perf_counter()
+        plan = view.plan_rows(rows, report)
+        t1 = time.perf_counter()
+        view.apply_plan(plan, report)
+        t2 = time.perf_counter()
+        transaction.set_rollback(True)
+
+    validation = view.validation_seconds
+    lookup = (t1 - t0) - validation
+    write = t2 - t1
+    total = t2 - t0
+    result = {
+        "rows": opts.rows,
+        "vendor": connection.vendor,
+        "created": report.created,
+        "updated": report.updated,
+        "unchanged": report.unchanged,
+        "errors": report.errors,
+        "total_seconds": round(total, 3),
+        "rows_per_second": round(opts.rows / total),
+        "stages": {
+            name: {
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(opts.rows / seconds) if seconds else None,
+                "share": round(seconds / total, 3),
+            }
+            for name, seconds in (("validation", validation), ("lookup", lookup), ("write", write))
+        },
+    }
+
+    print(
+        f"{opts.rows} rows on {connection.vendor}: {result['rows_per_second']} rows/s overall "
+        f"(created {report.created}, updated {report.updated}, unchanged {report.unchanged}, errors {report.errors})"
+    )
+    for name, stage in result["stages"].items():
+        print(f"  {name:<10} {stage['seconds']:>8.3f}s  {stage['rows_per_second'] or '-':>9} rows/s  {stage['share']:>6.1%}")
+    if opts.output:
+        Path(opts.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Sync (WSGI) vs async (ASGI + uvicorn workers) serving, same worker count.
+
+Starts gunicorn in each mode, drives one endpoint with N concurrent clients
+that read responses slowly (mobile-link style), and reports throughput,
+latency percentiles and total RSS of the gunicorn process tree.
+
+    cd backend
+    python manage.py migrate      # with some orders / HS codes loaded
+    python benchmarks/serve_modes.py --path "/api/marketplace/orders/" \\
+        --concurrency 50 --duration 20 --slow-read-kbps 64
+
+Only stdlib; Linux (/proc) for memory figures.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# explicit CLI args override backend/gunicorn.conf.py, which gunicorn loads from the cwd
+MODES = {
+    "wsgi": {
+        "app": "core.wsgi:application",
+        "args": ["--worker-class", "sync", "--threads", "1"],
+        "env": {"DJANGO_ASYNC_VIEWS": "0"},
+    },
+    "gthread": {
+        "app": "core.wsgi:application",
+        "args": ["--worker-class", "gthread", "--threads", "4"],
+        "env": {"DJANGO_ASYNC_VIEWS": "0"},
+    },
+    "asgi": {
+        "app": "core.asgi:application",
+        "args": ["--worker-class", "uvicorn_worker.UvicornWorker"],
+        "env": {"DJANGO_ASYNC_VIEWS": "1"},
+    },
+}
+
+
+def tree_rss_kb(pid: int) -> int:
+    """RSS of pid and its direct children (gunicorn master + workers)."""
+    pids = [pid]
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+        pids += [int(c) for c in children]
+    except OSError:
+        pass
+    total = 0
+    for p in pids:
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+        except OSError:
+            continue
+    return total
+
+
+def wait_until_up(port: int, path: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", path)
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError("server did not come up")
+
+
+def client_loop(port, path, headers, stop_at, slow_read_kbps, latencies, errors):
+    chunk = 4096
+    delay = chunk / (slow_read_kbps * 1024) if slow_read_kbps else 0
+    while time.time() < stop_at:
+        t0 = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            while resp.read(chunk):
+                if delay:
+                    time.sleep(delay)
+            conn.close()
+            if resp.status >= 500:
+                errors.append(resp.status)
+                continue
+        except OSError as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - t0)
+
+
+def run_mode(mode, opts):
+    cfg = MODES[mode]
+    env = {**os.environ, **cfg["env"]}
+    cmd = [
+        sys.executable, "-m", "gunicorn", cfg["app"],
+        "--bind", f"127.0.0.1:{opts.port}",
+        "--workers", str(opts.workers),
+        "--timeout", "120",
+        *cfg["args"],
+    ]
+    server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(opts.port, opts.path)
+        headers = {"Authorization": f"Bearer {opts.token}"} if opts.token else {}
+        latencies, errors, peak_rss = [], [], 0
+        stop_at = time.time() + opts.duration
+        threads = [
+            threading.Thread(
+                target=client_loop,
+                args=(opts.port, opts.path, headers, stop_at, opts.slow_read_kbps, latencies, errors),
+                daemon=True,
+            )
+            for _ in range(opts.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            peak_rss = max(peak_rss, tree_rss_kb(server.pid))
+            time.sleep(0.5)
+
+        lat_ms = sorted(x * 1000 for x in latencies) or [0.0]
+        q = statistics.quantiles(lat_ms, n=100) if len(lat_ms) > 1 else [lat_ms[0]] * 99
+        return {
+            "mode": mode,
+            "workers": opts.workers,
+            "concurrency": opts.concurrency,
+            "requests": len(latencies),
+            "errors": len(errors),
+            "rps": round(len(latencies) / opts.duration, 1),
+            "p50_ms": round(q[49], 1),
+            "p95_ms": round(q[94], 1),
+            "p99_ms": round(q[98], 1),
+            "peak_rss_mb": round(peak_rss / 1024, 1),
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/marketplace/orders/")
+    parser.add_argument("--token", default="", help="JWT access token for authenticated endpoints")
+    parser.add_argument("--modes", default="wsgi,gthread,asgi")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--slow-read-kbps", type=float, default=64, help="0 = read at full speed")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--output", help="write results as JSON")
+    opts = parser.parse_args()
+
+    results = [run_mode(m.strip(), opts) for m in opts.modes.split(",") if m.strip()]
+    for r in results:
+        print(
+            f"{r['mode']:<5} workers={r['workers']} c={r['concurrency']:<4} "
+            f"{r['rps']:>8} req/s  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+            f"p99 {r['p99_ms']:>8} ms  errors {r['errors']:<4} peak RSS {r['peak_rss_mb']} MB"
+        )
+    if opts.output:
+        Path(opts.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+XLSX ingestion: customs.xlsx (streaming iterparse) vs openpyxl read-only.
+
+Generates HS-code-shaped sheets (Persian / English text, codes, rates, blanks)
+once per size under --cache-dir, then times both readers end to end through
+customs.views._read_rows and checks they return identical rows.
+
+    cd backend
+    python benchmarks/xlsx_reader.py --sizes 10000,100000,500000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def build_sheet(path: Path, rows: int, seed: int) -> None:
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("codes")
+    ws.append(["Code", "Goods Name FA", "Goods Name EN", "Profit", "Customs Duty Rate", "Import Duty Rate",
+               "Priority", "SUQ"])
+    for i in range(rows):
+        ws.append([
+            f"{(i % 97) + 1:02d}{(i // 97) % 99 + 1:02d}{i % 10000:04d}",
+            f"کالای شماره {i} " + rng.choice(["پارچه", "فولاد", "چای", "قطعات یدکی"]),
+            f"goods {i} " + rng.choice(["fabric", "steel", "tea", "spare parts"]),
+            rng.choice([4, 10, 15, "26%"]),
+            rng.choice([4, 10, 15.5, None]),
+            rng.choice(["4", "10", None]),
+            rng.choice([1, 2, 3, None]),
+            rng.choice(["U", "Kg", "L", None]),
+        ])
+    wb.save(path)
+
+
+def time_reader(path: Path, reader: str):
+    from customs.views import _read_rows
+
+    with open(path, "rb") as f:  # f.name ends in .xlsx, which _read_rows dispatches on
+        t0 = time.perf_counter()
+        headers, rows = _read_rows(f, reader)
+        return time.perf_counter() - t0, headers, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,500000")
+    parser.add_argument("--cache-dir", default="/tmp/xlsx-bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    opts = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+
+    cache = Path(opts.cache_dir)
+    cache.mkdir(parents=True, exist_ok=True)
+    results = []
+    for size in (int(s) for s in opts.sizes.split(",")):
+        path = cache / f"hscodes-{size}.xlsx"
+        if not path.exists():
+            t0 = time.perf_counter()
+            build_sheet(path, size, opts.seed)
+            print(f"built {path} in {time.perf_counter() - t0:.1f}s")
+
+        timings = {}
+        outputs = {}
+        for reader in ("openpyxl", "fast"):
+            seconds, headers, rows = time_reader(path, reader)
+            timings[reader] = seconds
+            outputs[reader] = (headers, rows)
+        identical = outputs["fast"] == outputs["openpyxl"]
+        result = {
+            "rows": size,
+            "file_mb": round(path.stat().st_size / 2**20, 1),
+            "openpyxl_seconds": round(timings["openpyxl"], 2),
+            "fast_seconds": round(timings["fast"], 2),
+            "openpyxl_rows_per_second": round(size / timings["openpyxl"]),
+            "fast_rows_per_second": round(size / timings["fast"]),
+            "speedup": round(timings["openpyxl"] / timings["fast"], 2),
+            "identical": identical,
+        }
+        results.append(result)
+        print(
+            f"{size:>8} rows ({result['file_mb']} MB): openpyxl {result['openpyxl_seconds']:>7}s "
+            f"fast {result['fast_seconds']:>7}s  x{result['speedup']}  identical={identical}"
+        )
+
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    if opts.output:
+        Path(opts.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
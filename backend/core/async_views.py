@@ -0,0 +1,55 @@
+"""
+Async building blocks for the read-heavy endpoints served under ASGI
+(DJANGO_ASYNC_VIEWS=1, see entrypoint.sh).
+
+DRF's APIView.dispatch is synchronous, so AsyncAPIView re-implements it as a
+coroutine: authentication / permissions / throttles run through
+sync_to_async (they may hit the DB on a cache miss), handlers are
+`async def` and use the async ORM, rendering stays in DRF.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def route_by_method(async_view, sync_view, async_methods=("GET", "HEAD")):
+    """
+    One URL, two implementations: reads go to the async view, everything else
+    (writes, OPTIONS) to the existing sync view.
+    """
+    sync_handler = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in async_methods:
+            return await async_view(request, *args, **kwargs)
+        return await sync_handler(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,65 @@
+"""
+Order dates as users type them: "1404/10/11" (Jalali) or "2026/01/01" /
+"2026-01-01" (Gregorian), Persian or Arabic digits allowed.
+
+Years below JALALI_YEAR_LIMIT are read as Jalali and converted; everything
+is stored as a Gregorian date.
+"""
+import re
+from datetime import date
+
+JALALI_YEAR_LIMIT = 1700
+
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+_DATE = re.compile(r"(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})")
+
+
+def _jalali_days(jy: int, jm: int, jd: int) -> int:
+    jy += 1595
+    days = -355668 + 365 * jy + (jy // 33) * 8 + ((jy % 33) + 3) // 4 + jd
+    return days + ((jm - 1) * 31 if jm < 7 else (jm - 7) * 30 + 186)
+
+
+# _jalali_days -> proleptic Gregorian ordinal (1404/01/01 is 2025-03-21)
+_JALALI_ORDINAL_OFFSET = date(2025, 3, 21).toordinal() - _jalali_days(1404, 1, 1)
+
+
+def to_jalali(value: date):
+    """(year, month, day) in the Jalali calendar."""
+    gy, gm, gd = value.year, value.month, value.day
+    gy2 = gy + 1 if gm > 2 else gy
+    month_days = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+    days = (
+        355666 + 365 * gy + (gy2 + 3) // 4 - (gy2 + 99) // 100 + (gy2 + 399) // 400
+        + gd + month_days[gm - 1]
+    )
+    jy = -1595 + 33 * (days // 12053)
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jy, 1 + days // 31, 1 + days % 31
+    return jy, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def from_jalali(jy: int, jm: int, jd: int) -> date:
+    if not (1 <= jm <= 12 and 1 <= jd <= (31 if jm < 7 else 30)):
+        raise ValueError(f"invalid Jalali date {jy}/{jm}/{jd}")
+    value = date.fromordinal(_jalali_days(jy, jm, jd) + _JALALI_ORDINAL_OFFSET)
+    if to_jalali(value) != (jy, jm, jd):  # 30 Esfand of a common year
+        raise ValueError(f"invalid Jalali date {jy}/{jm}/{jd}")
+    return value
+
+
+def parse_date(text: str) -> date:
+    """A Gregorian date from Jalali / Gregorian YYYY/MM/DD text; ValueError if it is not one."""
+    match = _DATE.fullmatch(str(text).strip().translate(_DIGITS))
+    if match is None:
+        raise ValueError(f"not a YYYY/MM/DD date: {text!r}")
+    y, m, d = (int(part) for part in match.groups())
+    if y < JALALI_YEAR_LIMIT:
+        return from_jalali(y, m, d)
+    return date(y, m, d)
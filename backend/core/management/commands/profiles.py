@@ -0,0 +1,112 @@
+import io
+import json
+import pstats
+import statistics
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import INDEX_FILE, profile_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize profiles written by core.profiling.ProfilingMiddleware: slowest routes, "
+        "slowest single profiles, or the hot functions of one profile (--show)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="rows per table")
+        parser.add_argument("--since", type=float, default=0, help="only profiles from the last N hours")
+        parser.add_argument("--route", help="only this route (substring match)")
+        parser.add_argument("--show", metavar="FILE", help="print the hottest functions / stacks of one profile")
+        parser.add_argument("--sort", default="cumulative", help="pstats sort key for --show (cumulative, tottime, ...)")
+        parser.add_argument("--prune", type=float, metavar="DAYS", help="delete profiles older than DAYS")
+
+    def handle(self, *args, **opts):
+        directory = profile_dir()
+        if opts["show"]:
+            return self.show(directory / opts["show"], opts)
+
+        records = self.load(directory)
+        if opts["prune"] is not None:
+            return self.prune(directory, records, opts["prune"])
+        if opts["since"]:
+            cutoff = time.time() - opts["since"] * 3600
+            records = [r for r in records if r["ts"] >= cutoff]
+        if opts["route"]:
+            records = [r for r in records if opts["route"] in r["route"]]
+        if not records:
+            self.stdout.write(f"no profiles in {directory}")
+            return
+
+        by_route = defaultdict(list)
+        for r in records:
+            by_route[(r["method"], r["route"])].append(r)
+
+        rows = []
+        for (method, route), items in by_route.items():
+            ms = sorted(r["ms"] for r in items)
+            slowest = max(items, key=lambda r: r["ms"])
+            rows.append((statistics.median(ms), method, route, len(ms), ms[-1], slowest["file"]))
+        rows.sort(reverse=True)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Slowest routes ({len(records)} profiles in {directory})"))
+        self.stdout.write(f"{'median ms':>10} {'max ms':>10} {'n':>5}  route")
+        for median, method, route, n, worst, file in rows[:opts["top"]]:
+            self.stdout.write(f"{median:>10.1f} {worst:>10.1f} {n:>5}  {method} {route}")
+            self.stdout.write(f"{'':>28}slowest: {file}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest profiles"))
+        for r in sorted(records, key=lambda r: r["ms"], reverse=True)[:opts["top"]]:
+            self.stdout.write(f"{r['ms']:>10.1f} ms  {r['status']}  {r['trigger']:<11} {r['file']}")
+
+    def load(self, directory):
+        index = directory / INDEX_FILE
+        if not index.exists():
+            return []
+        records = []
+        with open(index, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from a killed worker
+        return [r for r in records if (directory / r["file"]).exists()]
+
+    def show(self, path, opts):
+        if not path.exists():
+            raise CommandError(f"{path} not found")
+        if path.suffix == ".prof":
+            out = io.StringIO()
+            stats = pstats.Stats(str(path), stream=out)
+            stats.strip_dirs().sort_stats(opts["sort"]).print_stats(opts["top"])
+            self.stdout.write(out.getvalue())
+            return
+
+        stacks = []
+        for line in path.read_text().splitlines():
+            stack, _, count = line.rpartition(" ")
+            stacks.append((int(count), stack))
+        total = sum(c for c, _ in stacks) or 1
+        # self time: the leaf frame of each sampled stack
+        leaves = defaultdict(int)
+        for count, stack in stacks:
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        self.stdout.write(f"{total} samples")
+        for frame, count in sorted(leaves.items(), key=lambda x: x[1], reverse=True)[:opts["top"]]:
+            self.stdout.write(f"{count / total:>7.1%}  {frame}")
+
+    def prune(self, directory, records, days):
+        cutoff = time.time() - days * 86400
+        keep, removed = [], 0
+        for r in records:
+            if r["ts"] < cutoff:
+                (directory / r["file"]).unlink(missing_ok=True)
+                removed += 1
+            else:
+                keep.append(r)
+        with open(directory / INDEX_FILE, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in keep)
+        self.stdout.write(self.style.SUCCESS(f"removed {removed} profiles, kept {len(keep)}"))
@@ -0,0 +1,120 @@
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slow_queries import log_file
+
+SORT_KEYS = ("total", "count", "p95", "max")
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the slow-query log (core.slow_queries) per SQL fingerprint, "
+        "or show one fingerprint with its views, stacks, parameters and captured plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--since", type=float, default=0, help="only entries from the last N hours")
+        parser.add_argument("--sort", choices=SORT_KEYS, default="total")
+        parser.add_argument("--view", help="only queries issued by this view / route (substring match)")
+        parser.add_argument("--show", metavar="FINGERPRINT", help="details of one fingerprint")
+        parser.add_argument("--json", action="store_true", help="machine-readable output")
+        parser.add_argument("--clear", action="store_true", help="truncate the log")
+
+    def handle(self, *args, **opts):
+        path = log_file()
+        if opts["clear"]:
+            path.write_text("")
+            self.stdout.write(self.style.SUCCESS(f"cleared {path}"))
+            return
+
+        entries = self.load(path, opts)
+        if opts["show"]:
+            return self.show([e for e in entries if e["fingerprint"].startswith(opts["show"])], opts)
+        if not entries:
+            self.stdout.write(f"no slow queries in {path}")
+            return
+
+        groups = defaultdict(list)
+        for e in entries:
+            groups[e["fingerprint"]].append(e)
+
+        rows = []
+        for key, items in groups.items():
+            ms = sorted(e["ms"] for e in items)
+            rows.append({
+                "fingerprint": key,
+                "count": len(ms),
+                "total": round(sum(ms), 1),
+                "p95": round(ms[int(0.95 * (len(ms) - 1))], 1),
+                "max": ms[-1],
+                "views": Counter(e.get("view") or "?" for e in items).most_common(3),
+                "has_plan": any("plan" in e for e in items),
+                "sql": items[-1]["sql"],
+            })
+        rows.sort(key=lambda r: r[opts["sort"]], reverse=True)
+        rows = rows[:opts["top"]]
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(rows, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{len(entries)} slow queries, {len(groups)} fingerprints ({path})"))
+        self.stdout.write(f"{'fingerprint':<13}{'n':>6}{'total ms':>11}{'p95 ms':>9}{'max ms':>9}  plan  views")
+        for r in rows:
+            views = ", ".join(f"{v} ({n})" for v, n in r["views"])
+            self.stdout.write(
+                f"{r['fingerprint']:<13}{r['count']:>6}{r['total']:>11.1f}{r['p95']:>9.1f}{r['max']:>9.1f}"
+                f"  {'yes' if r['has_plan'] else '-':<4}  {views}"
+            )
+            self.stdout.write(f"             {r['sql'][:160]}")
+
+    def load(self, path, opts):
+        if not path.exists():
+            return []
+        cutoff = time.time() - opts["since"] * 3600 if opts["since"] else 0
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                if e["ts"] < cutoff:
+                    continue
+                if opts["view"] and opts["view"] not in f"{e.get('view')} {e.get('route')}":
+                    continue
+                entries.append(e)
+        return entries
+
+    def show(self, items, opts):
+        if not items:
+            raise CommandError(f"no entries for fingerprint {opts['show']}")
+        if len({e["fingerprint"] for e in items}) > 1:
+            raise CommandError("prefix matches several fingerprints; give more characters")
+        ms = [e["ms"] for e in items]
+        slowest = max(items, key=lambda e: e["ms"])
+        with_plan = [e for e in items if "plan" in e]
+
+        if opts["json"]:
+            self.stdout.write(json.dumps({"slowest": slowest, "latest_plan": with_plan[-1] if with_plan else None},
+                                         ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{items[0]['fingerprint']}: {len(ms)} x, "
+                                                     f"median {statistics.median(ms):.1f} ms, max {max(ms):.1f} ms"))
+        self.stdout.write(slowest["sql"])
+        self.stdout.write(self.style.MIGRATE_HEADING("\nViews"))
+        for view, n in Counter(f"{e.get('method', '')} {e.get('view') or '?'}" for e in items).most_common():
+            self.stdout.write(f"{n:>6}  {view}")
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest call"))
+        self.stdout.write(f"params: {slowest.get('params')}")
+        for frame in slowest.get("stack", []):
+            self.stdout.write(f"  {frame}")
+        if with_plan:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nPlan ({with_plan[-1]['ms']} ms run)"))
+            self.stdout.write(json.dumps(with_plan[-1]["plan"], ensure_ascii=False, indent=2))
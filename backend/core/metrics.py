@@ -0,0 +1,137 @@
+"""
+Prometheus metrics (exposed at /metrics when METRICS_ENABLED).
+
+Works across gunicorn worker processes through prometheus_client's
+multiprocess mode: set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does this
+and wipes the directory on start), and each worker writes its samples there;
+/metrics aggregates all of them, whichever worker serves the scrape.
+Scrapes need METRICS_TOKEN as a bearer token, or an admin session / JWT.
+
+The record_* helpers are no-ops when metrics are disabled.
+"""
+import hmac
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "psycopg pool state per worker (pool_size, pool_available, requests_waiting)",
+    ["state"], multiprocess_mode="livesum",
+)
+IMPORT_ROWS = Counter(
+    "import_rows_total", "Imported rows by outcome", ["model", "outcome", "dry_run"],
+)
+IMPORT_DURATION = Histogram(
+    "import_duration_seconds", "Wall time of an import request", ["model", "dry_run"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+IMPORT_ROWS_PER_SECOND = Gauge(
+    "import_rows_per_second", "Throughput of the most recent import", ["model", "dry_run"],
+    multiprocess_mode="mostrecent",
+)
+ORDER_VERIFICATIONS = Counter(
+    "order_verifications_total", "Verify-endpoint actions", ["verified"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Application cache lookups", ["cache", "result"],
+)
+
+
+def enabled() -> bool:
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+def record_import(model: str, report, total_rows: int, seconds: float, dry_run: bool) -> None:
+    if not enabled():
+        return
+    flag = "true" if dry_run else "false"
+    for outcome in ("created", "updated", "unchanged", "skipped", "errors"):
+        value = getattr(report, outcome, 0)
+        if value:
+            IMPORT_ROWS.labels(model, outcome, flag).inc(value)
+    IMPORT_DURATION.labels(model, flag).observe(seconds)
+    if seconds > 0:
+        IMPORT_ROWS_PER_SECOND.labels(model, flag).set(total_rows / seconds)
+
+
+def record_verification(verified: bool) -> None:
+    if enabled():
+        ORDER_VERIFICATIONS.labels("true" if verified else "false").inc()
+
+
+def record_cache_lookup(cache_name: str, hit: bool) -> None:
+    if enabled():
+        CACHE_LOOKUPS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def _update_pool_gauges() -> None:
+    pool = getattr(connection, "pool", None)
+    if not pool:
+        return
+    stats = pool.get_stats()
+    for state in ("pool_size", "pool_available", "requests_waiting"):
+        DB_POOL_CONNECTIONS.labels(state).set(stats.get(state, 0))
+
+
+class PrometheusMiddleware:
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        match = getattr(request, "resolver_match", None)
+        # route template, not the raw path, to keep label cardinality bounded
+        route = match.route if match else "<unmatched>"
+        REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - t0)
+        _update_pool_gauges()
+        return response
+
+
+def metrics_view(request):
+    if not enabled():
+        return HttpResponse(status=404)
+    token = getattr(settings, "METRICS_TOKEN", "")
+    authorization = request.headers.get("Authorization", "")
+    if not (token and hmac.compare_digest(authorization, f"Bearer {token}")):
+        # imported here: accounts.authentication imports this module
+        from accounts.authentication import request_is_admin
+
+        if not request_is_admin(request):
+            return HttpResponseForbidden()
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,114 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger("core.metrics")
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_seconds", "render_seconds", "started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: count + time every query of this request
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - t0
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-request DB query count, DB time, render (serialization) time and
+    response size, emitted as a Server-Timing header and one JSON log line
+    on the "core.metrics" logger. Requests over REQUEST_METRICS_QUERY_BUDGET
+    queries or REQUEST_METRICS_LATENCY_BUDGET_MS are logged as warnings.
+
+    Enabled with REQUEST_METRICS_ENABLED. Counting uses
+    connection.execute_wrapper (no DEBUG query log), so it is cheap enough to
+    keep on in production. Queries issued from sync_to_async threads (async
+    views) run on another connection and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.query_budget = getattr(settings, "REQUEST_METRICS_QUERY_BUDGET", 20)
+        self.latency_budget_ms = getattr(settings, "REQUEST_METRICS_LATENCY_BUDGET_MS", 500)
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", True)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        with connection.execute_wrapper(metrics):
+            response = self.get_response(request)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Response is rendered (JSON-encoded) after the view returns; time it
+        metrics = getattr(request, "metrics", None)
+        if metrics is not None:
+            render = response.render
+
+            def timed_render():
+                t0 = time.perf_counter()
+                try:
+                    return render()
+                finally:
+                    metrics.render_seconds += time.perf_counter() - t0
+
+            response.render = timed_render
+        return response
+
+    def finish(self, request, response, metrics: RequestMetrics) -> None:
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        db_ms = metrics.db_seconds * 1000
+        render_ms = metrics.render_seconds * 1000
+        size = len(response.content) if not getattr(response, "streaming", False) else None
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else None
+
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={db_ms:.1f};desc="{metrics.queries} queries"',
+                f"render;dur={render_ms:.1f}",
+                f"app;dur={max(total_ms - db_ms - render_ms, 0):.1f}",
+                f"total;dur={total_ms:.1f}",
+            ])
+
+        over_budget = []
+        if self.query_budget and metrics.queries > self.query_budget:
+            over_budget.append("queries")
+        if self.latency_budget_ms and total_ms > self.latency_budget_ms:
+            over_budget.append("latency")
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(db_ms, 2),
+            "render_ms": round(render_ms, 2),
+            "total_ms": round(total_ms, 2),
+            "bytes": size,
+        }
+        if over_budget:
+            record["over_budget"] = over_budget
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
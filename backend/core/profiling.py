@@ -0,0 +1,179 @@
+"""
+Opt-in per-request profiling (PROFILING_ENABLED=1).
+
+A request is profiled when
+  - an admin sends `X-Profile: 1` (or `?_profile=1`); `sample` instead of `1`
+    selects the sampling profiler, or
+  - it falls into PROFILING_SAMPLE_RATE percent of all requests (cProfile).
+
+Profiles land in PROFILING_DIR:
+  - cProfile:  <stamp>-<route>.prof    (pstats format: snakeviz, gprof2dot, `python -m pstats`)
+  - sampling:  <stamp>-<route>.folded  (collapsed stacks: speedscope, flamegraph.pl)
+plus one line per profile in index.jsonl, which `manage.py profiles` summarizes.
+
+Admin-triggered responses carry an X-Profile-File header with the file name.
+Under ASGI only the sync part of the request (the thread running this
+middleware) is visible to the profiler.
+
+One cProfile runs per process at a time: on Python 3.12+ it hooks the
+process-wide sys.monitoring, so a second one cannot start and a profile taken
+under gthread also records the other threads' calls. While it is busy, admin
+requests get the sampling profiler instead and sampled requests are skipped.
+"""
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from accounts.authentication import request_is_admin
+
+INDEX_FILE = "index.jsonl"
+TRUTHY = {"1", "true", "yes", "cprofile"}
+
+_cprofile_lock = threading.Lock()
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, "PROFILING_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: Path):
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+def start_cprofile():
+    """An enabled cProfile.Profile holding _cprofile_lock, or None if a profiler is already active."""
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # "Another profiling tool is already active" (debugger, coverage, ...)
+        _cprofile_lock.release()
+        return None
+    return profiler
+
+
+def stop_cprofile(profiler):
+    try:
+        profiler.disable()
+    finally:
+        _cprofile_lock.release()
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.interval = getattr(settings, "PROFILING_SAMPLE_INTERVAL_MS", 5) / 1000
+        self.directory = profile_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def requested_mode(self, request) -> str | None:
+        flag = (request.headers.get("X-Profile") or request.GET.get("_profile") or "").lower()
+        if not flag:
+            return None
+        mode = "sample" if flag == "sample" else "cprofile" if flag in TRUTHY else None
+        if mode and request_is_admin(request):
+            return mode
+        return None
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        trigger = "admin" if mode else None
+        if mode is None and self.sample_rate and random.random() * 100 < self.sample_rate:
+            mode, trigger = "cprofile", "sample-rate"
+        if mode is None:
+            return self.get_response(request)
+
+        profiler = sampler = None
+        if mode == "cprofile":
+            profiler = start_cprofile()
+            if profiler is None:
+                if trigger != "admin":
+                    return self.get_response(request)
+                mode = "sample"
+        if mode == "sample":
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if profiler is not None:
+                stop_cprofile(profiler)
+            if sampler is not None:
+                sampler.stop()
+
+        name = self.write(request, response, mode, trigger, elapsed_ms, profiler, sampler)
+        if trigger == "admin":
+            response["X-Profile-File"] = name
+        return response
+
+    def write(self, request, response, mode, trigger, elapsed_ms, profiler, sampler) -> str:
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match else request.path
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:60] or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}-{os.getpid()}-{int(elapsed_ms)}ms-{request.method}-{slug}"
+        name += ".prof" if profiler is not None else ".folded"
+        if profiler is not None:
+            profiler.dump_stats(str(self.directory / name))
+        else:
+            sampler.dump(self.directory / name)
+
+        record = {
+            "file": name,
+            "mode": mode,
+            "trigger": trigger,
+            "method": request.method,
+            "route": route,
+            "path": request.path,
+            "status": response.status_code,
+            "ms": round(elapsed_ms, 2),
+            "ts": time.time(),
+        }
+        # one short O_APPEND write per line; safe across gunicorn workers
+        with open(self.directory / INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return name
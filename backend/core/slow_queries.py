@@ -0,0 +1,184 @@
+"""
+Slow-query log (SLOW_QUERY_ENABLED=1).
+
+Every query over SLOW_QUERY_THRESHOLD_MS is appended as one JSON line to
+SLOW_QUERY_LOG_FILE (and logged on the "core.slow_queries" logger) with:
+  - a fingerprint: the SQL with literals / parameter lists normalized, so
+    `code IN (%s, %s)` and `code IN (%s, %s, %s)` aggregate together
+  - parameters (SLOW_QUERY_LOG_PARAMS, off by default: they may hold user
+    data), the view / route and the app frames of the call stack
+  - on PostgreSQL, for a sample of slow fingerprints, the plan:
+    EXPLAIN (ANALYZE, BUFFERS) for plain SELECTs, plain EXPLAIN for everything
+    else - ANALYZE would run writes, including data-modifying CTEs
+    (WITH ... UPDATE), a second time. At most once per fingerprint per
+    SLOW_QUERY_EXPLAIN_INTERVAL seconds and worker.
+
+`python manage.py slow_queries` aggregates the file per fingerprint.
+Outside requests (management commands) wrap work in `slow_query_log()`.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger("core.slow_queries")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_VALUES = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> tuple[str, str]:
+    """(normalized SQL, short hash) - literals -> ?, IN/VALUES lists collapsed."""
+    text = _STRING.sub("?", sql)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(...)", text)
+    text = _VALUES.sub(r"\1", text)
+    text = _SPACE.sub(" ", text).strip()
+    return text, hashlib.md5(text.encode()).hexdigest()[:12]
+
+
+def log_file() -> Path:
+    return Path(getattr(settings, "SLOW_QUERY_LOG_FILE", Path(settings.BASE_DIR) / "slow_queries.jsonl"))
+
+
+def _app_stack(limit: int = 8) -> list[str]:
+    """Project frames of the current stack; library frames if the query came from DRF / django-filter."""
+    base = str(settings.BASE_DIR)
+    stack = [
+        f for f in traceback.extract_stack()
+        if not f.filename.endswith("slow_queries.py") and f"{Path('django', 'db')}" not in f.filename
+    ]
+    app = [f for f in stack if f.filename.startswith(base) and "site-packages" not in f.filename]
+    frames = app or stack
+    return [f"{Path(f.filename).name}:{f.lineno} {f.name}" if f not in app else
+            f"{Path(f.filename).relative_to(base)}:{f.lineno} {f.name}" for f in frames[-limit:]]
+
+
+class SlowQueryLogger:
+    """connection.execute_wrapper callable; one per request (or slow_query_log block)."""
+
+    # fingerprint -> monotonic time of the last EXPLAIN, per process; least recently
+    # explained fingerprints are dropped past max_explained
+    _explained = OrderedDict()
+    _explained_lock = threading.Lock()
+    max_explained = 1000
+
+    def __init__(self, request=None, source=None):
+        self.request = request
+        self.source = source or {}
+        self.threshold = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+        self.log_params = getattr(settings, "SLOW_QUERY_LOG_PARAMS", False)
+        self.explain_rate = getattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0)
+        self.explain_interval = getattr(settings, "SLOW_QUERY_EXPLAIN_INTERVAL", 600)
+        self.busy = False  # our own EXPLAIN goes through the wrapper too
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.busy:
+            return execute(sql, params, many, context)
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - t0
+            if elapsed >= self.threshold:
+                self.busy = True
+                try:
+                    self.record(sql, params, many, context["connection"], elapsed)
+                finally:
+                    self.busy = False
+
+    def record(self, sql, params, many, conn, elapsed):
+        normalized, key = fingerprint(sql)
+        entry = {
+            "ts": time.time(),
+            "fingerprint": key,
+            "ms": round(elapsed * 1000, 2),
+            "sql": normalized[:4000],
+            "many": many,
+            **self.source,
+            **self.describe_request(),
+            "stack": _app_stack(),
+        }
+        if self.log_params and params is not None and not many:
+            entry["params"] = [repr(p)[:200] for p in list(params)[:50]]
+        plan = self.explain(sql, params, many, conn, key)
+        if plan is not None:
+            entry["plan"] = plan
+
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        logger.warning(line)
+        with open(log_file(), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def describe_request(self) -> dict:
+        if self.request is None:
+            return {}
+        info = {"method": self.request.method, "path": self.request.path}
+        match = getattr(self.request, "resolver_match", None)
+        if match:
+            info.update(view=match.view_name or match._func_path, route=match.route)
+        return info
+
+    def explain(self, sql, params, many, conn, key):
+        if conn.vendor != "postgresql" or many or not self.explain_rate:
+            return None
+        now = time.monotonic()
+        last = self._explained.get(key)
+        if last is not None and now - last < self.explain_interval:
+            return None
+        if random.random() >= self.explain_rate:
+            return None
+        statement = sql.lstrip().upper()
+        if conn.needs_rollback or not statement.startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+            return None
+        with self._explained_lock:
+            self._explained[key] = now
+            self._explained.move_to_end(key)
+            while len(self._explained) > self.max_explained:
+                self._explained.popitem(last=False)
+
+        # ANALYZE executes the statement: only for plain SELECTs, never WITH (a CTE may write)
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if statement.startswith("SELECT") else "FORMAT JSON"
+        try:
+            # savepoint: a failing EXPLAIN must not break the caller's transaction
+            with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                cursor.execute(f"EXPLAIN ({options}) {sql}", params)
+                return cursor.fetchone()[0]
+        except DatabaseError as e:
+            return {"error": str(e)[:500]}
+
+
+@contextmanager
+def slow_query_log(source: str = "command"):
+    """Slow-query logging for code running outside a request (imports, commands)."""
+    if not getattr(settings, "SLOW_QUERY_ENABLED", False):
+        yield
+        return
+    with connection.execute_wrapper(SlowQueryLogger(source={"view": source})):
+        yield
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        log_file().parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryLogger(request)):
+            return self.get_response(request)
@@ -1,10 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("accounts.urls")),
     path("api/", include("customs.urls")),
     path("api/", include("marketplace.urls")),
+    path("metrics", metrics_view, name="metrics"),
 
 ]
@@ -1,6 +1,6 @@
 
 from django.contrib import admin
-from .models import HSCode, Heading, Season
+from .models import HSCode, Heading, ImportRun, Season
 
 @admin.register(Heading)
 class HeadingAdmin(admin.ModelAdmin):
@@ -11,3 +11,7 @@ class HSCodeAdmin (admin.ModelAdmin):
 @admin.register(Season)
 class SeasonAdmin (admin.ModelAdmin):
     list_display = ('code','description')
+@admin.register(ImportRun)
+class ImportRunAdmin (admin.ModelAdmin):
+    list_display = ('id', 'model_name', 'file_name', 'status', 'rows_committed', 'rows_planned', 'created_at')
+    list_filter = ('status', 'model_name')
@@ -0,0 +1,44 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import generics
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIView
+
+from .views import HSCodeViewSet
+
+
+class _HSCodeReadMixin:
+    # same queryset / filters / search / ordering / pagination as HSCodeViewSet
+    queryset = HSCodeViewSet.queryset
+    serializer_class = HSCodeViewSet.serializer_class
+    pagination_class = HSCodeViewSet.pagination_class
+    filter_backends = HSCodeViewSet.filter_backends
+    filterset_class = HSCodeViewSet.filterset_class
+    search_fields = HSCodeViewSet.search_fields
+    ordering_fields = HSCodeViewSet.ordering_fields
+    ordering = HSCodeViewSet.ordering
+
+
+class AsyncHSCodeListView(_HSCodeReadMixin, AsyncAPIView, generics.GenericAPIView):
+    """GET hs-codes/ (search / autocomplete) on the async ORM."""
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is None:
+            return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class AsyncHSCodeDetailView(_HSCodeReadMixin, AsyncAPIView, generics.GenericAPIView):
+    """GET hs-codes/<pk>/ on the async ORM."""
+
+    async def get(self, request, pk, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            obj = await queryset.aget(pk=pk)
+        except (queryset.model.DoesNotExist, ValueError, TypeError, ValidationError):
+            raise Http404
+        self.check_object_permissions(request, obj)
+        return Response(self.get_serializer(obj).data)
@@ -0,0 +1,240 @@
+"""
+Server-side imports: manage.py import_seasons / import_headings / import_hscodes.
+
+Same row logic as the import/* endpoints (the BaseImportAPIView subclass's
+load_lookups / clean_batch / plan_batches / apply_plan), without the HTTP
+upload and worker timeout:
+
+  read      the local file through mmap (CSV line by line, XLSX via the
+            streaming reader or openpyxl)
+  validate  clean_batch in a process pool, one task per HS chapter (the
+            first two digits of the code, split further by
+            validation_batch_size); lookups are loaded once and shipped to
+            the workers, which never touch the database
+  plan      existing rows loaded in bulk in this process, once the
+            catalogue import lock is held (customs.import_lock)
+  write     a single writer (apply_plan), committing every --commit-rows
+"""
+import csv
+import mmap
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.metrics import record_import
+from core.slow_queries import slow_query_log
+
+from . import import_lock
+from .import_errors import ImportErrorLog
+from .views import XLSX_READERS, ImportReport, _clean_str, _read_xlsx, _rows_to_dicts
+
+
+class _MappedFile(mmap.mmap):
+    # zipfile (XLSX) wants seekable(), which mmap only grows in Python 3.13
+    def seekable(self):
+        return True
+
+
+def _decoded_lines(mm: mmap.mmap) -> Iterator[str]:
+    lines = iter(mm.readline, b"")
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first.decode("utf-8-sig", errors="replace")  # possible BOM
+    for line in lines:
+        yield line.decode("utf-8", errors="replace")
+
+
+def read_file(path: Path, reader: str = "fast") -> Tuple[List[str], List[Dict[str, Any]]]:
+    """(headers, rows as dicts) of a local .csv / .xlsx, like _read_rows for uploads."""
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".xlsx"):
+        raise CommandError("Unsupported file type. Use .csv or .xlsx")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], []  # mmap refuses empty files
+        with _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if suffix == ".csv":
+                return _rows_to_dicts(csv.reader(_decoded_lines(mm)))
+            return _read_xlsx(mm, reader)
+
+
+def chapter_chunks(rows: List[Dict[str, Any]], size: int) -> Iterator[Tuple[str, List[int]]]:
+    """(chapter, file row numbers) per validation task; rows keep file order within a chapter."""
+    chapters: Dict[str, List[int]] = defaultdict(list)
+    for number, row in enumerate(rows, start=2):  # header is row 1
+        chapters[_clean_str(row.get("code"))[:2]].append(number)
+    for chapter in sorted(chapters):
+        numbers = chapters[chapter]
+        for start in range(0, len(numbers), size):
+            yield chapter, numbers[start:start + size]
+
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(view_class, lookups: Dict[str, Any]) -> None:
+    if not apps.ready:  # spawn start method; fork inherits the set-up registry
+        import django
+
+        django.setup()
+    _worker["view"] = view_class()
+    _worker["lookups"] = lookups
+
+
+def _clean_chunk(rows: List[Dict[str, Any]], numbers: List[int]):
+    """clean_batch + check_lengths on one chunk, row numbers mapped back to the file's."""
+    view, report = _worker["view"], ImportReport(max_samples=None)  # a chunk's errors, all returned
+    cleaned = view.check_lengths(view.clean_batch(rows, 0, _worker["lookups"], report), report)
+    return (
+        [(numbers[i], code, values) for i, code, values in cleaned],
+        report.skipped,
+        [(numbers[e["row"]], e["code"], e["error"], e["error_type"]) for e in report.row_errors],
+    )
+
+
+class ImportCommand(BaseCommand):
+    view_class = None  # a BaseImportAPIView subclass
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help=".csv or .xlsx file (header row first)")
+        parser.add_argument("--dry-run", action="store_true", help="validate and plan, write nothing")
+        parser.add_argument(
+            "--workers", type=int, default=min(os.cpu_count() or 1, 8),
+            help="validation processes (1 = validate in this process)",
+        )
+        parser.add_argument("--reader", choices=XLSX_READERS, default="fast", help="XLSX reader")
+        parser.add_argument("--batch-size", type=int, help="rows per validation task (default: the view's)")
+        parser.add_argument("--show-errors", type=int, default=20, help="row errors to print")
+        parser.add_argument("--commit-rows", type=int, help="rows per transaction (default IMPORT_COMMIT_ROWS)")
+        parser.add_argument(
+            "--wait", type=float, help="seconds to wait for a running import to finish (default: as long as it takes)",
+        )
+
+    def handle(self, *args, **opts):
+        path = Path(opts["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist")
+        view = self.view_class()
+        stages = {}
+
+        t0 = time.perf_counter()
+        headers, rows = read_file(path, opts["reader"])
+        stages["read"] = time.perf_counter() - t0
+        missing = [c for c in view.required_columns if c not in headers]
+        if missing:
+            raise CommandError(f"Missing required columns: {missing} (received {headers})")
+        self.stdout.write(f"{path.name}: {len(rows)} rows read in {stages['read']:.1f}s")
+
+        if opts["commit_rows"]:
+            view.commit_batch_size = opts["commit_rows"]
+        run = None
+        if not opts["dry_run"]:
+            run = self._acquire(view, path, opts["wait"])
+
+        report = ImportReport(error_log=ImportErrorLog(rows, headers, view.model_name))
+        started = time.perf_counter()
+        try:
+            with report.error_log, slow_query_log(f"import_{view.model_name.lower()}"):
+                lookups = view.load_lookups()
+                t0 = time.perf_counter()
+                plan = view.plan_batches(self._validated(view, rows, lookups, report, opts), report)
+                stages["validate + plan"] = time.perf_counter() - t0
+
+                if run is not None:
+                    creates = sum(1 for p in plan if p.action == "create")
+                    self.stdout.write(f"writing {creates} new and {len(plan) - creates} changed rows")
+                    t0 = time.perf_counter()
+                    view.apply_plan(plan, report, run)
+                    stages["write"] = time.perf_counter() - t0
+        except BaseException as e:
+            if run is None:
+                raise
+            import_lock.release(run, "failed", repr(e))
+            record_import(view.model_name, report, len(rows), time.perf_counter() - started, opts["dry_run"])
+            raise CommandError(
+                f"import run {run.pk} failed after committing {run.rows_committed}/{run.rows_planned} rows: {e}. "
+                "Run the same file again to write the rest."
+            ) from e
+        if run is not None:
+            import_lock.release(run, "done")
+        elapsed = time.perf_counter() - started
+        record_import(view.model_name, report, len(rows), elapsed, opts["dry_run"])
+
+        self._print_report(view, report, rows, stages, elapsed, opts)
+
+    def _acquire(self, view, path: Path, wait):
+        with open(path, "rb") as f:
+            sha256 = import_lock.file_sha256(f)
+        run = import_lock.enqueue(view.model_name, path.name, sha256)
+        shown = []
+
+        def waiting(position):
+            if position != (shown[-1] if shown else None):
+                self.stdout.write(f"waiting for the catalogue import lock, position {position} in the queue")
+                shown.append(position)
+
+        if not import_lock.acquire(run, wait, on_wait=waiting):
+            import_lock.release(run, "abandoned")
+            raise CommandError(f"another import is still running after {wait}s")
+        previous = import_lock.previous_failure(run)
+        if previous is not None:
+            self.stdout.write(
+                f"resuming run {previous.pk}: its {previous.rows_committed} committed rows will plan as unchanged"
+            )
+        return run
+
+    def _validated(self, view, rows, lookups, report: ImportReport, opts) -> Iterator[list]:
+        """Cleaned batches in chapter order, validated by the worker pool."""
+        chunks = list(chapter_chunks(rows, opts["batch_size"] or view.validation_batch_size))
+        row_chunks = ([rows[n - 2] for n in numbers] for _chapter, numbers in chunks)
+        number_chunks = (numbers for _chapter, numbers in chunks)
+
+        pool = None
+        if opts["workers"] > 1 and len(chunks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            pool = ProcessPoolExecutor(
+                max_workers=min(opts["workers"], len(chunks)),
+                initializer=_init_worker, initargs=(self.view_class, lookups),
+            )
+            results = pool.map(_clean_chunk, row_chunks, number_chunks)
+        else:
+            _init_worker(self.view_class, lookups)
+            results = map(_clean_chunk, row_chunks, number_chunks)
+
+        try:
+            done, step = 0, max(len(rows) // 10, 1)
+            for (chapter, numbers), (cleaned, skipped, errors) in zip(chunks, results):
+                report.skipped += skipped
+                for row, code, message, kind in errors:
+                    report.error(row, code, message, kind)
+                yield cleaned
+                if (done + len(numbers)) // step > done // step:
+                    self.stdout.write(f"  validated {done + len(numbers)}/{len(rows)} rows (chapter {chapter or '-'})")
+                done += len(numbers)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _print_report(self, view, report: ImportReport, rows, stages, elapsed, opts) -> None:
+        for name, seconds in stages.items():
+            self.stdout.write(f"  {name:<16} {seconds:>8.2f}s")
+        self.stdout.write(
+            f"{view.model_name}{' (dry run)' if opts['dry_run'] else ''}: "
+            f"created {report.created}, updated {report.updated}, unchanged {report.unchanged}, "
+            f"skipped {report.skipped}, errors {report.errors} "
+            f"in {elapsed:.1f}s ({len(rows) / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+        for kind, count in sorted(report.error_counts.items(), key=lambda kv: -kv[1]):
+            self.stdout.write(f"  {kind:<20} {count:>8}")
+        report.row_errors.sort(key=lambda e: e["row"])
+        for e in report.row_errors[:opts["show_errors"]]:
+            self.stdout.write(self.style.WARNING(f"  row {e['row']} {e['code']}: {e['error']}"))
+        if report.error_log.written:
+            self.stdout.write(f"all {report.errors} errors with their cells: {report.error_log.path}")
@@ -0,0 +1,122 @@
+"""
+Delta sync for the HS code catalogue (GET hs-codes/changes/?since=<token>).
+
+Every HS code write takes the next ChangeSequence number inside its own
+transaction: saves and update() stamp HSCode.change_seq, deletes (of codes or
+of the seasons / headings they cascade from) write HSCodeDeletion tombstones,
+imports stamp each committed chunk. Upserts and tombstones are merged in one
+(seq, kind, id) order so a page can stop anywhere. The token is an opaque
+cursor into that order:
+
+  "<seq>"             every change numbered up to and including seq
+  "<seq>-u<id>"       ... below seq, plus upserts numbered seq up to id
+  "<seq>-d<id>"       ... below seq, plus all upserts and tombstones up to id numbered seq
+
+The counter row stays locked from allocate() to commit, so numbers commit in
+order: a page reads the counter first and serves nothing above it, and no
+change at or below it can still commit afterwards. Tokens behind pruned
+tombstones (HSCODE_CHANGES_RETENTION_DAYS) or ahead of the counter (e.g. the
+old timestamp tokens) are refused; the client must resync from the full list.
+"""
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import ChangeSequence, HSCode, HSCodeDeletion
+
+Cursor = Tuple[int, Optional[str], int]  # (seq, "u" / "d" / None for all, id)
+
+_last_prune = 0.0
+
+
+class TokenError(ValueError):
+    pass
+
+
+def encode(seq: int, kind: Optional[str] = None, pk: int = 0) -> str:
+    return f"{seq}-{kind}{pk}" if kind else str(seq)
+
+
+def decode(token: str) -> Cursor:
+    seq, _, rest = token.partition("-")
+    try:
+        if not rest:
+            return int(seq), None, 0
+        if rest[0] not in "ud":
+            raise TokenError(token)
+        return int(seq), rest[0], int(rest[1:])
+    except ValueError as e:
+        raise TokenError(token) from e
+
+
+def state() -> Tuple[int, int]:
+    """(last committed change number, pruned_through); read before the page so it bounds it."""
+    return ChangeSequence.state()
+
+
+def expired(cursor: Cursor, current: Tuple[int, int]) -> bool:
+    seq, kind, _pk = cursor
+    last, pruned_through = current
+    return seq > last or seq < pruned_through or (seq == pruned_through and kind is not None)
+
+
+def _after(field: str, cursor: Cursor, own_kind: str) -> Q:
+    seq, kind, pk = cursor
+    newer = Q(**{f"{field}__gt": seq})
+    if kind is None:
+        return newer
+    if kind == own_kind:
+        return newer | Q(**{field: seq, "id__gt": pk})
+    if own_kind == "d":  # cursor mid-upserts at `seq`: every tombstone at `seq` is still ahead
+        return newer | Q(**{field: seq})
+    return newer  # cursor mid-tombstones: upserts at `seq` sort before them, already served
+
+
+def changes(cursor: Cursor, limit: int, until: int) -> Dict[str, Any]:
+    """The next page of changes after cursor, up to change number until: upserts, deleted (tombstones), next token."""
+    upserts = list(
+        HSCode.objects.filter(_after("change_seq", cursor, "u"), change_seq__lte=until)
+        .order_by("change_seq", "id")[:limit + 1]
+    )
+    deleted = list(
+        HSCodeDeletion.objects.filter(_after("seq", cursor, "d"), seq__lte=until)
+        .order_by("seq", "id")[:limit + 1]
+    )
+    merged = sorted(
+        [((obj.change_seq, 0, obj.pk), "u", obj) for obj in upserts]
+        + [((t.seq, 1, t.pk), "d", t) for t in deleted],
+        key=lambda item: item[0],
+    )
+    page, has_more = merged[:limit], len(merged) > limit
+    if has_more:
+        (seq, _order, pk), kind, _obj = page[-1]
+        token = encode(seq, kind, pk)
+    else:
+        token = encode(until)
+    return {
+        "token": token,
+        "has_more": has_more,
+        "upserts": [obj for _key, kind, obj in page if kind == "u"],
+        "deleted": [obj for _key, kind, obj in page if kind == "d"],
+    }
+
+
+def prune_deletions() -> None:
+    """Drop tombstones past the retention window, at most once an hour per process."""
+    global _last_prune
+    if time.monotonic() - _last_prune < 3600:
+        return
+    _last_prune = time.monotonic()
+    cutoff = timezone.now() - timedelta(days=settings.HSCODE_CHANGES_RETENTION_DAYS)
+    through = HSCodeDeletion.objects.filter(deleted_at__lt=cutoff).aggregate(m=Max("seq"))["m"]
+    if through is None:
+        return
+    with transaction.atomic():
+        # recorded first: tokens at or behind it may have missed a pruned tombstone
+        ChangeSequence.objects.filter(pk=1, pruned_through__lt=through).update(pruned_through=through)
+        HSCodeDeletion.objects.filter(seq__lte=through).delete()
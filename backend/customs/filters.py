@@ -1,14 +1,40 @@
 
 import django_filters
+from rest_framework.filters import OrderingFilter
+
 from .models import HSCode
 
+
+class HSCodeOrderingFilter(OrderingFilter):
+    """
+    Appends code as a tie-breaker so pages are stable for non-unique sort keys
+    and the order matches the (column, code) indexes on HSCode.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        if ordering and not any(o.lstrip("-") == "code" for o in ordering):
+            ordering.append("-code" if ordering[-1].startswith("-") else "code")
+        return ordering
+
 class HSCodeFilter(django_filters.FilterSet):
-    # exact match filters for demonstration; you could also use range filters if needed
-    profit = django_filters.NumberFilter(field_name="profit", lookup_expr="exact")
+    # profit / import_duty_rate are free text; filter on their indexed numeric shadows
+    profit = django_filters.NumberFilter(field_name="profit_value", lookup_expr="exact")
     priority = django_filters.NumberFilter(field_name="priority", lookup_expr="exact")
     customs_duty_rate = django_filters.NumberFilter(field_name="customs_duty_rate", lookup_expr="exact")
+    import_duty_rate = django_filters.NumberFilter(field_name="import_duty_rate_value", lookup_expr="exact")
     suq = django_filters.Filter(field_name="SUQ", lookup_expr="exact")
 
+    # ranges (?profit_min=4&profit_max=10 ...) use the same (column, code) partial indexes
+    profit_min = django_filters.NumberFilter(field_name="profit_value", lookup_expr="gte")
+    profit_max = django_filters.NumberFilter(field_name="profit_value", lookup_expr="lte")
+    priority_min = django_filters.NumberFilter(field_name="priority", lookup_expr="gte")
+    priority_max = django_filters.NumberFilter(field_name="priority", lookup_expr="lte")
+    customs_duty_rate_min = django_filters.NumberFilter(field_name="customs_duty_rate", lookup_expr="gte")
+    customs_duty_rate_max = django_filters.NumberFilter(field_name="customs_duty_rate", lookup_expr="lte")
+    import_duty_rate_min = django_filters.NumberFilter(field_name="import_duty_rate_value", lookup_expr="gte")
+    import_duty_rate_max = django_filters.NumberFilter(field_name="import_duty_rate_value", lookup_expr="lte")
+
     class Meta:
         model = HSCode
-        fields = ["profit", "priority", "customs_duty_rate","suq"]
+        fields = ["profit", "priority", "customs_duty_rate", "import_duty_rate", "suq"]
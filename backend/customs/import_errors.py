@@ -0,0 +1,93 @@
+"""
+On-disk error reports for imports.
+
+Every row error is appended to a CSV under IMPORT_ERRORS_DIR as it happens
+(row, code, error type, message, then the row's original cells), so the
+ImportReport only keeps counts and a short sample in memory however many
+rows fail. The import response links to ImportErrorReportAPIView, which
+serves the file back to admins; files older than IMPORT_ERRORS_TTL_HOURS are
+pruned when a new report is started.
+"""
+import csv
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+_TOKEN = re.compile(r"[0-9a-f]{32}")
+
+
+def errors_dir() -> Path:
+    return Path(settings.IMPORT_ERRORS_DIR)
+
+
+def report_path(token: str) -> Optional[Path]:
+    """The error file for a token, or None if the token is malformed or the file is gone."""
+    if not _TOKEN.fullmatch(token or ""):
+        return None
+    path = errors_dir() / f"{token}.csv"
+    return path if path.is_file() else None
+
+
+def prune(max_age_hours: Optional[float] = None) -> int:
+    if max_age_hours is None:
+        max_age_hours = settings.IMPORT_ERRORS_TTL_HOURS
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in errors_dir().glob("*.csv"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass  # pruned concurrently by another worker
+    return removed
+
+
+class ImportErrorLog:
+    """
+    Streams row errors to <IMPORT_ERRORS_DIR>/<token>.csv. The file is only
+    created on the first error; `rows` / `headers` are the parsed import
+    (row N is rows[N - 2], the header being row 1) and supply the original cells.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], headers: List[str], model_name: str = ""):
+        self.rows = rows
+        self.headers = headers
+        self.model_name = model_name
+        self.token = uuid.uuid4().hex
+        self.path = errors_dir() / f"{self.token}.csv"
+        self._file = None
+        self._writer = None
+
+    @property
+    def written(self) -> bool:
+        return self._writer is not None
+
+    def write(self, row: int, code: str, kind: str, message: str) -> None:
+        if self._writer is None:
+            self._open()
+        cells = self.rows[row - 2] if 0 <= row - 2 < len(self.rows) else {}
+        self._writer.writerow([row, code, kind, message, *(cells.get(h) for h in self.headers)])
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        prune()
+        # utf-8-sig so Excel shows the Persian cells correctly
+        self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["row", "code", "error_type", "error", *self.headers])
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
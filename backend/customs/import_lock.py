@@ -0,0 +1,124 @@
+"""
+One writing import at a time for the whole catalogue.
+
+Every import that writes gets an ImportRun, which is its place in a FIFO
+queue: a run may start once no older live run is queued or running. On
+Postgres the holder additionally takes a session-level advisory lock
+(pg_try_advisory_lock), so two imports can never write together even if a
+heartbeat goes stale; elsewhere (SQLite) the oldest live ImportRun row is
+the lock.
+
+Liveness is a heartbeat: queued runs are touched while their caller waits
+or retries with its ticket and drop out after IMPORT_QUEUE_TTL seconds;
+the running import is touched at every committed chunk and is presumed
+dead after IMPORT_LOCK_TTL seconds.
+"""
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ImportRun
+
+ADVISORY_LOCK_KEY = 0x68735F696D706F72  # "hs_impor"
+POLL_SECONDS = 0.5
+
+
+def file_sha256(file_obj) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def _use_advisory_lock() -> bool:
+    return connection.vendor == "postgresql" and settings.IMPORT_ADVISORY_LOCK
+
+
+def live_runs():
+    now = timezone.now()
+    return ImportRun.objects.filter(
+        Q(status="queued", heartbeat_at__gte=now - timedelta(seconds=settings.IMPORT_QUEUE_TTL))
+        | Q(status="running", heartbeat_at__gte=now - timedelta(seconds=settings.IMPORT_LOCK_TTL))
+    )
+
+
+def queue_position(run: ImportRun) -> int:
+    """Live runs ahead of this one (0: next / running)."""
+    return live_runs().filter(pk__lt=run.pk).count()
+
+
+def enqueue(model_name: str, file_name: str, sha256: str, user=None, ticket=None) -> ImportRun:
+    """A new run at the back of the queue, or the caller's still-queued ticket (keeps its place)."""
+    if ticket:
+        run = ImportRun.objects.filter(
+            pk=ticket, status="queued", model_name=model_name, requested_by=user,
+        ).first() if str(ticket).isdigit() else None
+        if run is not None:
+            touch(run)
+            return run
+    return ImportRun.objects.create(
+        model_name=model_name, file_name=file_name[:255], file_sha256=sha256, requested_by=user,
+    )
+
+
+def touch(run: ImportRun) -> None:
+    run.heartbeat_at = timezone.now()
+    ImportRun.objects.filter(pk=run.pk).update(heartbeat_at=run.heartbeat_at)
+
+
+def try_acquire(run: ImportRun) -> bool:
+    touch(run)
+    if queue_position(run) > 0:
+        return False
+    if _use_advisory_lock():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [ADVISORY_LOCK_KEY])
+            if not cursor.fetchone()[0]:
+                return False
+    # stale runs ahead of us are gone for good; their callers get a new ticket
+    ImportRun.objects.filter(pk__lt=run.pk, status__in=("queued", "running")).update(status="abandoned")
+    run.status = "running"
+    ImportRun.objects.filter(pk=run.pk).update(status="running")
+    return True
+
+
+def acquire(run: ImportRun, wait_seconds: float, on_wait=None) -> bool:
+    """Poll for the catalogue lock for up to wait_seconds (None: forever); on_wait(position) between polls."""
+    deadline = None if wait_seconds is None else time.monotonic() + wait_seconds
+    while not try_acquire(run):
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        if on_wait is not None:
+            on_wait(queue_position(run))
+        time.sleep(POLL_SECONDS)
+    return True
+
+
+def checkpoint(run: ImportRun, rows_committed: int) -> None:
+    """Call inside the transaction that committed those rows."""
+    run.rows_committed = rows_committed
+    run.heartbeat_at = timezone.now()
+    ImportRun.objects.filter(pk=run.pk).update(rows_committed=rows_committed, heartbeat_at=run.heartbeat_at)
+
+
+def release(run: ImportRun, status: str, error: str = "") -> None:
+    run.status, run.error, run.finished_at = status, error, timezone.now()
+    ImportRun.objects.filter(pk=run.pk).update(status=status, error=error, finished_at=run.finished_at)
+    if _use_advisory_lock():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [ADVISORY_LOCK_KEY])
+
+
+def previous_failure(run: ImportRun):
+    """The last failed run of the same file, if any: its checkpoint rows are already in the table."""
+    return (
+        ImportRun.objects.filter(file_sha256=run.file_sha256, model_name=run.model_name, status="failed", pk__lt=run.pk)
+        .order_by("-pk")
+        .first()
+    )
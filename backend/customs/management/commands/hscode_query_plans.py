@@ -0,0 +1,91 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from customs.filters import HSCodeFilter
+from customs.models import HSCode
+
+
+# (label, filter params, ordering) covering the filter/sort combinations HSCodeViewSet supports
+SCENARIOS = [
+    ("default list", {}, ["-code"]),
+    ("suq", {"suq": "Kg"}, ["-code"]),
+    ("priority", {"priority": "1"}, ["-code"]),
+    ("priority range", {"priority_min": "1", "priority_max": "3"}, ["priority", "code"]),
+    ("customs_duty_rate", {"customs_duty_rate": "10"}, ["-code"]),
+    ("customs_duty_rate range", {"customs_duty_rate_min": "5", "customs_duty_rate_max": "20"}, ["customs_duty_rate", "code"]),
+    ("profit", {"profit": "4"}, ["-code"]),
+    ("profit range", {"profit_min": "1", "profit_max": "10"}, ["profit_value", "code"]),
+    ("import_duty_rate range", {"import_duty_rate_min": "5", "import_duty_rate_max": "30"}, ["-code"]),
+]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the HS code list queries for every supported filter/sort combination."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--analyze", action="store_true", help="Postgres: EXPLAIN (ANALYZE, BUFFERS)")
+        parser.add_argument("--json", action="store_true", help="print a JSON summary instead of plans")
+
+    def handle(self, *args, **opts):
+        page_size = opts["page_size"]
+        total = HSCode.objects.count()
+        self.stdout.write(f"{connection.vendor}: {total} HS codes, page_size={page_size}")
+
+        summary = []
+        for label, params, ordering in SCENARIOS:
+            qs = HSCodeFilter(params, queryset=HSCode.objects.all()).qs.order_by(*ordering)
+            page = qs[: page_size + 1]
+            codes_only = qs.values_list("code", flat=True)[: page_size + 1]
+
+            t0 = time.perf_counter()
+            rows = len(list(page))
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+
+            plan = self._explain(page, opts["analyze"])
+            index_only_plan = self._explain(codes_only, False)
+            summary.append({
+                "scenario": label,
+                "rows": rows,
+                "ms": round(elapsed_ms, 2),
+                "seq_scan": self._has_seq_scan(plan),
+                "sort": self._has_sort(plan),
+                "index_only": "Index Only Scan" in index_only_plan or "COVERING INDEX" in index_only_plan,
+            })
+            if not opts["json"]:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label} {params} order_by={ordering}"))
+                self.stdout.write(plan)
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self.stdout.write("")
+            for s in summary:
+                flags = []
+                if s["seq_scan"]:
+                    flags.append("SEQ SCAN")
+                if s["sort"]:
+                    flags.append("SORT")
+                if s["index_only"]:
+                    flags.append("index-only (codes)")
+                self.stdout.write(f"{s['scenario']:<28} {s['rows']:>5} rows {s['ms']:>9.2f} ms  {', '.join(flags)}")
+
+    def _explain(self, qs, analyze):
+        if connection.vendor == "postgresql" and analyze:
+            return qs.explain(analyze=True, buffers=True)
+        return qs.explain()
+
+    def _has_seq_scan(self, plan):
+        # postgres: "Seq Scan on"; sqlite: "SCAN customs_hscode" without an index
+        if "Seq Scan" in plan:
+            return True
+        return any(
+            line.strip().startswith("SCAN") or " SCAN customs_hscode" in line and "INDEX" not in line
+            for line in plan.splitlines()
+        )
+
+    def _has_sort(self, plan):
+        return "Sort" in plan or "USE TEMP B-TREE FOR ORDER BY" in plan
@@ -0,0 +1,7 @@
+from customs.bulk_import import ImportCommand
+from customs.views import HeadingImportAPIView
+
+
+class Command(ImportCommand):
+    help = "Import Headings from a local .csv / .xlsx (same rules as POST /api/import/headings/)."
+    view_class = HeadingImportAPIView
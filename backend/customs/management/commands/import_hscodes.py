@@ -0,0 +1,7 @@
+from customs.bulk_import import ImportCommand
+from customs.views import HSCodeImportAPIView
+
+
+class Command(ImportCommand):
+    help = "Import HS codes from a local .csv / .xlsx (same rules as POST /api/import/hscodes/)."
+    view_class = HSCodeImportAPIView
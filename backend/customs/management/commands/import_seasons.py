@@ -0,0 +1,7 @@
+from customs.bulk_import import ImportCommand
+from customs.views import SeasonImportAPIView
+
+
+class Command(ImportCommand):
+    help = "Import Seasons (chapters) from a local .csv / .xlsx (same rules as POST /api/import/seasons/)."
+    view_class = SeasonImportAPIView
@@ -0,0 +1,78 @@
+# Generated by Django 6.0 on 2026-10-19 09:38
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+_FA_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩٫", "01234567890123456789.")
+
+
+def parse_rate(value):
+    # frozen copy of customs.models.parse_rate as of this migration
+    if value is None:
+        return None
+    s = str(value).translate(_FA_DIGITS).replace("٪", "").replace("%", "").replace(",", "").strip()
+    if s == "":
+        return None
+    try:
+        d = Decimal(s)
+    except InvalidOperation:
+        return None
+    if not d.is_finite() or abs(d) >= Decimal("1e10"):
+        return None
+    return d.quantize(Decimal("0.0001"))
+
+
+def backfill_numeric_rates(apps, schema_editor):
+    HSCode = apps.get_model("customs", "HSCode")
+    batch = []
+    for obj in HSCode.objects.only("id", "profit", "import_duty_rate").iterator(chunk_size=2000):
+        obj.profit_value = parse_rate(obj.profit)
+        obj.import_duty_rate_value = parse_rate(obj.import_duty_rate)
+        batch.append(obj)
+        if len(batch) >= 2000:
+            HSCode.objects.bulk_update(batch, ["profit_value", "import_duty_rate_value"])
+            batch = []
+    if batch:
+        HSCode.objects.bulk_update(batch, ["profit_value", "import_duty_rate_value"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customs', '0002_alter_hscode_suq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hscode',
+            name='import_duty_rate_value',
+            field=models.DecimalField(blank=True, decimal_places=4, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='hscode',
+            name='profit_value',
+            field=models.DecimalField(blank=True, decimal_places=4, editable=False, max_digits=14, null=True),
+        ),
+        migrations.RunPython(backfill_numeric_rates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(fields=['SUQ', 'code'], name='hscode_suq_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(condition=models.Q(('priority__isnull', False)), fields=['priority', 'code'], name='hscode_priority_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(condition=models.Q(('customs_duty_rate__isnull', False)), fields=['customs_duty_rate', 'code'], name='hscode_duty_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(condition=models.Q(('profit_value__isnull', False)), fields=['profit_value', 'code'], name='hscode_profit_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(condition=models.Q(('import_duty_rate_value__isnull', False)), fields=['import_duty_rate_value', 'code'], name='hscode_import_duty_code_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 10:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customs', '0003_hscode_numeric_rates_and_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=20)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('file_sha256', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('done', 'done'), ('failed', 'failed'), ('abandoned', 'abandoned')], default='queued', max_length=10)),
+                ('rows_planned', models.PositiveIntegerField(default=0)),
+                ('rows_committed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='importrun_status_idx'), models.Index(fields=['file_sha256', 'model_name'], name='importrun_file_idx')],
+            },
+        ),
+    ]
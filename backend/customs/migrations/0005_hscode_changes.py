@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 10:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customs', '0004_import_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HSCodeDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hscode_id', models.BigIntegerField()),
+                ('code', models.CharField(max_length=20)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(fields=['updated_date', 'id'], name='hscode_updated_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscodedeletion',
+            index=models.Index(fields=['deleted_at', 'id'], name='hscode_deletion_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+def create_counter(apps, schema_editor):
+    # existing codes keep change_seq 0: tokens start from the counter's current value
+    ChangeSequence = apps.get_model("customs", "ChangeSequence")
+    ChangeSequence.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customs', '0005_hscode_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+                ('pruned_through', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='hscode',
+            name='hscode_updated_cursor_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='hscodedeletion',
+            name='hscode_deletion_cursor_idx',
+        ),
+        migrations.AddField(
+            model_name='hscode',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='hscodedeletion',
+            name='seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='hscode',
+            index=models.Index(fields=['change_seq', 'id'], name='hscode_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscodedeletion',
+            index=models.Index(fields=['seq', 'id'], name='hscode_deletion_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hscodedeletion',
+            index=models.Index(fields=['deleted_at'], name='hscode_deletion_age_idx'),
+        ),
+    ]
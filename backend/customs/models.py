@@ -1,13 +1,109 @@
-from django.db import models
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+from django.db.models import F, Q
+
+
+_FA_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩٫", "01234567890123456789.")
+
+
+def parse_rate(value) -> Decimal | None:
+    """
+    Best-effort numeric value of a free-text rate ("4", "4.5", "۴٪", "10 %").
+    Returns None when the text is not a number.
+    """
+    if value is None:
+        return None
+    s = str(value).translate(_FA_DIGITS).replace("٪", "").replace("%", "").replace(",", "").strip()
+    if s == "":
+        return None
+    try:
+        d = Decimal(s)
+    except InvalidOperation:
+        return None
+    if not d.is_finite() or abs(d) >= Decimal("1e10"):
+        return None
+    return d.quantize(Decimal("0.0001"))
+
+
+class ChangeSequence(models.Model):
+    """
+    Single-row counter that numbers HS code writes for hs-codes/changes/.
+    allocate() bumps it inside the writing transaction, which keeps the row
+    locked until that transaction commits: numbers become visible in the
+    order they were handed out, so once a reader sees the counter at N no
+    change numbered N or lower can still appear.
+    """
+    value = models.BigIntegerField(default=0)
+    pruned_through = models.BigIntegerField(default=0)  # tombstones numbered up to here were pruned
+
+    @classmethod
+    def allocate(cls, using=None) -> int:
+        """The next change number; call inside the transaction that writes the rows."""
+        using = using or router.db_for_write(cls)
+        if not transaction.get_connection(using).in_atomic_block:
+            raise TransactionManagementError("ChangeSequence.allocate() must run inside the writing transaction.")
+        rows = cls.objects.using(using)
+        if not rows.filter(pk=1).update(value=F("value") + 1):
+            rows.create(pk=1, value=1)  # the migration creates the row; a flushed test database does not have it
+        return rows.values_list("value", flat=True).get(pk=1)
+
+    @classmethod
+    def state(cls, using=None) -> tuple[int, int]:
+        """(last committed change number, pruned_through)."""
+        return cls.objects.using(using).filter(pk=1).values_list("value", "pruned_through").first() or (0, 0)
+
+
+def _record_cascades(using, seasons=None, headings=None) -> None:
+    """Change entries for the HS codes a Season / Heading delete is about to cascade to."""
+    codes = HSCode.objects.using(using)
+    if seasons is not None:
+        HSCodeDeletion.record(codes.filter(season__in=seasons))
+        codes = codes.exclude(season__in=seasons)
+        headings = Heading.objects.using(using).filter(season__in=seasons)
+    # HSCode.heading is SET_NULL: cleared here, through the numbered update(),
+    # instead of by the delete collector
+    codes.filter(heading__in=headings).update(heading=None)
+
+
+class SeasonQuerySet(models.QuerySet):
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            _record_cascades(self.db, seasons=self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Season(models.Model):
     code = models.CharField(max_length=2, unique=True)
     description = models.TextField(blank=True, null=True)
     season_notes = models.TextField(blank=True, null=True)
+
+    objects = SeasonQuerySet.as_manager()
+
     def __str__(self):
         return self.code
 
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            _record_cascades(using, seasons=Season.objects.using(using).filter(pk=self.pk))
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class HeadingQuerySet(models.QuerySet):
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            _record_cascades(self.db, headings=self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Heading(models.Model):
@@ -16,11 +112,38 @@ class Heading(models.Model):
     description = models.TextField(blank=True, null=True)
     heading_notes = models.TextField(blank=True, null=True)
 
+    objects = HeadingQuerySet.as_manager()
+
     def __str__(self):
         return self.code
 
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            _record_cascades(using, headings=Heading.objects.using(using).filter(pk=self.pk))
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class HSCodeQuerySet(models.QuerySet):
+    """
+    update() and delete() number their rows for hs-codes/changes/.
+    bulk_create / raw SQL writers set change_seq themselves (ChangeSequence.allocate()).
+    """
 
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            kwargs.setdefault("change_seq", ChangeSequence.allocate(self.db))
+            return super().update(**kwargs)
 
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            HSCodeDeletion.record(self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class HSCode(models.Model):
@@ -56,10 +179,134 @@ class HSCode(models.Model):
     updated_date = models.DateTimeField(auto_now=True)
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="code_seasons")
     heading = models.ForeignKey(Heading, on_delete=models.SET_NULL, null=True, blank=True, related_name="hscodes")
+
+    # numeric shadows of the free-text rates, kept in sync on save() so they can be range-filtered and indexed
+    profit_value = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, editable=False)
+    import_duty_rate_value = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, editable=False)
+    # ChangeSequence number of the last write (hs-codes/changes/)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = HSCodeQuerySet.as_manager()
+
     class Meta:
-        ordering = ["-code"] 
+        ordering = ["-code"]
+        indexes = [
+            # hs-codes/changes/ cursor: (change_seq, id) > token, oldest first
+            models.Index(fields=["change_seq", "id"], name="hscode_change_seq_idx"),
+            # "<filter> = x ORDER BY code DESC" -> index scan (backwards) without a sort step
+            models.Index(fields=["SUQ", "code"], name="hscode_suq_code_idx"),
+            models.Index(
+                fields=["priority", "code"], name="hscode_priority_code_idx",
+                condition=Q(priority__isnull=False),
+            ),
+            models.Index(
+                fields=["customs_duty_rate", "code"], name="hscode_duty_code_idx",
+                condition=Q(customs_duty_rate__isnull=False),
+            ),
+            models.Index(
+                fields=["profit_value", "code"], name="hscode_profit_code_idx",
+                condition=Q(profit_value__isnull=False),
+            ),
+            models.Index(
+                fields=["import_duty_rate_value", "code"], name="hscode_import_duty_code_idx",
+                condition=Q(import_duty_rate_value__isnull=False),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.sync_numeric_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "profit" in update_fields:
+                update_fields.add("profit_value")
+            if "import_duty_rate" in update_fields:
+                update_fields.add("import_duty_rate_value")
+            update_fields.add("change_seq")
+            kwargs["update_fields"] = update_fields
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            self.change_seq = ChangeSequence.allocate(using)
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            HSCodeDeletion.record(HSCode.objects.using(using).filter(pk=self.pk))
+            return super().delete(using=using, keep_parents=keep_parents)
+
+    def sync_numeric_fields(self) -> None:
+        """Call before bulk_create/bulk_update, which bypass save()."""
+        self.profit_value = parse_rate(self.profit)
+        self.import_duty_rate_value = parse_rate(self.import_duty_rate)
+
     def __str__(self):
         return f"{self.code} "
 
 
+class HSCodeDeletion(models.Model):
+    """
+    Tombstone of a deleted HS code for hs-codes/changes/, written by the
+    HSCode / Season / Heading delete paths (record()); kept for
+    HSCODE_CHANGES_RETENTION_DAYS.
+    """
+    hscode_id = models.BigIntegerField()
+    code = models.CharField(max_length=20)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    seq = models.BigIntegerField(default=0)  # ChangeSequence number of the delete
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["seq", "id"], name="hscode_deletion_seq_idx"),
+            models.Index(fields=["deleted_at"], name="hscode_deletion_age_idx"),  # retention prune
+        ]
 
+    def __str__(self):
+        return f"{self.code} (deleted)"
+
+    @classmethod
+    def record(cls, hscodes) -> None:
+        """Tombstones for `hscodes`, which the caller deletes in the same transaction."""
+        rows = list(hscodes.values_list("pk", "code"))
+        if rows:
+            seq = ChangeSequence.allocate(hscodes.db)
+            cls.objects.using(hscodes.db).bulk_create(
+                [cls(hscode_id=pk, code=code, seq=seq) for pk, code in rows], batch_size=500,
+            )
+
+
+class ImportRun(models.Model):
+    """
+    One import that writes (dry runs never get one). Doubles as the queue
+    ticket and the catalogue lock row (customs.import_lock), and records the
+    commit checkpoint: rows_committed plan entries are durable even if the
+    import later fails, and re-running the same file only writes the rest.
+    """
+    STATUS_CHOICES = [
+        ("queued", "queued"),
+        ("running", "running"),
+        ("done", "done"),
+        ("failed", "failed"),
+        ("abandoned", "abandoned"),
+    ]
+
+    model_name = models.CharField(max_length=20)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_sha256 = models.CharField(max_length=64)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    rows_planned = models.PositiveIntegerField(default=0)  # plan entries to write
+    rows_committed = models.PositiveIntegerField(default=0)  # checkpoint, saved with each committed chunk
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="importrun_status_idx"),
+            models.Index(fields=["file_sha256", "model_name"], name="importrun_file_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} #{self.pk} ({self.status})"
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.metrics import record_cache_lookup
+
+
+def invalidate_counts(prefix: str = "hscode-count") -> None:
+    """Start a new count-cache generation; called from the HS code write paths."""
+    cache.set(f"{prefix}:generation", uuid.uuid4().hex[:12], None)
+
+
+class LeanPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination that never runs COUNT(*) on the hot path.
+
+    - next page is detected by fetching page_size + 1 rows
+    - "count" is exact on the last page and with ?count=exact (a real
+      COUNT(*)); both are cached per filter signature
+    - otherwise it is the cached count for the signature or, on a miss, the
+      planner estimate (Postgres, cached the same way so the EXPLAIN runs
+      once per signature and TTL), or null. These are flagged
+      "count_is_estimate": writes start a new cache generation
+      (invalidate_counts), but only in the worker that made them.
+
+    Response keeps the DRF shape (count/next/previous/results) plus
+    "count_is_estimate", so existing clients reading "results" keep working.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 600
+    count_query_param = "count"
+    count_cache_prefix = "hscode-count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self._start(request):
+            return None
+        offset = self._offset()
+        rows = list(queryset[offset:offset + self.page_size_value + 1])
+        self._check_rows(rows)
+        self.count, self.count_is_estimate = self._resolve_count(queryset, request, offset, len(rows))
+        return rows[:self.page_size_value]
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart used by the ASGI read views (customs/async_views.py)."""
+        if not self._start(request):
+            return None
+        offset = self._offset()
+        rows = [obj async for obj in queryset[offset:offset + self.page_size_value + 1]]
+        self._check_rows(rows)
+        self.count, self.count_is_estimate = await sync_to_async(self._resolve_count)(
+            queryset, request, offset, len(rows)
+        )
+        return rows[:self.page_size_value]
+
+    def _start(self, request) -> bool:
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return False
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            page_number = 1
+        if page_number < 1:
+            raise NotFound("Invalid page.")
+        self.page_number = page_number
+        self.page_size_value = page_size
+        return True
+
+    def _offset(self) -> int:
+        return (self.page_number - 1) * self.page_size_value
+
+    def _check_rows(self, rows) -> None:
+        if self.page_number > 1 and not rows:
+            raise NotFound("Invalid page.")
+        self.has_next = len(rows) > self.page_size_value
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("count", self.count),
+            ("count_is_estimate", self.count_is_estimate),
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        response_schema["properties"]["count_is_estimate"] = {"type": "boolean"}
+        return response_schema
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    # ----------------------------
+    # Count strategies
+    # ----------------------------
+    def _resolve_count(self, queryset, request, offset: int, fetched: int):
+        key = self._cache_key(request)
+        # last page reached: the exact count is free
+        if fetched <= self.page_size_value:
+            count = offset + fetched
+            cache.set(key, count, self._cache_ttl())
+            return count, False
+
+        if request.query_params.get(self.count_query_param) == "exact":
+            count = queryset.count()
+            cache.set(key, count, self._cache_ttl())
+            return count, False
+
+        # never report fewer rows than we can already prove exist
+        cached = cache.get(key)
+        record_cache_lookup("hscode_count", cached is not None)
+        if cached is not None:
+            return max(cached, offset + fetched), True
+
+        estimate = self._planner_estimate(queryset)
+        if estimate is not None:
+            estimate = max(estimate, offset + fetched)
+            cache.set(key, estimate, self._cache_ttl())
+            return estimate, True
+        return None, True
+
+    def _cache_key(self, request) -> str:
+        params = sorted(
+            (k, v)
+            for k, v in request.query_params.lists()
+            if k not in (self.page_query_param, self.page_size_query_param, self.count_query_param)
+        )
+        signature = json.dumps([request.path, params], ensure_ascii=False)
+        digest = hashlib.md5(signature.encode("utf-8"), usedforsecurity=False).hexdigest()
+        generation = cache.get(f"{self.count_cache_prefix}:generation", "0")
+        return f"{self.count_cache_prefix}:{generation}:{digest}"
+
+    def _cache_ttl(self) -> int:
+        return getattr(settings, "HSCODE_COUNT_CACHE_TTL", 300)
+
+    def _planner_estimate(self, queryset) -> Optional[int]:
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+        except Exception:
+            return None
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        try:
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
@@ -1,3 +1,314 @@
-from django.test import TestCase
+import io
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook
+
+from core.testing import CODE_SIZES, QueryBudgetMixin, seed_catalogue
+from customs import changes, xlsx
+from customs.models import Heading, HSCode, HSCodeDeletion, ImportRun, Season
+from customs.views import HSCodeImportAPIView, _read_rows
+
+
+class HSCodeQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = self.make_user("reader")
+        self.client = self.client_for(self.user)
+
+    def test_pages_do_not_count_the_catalogue(self):
+        lists = (
+            "/api/hs-codes/",
+            "/api/hs-codes/?search=0101",
+            "/api/hs-codes/?suq=Kg&profit_min=1&profit_max=20",
+            "/api/hs-codes/?ordering=-priority&page_size=100",
+        )
+        counts = {}
+        for size in CODE_SIZES:
+            codes = seed_catalogue(size)
+            for label, url in [(url, url) for url in lists] + [("detail", f"/api/hs-codes/{codes[-1].pk}/")]:
+                # the page itself (LIMIT page_size + 1); no COUNT(*) over the table
+                queries, _ = self.capture(lambda: self.client.get(url))
+                self.assertFalse([q for q in queries if "COUNT(" in q], url)
+                counts.setdefault(label, {})[size] = len(queries)
+            # page_size below every size: a last page would know its count without COUNT(*)
+            queries, response = self.capture(lambda: self.client.get("/api/hs-codes/?search=goods&count=exact&page_size=5"))
+            self.assertEqual(response.data["count"], size)
+            counts.setdefault("count=exact", {})[size] = len(queries)
+        for label, by_size in counts.items():
+            self.assertConstantQueries(by_size, f"GET hs-codes/ [{label}]")
+            self.assertEqual(by_size[CODE_SIZES[0]], 2 if label == "count=exact" else 1, label)
+
+    def test_pagination_without_count(self):
+        seed_catalogue(120)
+        response = self.client.get("/api/hs-codes/?page_size=50")
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertIsNotNone(response.data["next"])
+        last = self.client.get("/api/hs-codes/?page_size=50&page=3")
+        self.assertEqual(len(last.data["results"]), 20)
+        self.assertIsNone(last.data["next"])
+        self.assertEqual(last.data["count"], 120)
+        self.assertFalse(last.data["count_is_estimate"])
+
+        # the cached count may predate another worker's writes: an estimate
+        first = self.client.get("/api/hs-codes/?page_size=50")
+        self.assertEqual((first.data["count"], first.data["count_is_estimate"]), (120, True))
+        self.client.delete(f"/api/hs-codes/{HSCode.objects.first().pk}/")
+        self.assertIsNone(self.client.get("/api/hs-codes/?page_size=50").data["count"])
+
+    def test_numeric_shadow_columns(self):
+        seed_catalogue(1)
+        obj = HSCode.objects.get()
+        obj.profit = "۱۲٪"
+        obj.import_duty_rate = "4.5 %"
+        obj.save()
+        obj.refresh_from_db()
+        self.assertEqual(str(obj.profit_value), "12.0000")
+        self.assertEqual(str(obj.import_duty_rate_value), "4.5000")
+        response = self.client.get("/api/hs-codes/?profit=12")
+        self.assertEqual([r["id"] for r in response.data["results"]], [obj.pk])
+
+
+class HSCodeImportTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = self.make_user("importer", is_staff=True)
+        self.client = self.client_for(self.admin)
+        self.codes = seed_catalogue(4)
+        self.errors_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(IMPORT_ERRORS_DIR=self.errors_dir))
+
+    def upload(self, lines, dry_run, **extra):
+        content = "\n".join(["code,goods_name_fa,goods_name_en,profit,customs_duty_rate,suq", *lines]).encode()
+        return self.client.post(
+            "/api/import/hscodes/",
+            {"file": SimpleUploadedFile("codes.csv", content), "dry_run": "true" if dry_run else "false", **extra},
+            format="multipart",
+        )
+
+    def test_dry_run_plans_without_writing(self):
+        same, changed = self.codes[0], self.codes[1]
+        lines = [
+            f"{same.code},{same.goods_name_fa},{same.goods_name_en},{same.profit},{same.customs_duty_rate},{same.SUQ}",
+            f"{changed.code},{changed.goods_name_fa},renamed,{changed.profit},{changed.customs_duty_rate},",
+            "01019999,کالای نو,new goods,10,5,Kg",
+            "01019999,کالای نو,new goods twice,10,5,Kg",
+            "01018888,کالا,bad suq,10,5,NOPE",
+            "55010000,کالا,unknown chapter,10,5,",
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            planned = self.upload(lines, dry_run=True)
+        self.assertEqual(planned.status_code, 207)
+        writes = [q["sql"] for q in ctx.captured_queries if not q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertEqual(writes, [])
+        self.assertEqual(HSCode.objects.count(), 4)
+
+        applied = self.upload(lines, dry_run=False)
+        for key in ("created", "updated", "unchanged", "skipped", "errors"):
+            self.assertEqual(planned.data[key], applied.data[key], key)
+        self.assertEqual(
+            (applied.data["created"], applied.data["updated"], applied.data["unchanged"], applied.data["errors"]),
+            (1, 1, 1, 3),
+        )
+        self.assertEqual(applied.data["error_counts"], {"duplicate_code": 1, "invalid_suq": 1, "season_not_found": 1})
+        self.assertIn({"row": 5, "code": "01019999", "error_type": "duplicate_code",
+                       "error": "Duplicate code; already in row 4"}, applied.data["row_errors"])
+        self.assertEqual(HSCode.objects.get(code=changed.code).goods_name_en, "renamed")
+        new = HSCode.objects.get(code="01019999")
+        self.assertEqual((new.goods_name_en, str(new.profit_value), new.season.code), ("new goods", "10.0000", "1"))
+
+    def test_import_command_matches_endpoint(self):
+        lines = [
+            f"{self.codes[1].code},{self.codes[1].goods_name_fa},renamed,10,5,",
+            "01019999,کالای نو,new goods,10,5,Kg",
+            "01018888,کالا,bad suq,10,5,NOPE",
+            "02010000,کالا,other chapter,4,,",
+        ]
+        planned = self.upload(lines, dry_run=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "codes.csv"
+            path.write_text("\n".join(["code,goods_name_fa,goods_name_en,profit,customs_duty_rate,suq", *lines]))
+            out = io.StringIO()
+            call_command("import_hscodes", str(path), workers=2, batch_size=1, stdout=out)
+        self.assertIn(
+            f"created {planned.data['created']}, updated {planned.data['updated']}, unchanged 0, "
+            f"skipped 0, errors {planned.data['errors']}",
+            out.getvalue(),
+        )
+        self.assertIn("row 4 01018888: Invalid SUQ", out.getvalue())
+        self.assertEqual(HSCode.objects.get(code=self.codes[1].code).goods_name_en, "renamed")
+
+    def test_error_report_download(self):
+        lines = [f"0101{i:04d},کالا,bad suq {i},10,5,NOPE" for i in range(300)]
+        response = self.upload(lines, dry_run=True)
+        self.assertEqual((response.data["errors"], len(response.data["row_errors"])), (300, 200))
+
+        download = self.client.get(response.data["error_report"])
+        self.assertEqual(download.status_code, 200)
+        report = b"".join(download.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(report), 301)
+        self.assertEqual(report[0], "row,code,error_type,error,code,goods_name_fa,goods_name_en,profit,customs_duty_rate,suq")
+        self.assertTrue(report[-1].startswith("301,01010299,invalid_suq,"))
+        self.assertTrue(report[-1].endswith(",01010299,کالا,bad suq 299,10,5,NOPE"))
+
+        self.assertEqual(self.client.get("/api/import/errors/../../settings/").status_code, 404)
+        reader = self.client_for(self.make_user("reader"))
+        self.assertEqual(reader.get(response.data["error_report"]).status_code, 403)
+
+    @override_settings(IMPORT_LOCK_WAIT=0)
+    def test_concurrent_import_is_queued(self):
+        running = ImportRun.objects.create(model_name="HSCode", file_sha256="0" * 64, status="running")
+        lines = ["01019999,کالای نو,new goods,10,5,Kg"]
+        queued = self.upload(lines, dry_run=False)
+        self.assertEqual(queued.status_code, 423)
+        self.assertEqual(queued.data["queue_position"], 1)
+        self.assertFalse(HSCode.objects.filter(code="01019999").exists())
+        status = self.client.get(f"/api/import/queue/?ticket={queued.data['ticket']}")
+        self.assertEqual(status.data["ticket"]["queue_position"], 1)
+
+        running.status = "done"
+        running.save()
+        applied = self.upload(lines, dry_run=False, ticket=queued.data["ticket"])
+        self.assertEqual((applied.status_code, applied.data["run"]), (200, queued.data["ticket"]))
+        self.assertEqual(ImportRun.objects.get(pk=applied.data["run"]).status, "done")
+
+    def test_failed_import_keeps_committed_chunks(self):
+        lines = [f"0101{i:04d},کالا,goods {i},10,5,Kg" for i in range(5)]
+        write_batch = HSCodeImportAPIView._write_batch
+        calls = []
+
+        def failing_third_batch(view, *args):
+            calls.append(1)
+            if len(calls) == 3:
+                raise OperationalError("connection lost")
+            return write_batch(view, *args)
+
+        with mock.patch.multiple(HSCodeImportAPIView, write_batch_size=1, commit_batch_size=1), \
+                mock.patch.object(HSCodeImportAPIView, "_write_batch", failing_third_batch), \
+                mock.patch("customs.views.record_import") as record_import:
+            failed = self.upload(lines, dry_run=False)
+        self.assertEqual(failed.status_code, 500)
+        record_import.assert_called_once()
+        self.assertEqual((failed.data["rows_committed"], failed.data["rows_planned"]), (2, 5))
+        self.assertEqual(HSCode.objects.filter(code__in=[f"0101{i:04d}" for i in range(5)]).count(), 2)
+
+        resumed = self.upload(lines, dry_run=False)
+        self.assertEqual(resumed.data["resumed_from"], {"run": failed.data["run"], "rows_committed": 2})
+        self.assertEqual((resumed.data["created"], resumed.data["unchanged"]), (3, 2))
+
+        # the command records a failed run the same way
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "codes.csv"
+            path.write_text("code,goods_name_fa,goods_name_en,profit\n01017777,کالا,goods,10", encoding="utf-8")
+            with mock.patch.object(HSCodeImportAPIView, "apply_plan", side_effect=OperationalError("connection lost")), \
+                    mock.patch("customs.bulk_import.record_import") as record_import, \
+                    self.assertRaises(CommandError):
+                call_command("import_hscodes", str(path), workers=1, stdout=io.StringIO())
+        record_import.assert_called_once()
+
+
+class HSCodeChangesTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = self.client_for(self.make_user("syncer"))
+        self.codes = seed_catalogue(4)
+
+    def poll(self, token, limit=500):
+        response = self.client.get("/api/hs-codes/changes/", {"since": token, "limit": limit})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_upserts_and_tombstones_since_token(self):
+        token = self.client.get("/api/hs-codes/changes/").data["token"]
+        self.assertEqual(self.poll(token)["upserts"], [])
+
+        changed, gone = self.codes[0], self.codes[1]
+        changed.goods_name_en = "renamed"
+        changed.save()
+        gone_id = gone.pk
+        gone.delete()
+        HSCode.objects.filter(pk=self.codes[2].pk).delete()
+
+        seen = []
+        while True:
+            page = self.poll(token, limit=1)
+            seen += [("u", u["id"]) for u in page["upserts"]] + [("d", d["id"]) for d in page["deleted"]]
+            token = page["token"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(seen, [("u", changed.pk), ("d", gone_id), ("d", self.codes[2].pk)])
+        caught_up = self.poll(token)
+        self.assertEqual((caught_up["upserts"], caught_up["deleted"], caught_up["has_more"]), ([], [], False))
+
+        # counter state, upserts, tombstones
+        for size in (1, 3):
+            queries, _ = self.capture(lambda: self.client.get("/api/hs-codes/changes/", {"since": "0", "limit": size}))
+            self.assertEqual(len(queries), 3, queries)
+
+    def test_season_and_heading_deletes_are_recorded(self):
+        token = self.client.get("/api/hs-codes/changes/").data["token"]
+        first, second = Season.objects.get(code="1"), Heading.objects.get(code="0201")
+        with CaptureQueriesContext(connection) as ctx:
+            first.delete()
+        # one tombstone INSERT for the whole cascade, not one per code
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "customs_hscodedeletion"')]
+        self.assertEqual(len(inserts), 1)
+        Heading.objects.filter(pk=second.pk).delete()
+
+        page = self.poll(token)
+        self.assertEqual(sorted(d["id"] for d in page["deleted"]), [self.codes[0].pk, self.codes[2].pk])
+        self.assertEqual(sorted(u["id"] for u in page["upserts"]), [self.codes[1].pk, self.codes[3].pk])
+        self.assertFalse(HSCode.objects.filter(heading__isnull=False).exists())
+
+    def test_bad_and_expired_tokens(self):
+        self.assertEqual(self.client.get("/api/hs-codes/changes/", {"since": "abc"}).status_code, 400)
+        # timestamp tokens from before the change counter are ahead of it
+        self.assertEqual(self.client.get("/api/hs-codes/changes/", {"since": "1760000000000000"}).status_code, 410)
+
+        self.codes[0].delete()
+        HSCodeDeletion.objects.update(deleted_at=timezone.now() - timedelta(days=2))
+        current = self.client.get("/api/hs-codes/changes/").data["token"]
+        with override_settings(HSCODE_CHANGES_RETENTION_DAYS=1), mock.patch.object(changes, "_last_prune", 0.0):
+            expired = self.client.get("/api/hs-codes/changes/", {"since": "0"})
+        self.assertEqual((expired.status_code, expired.data["token"]), (410, current))
+        self.assertFalse(HSCodeDeletion.objects.exists())
+        self.assertEqual(self.poll(current)["deleted"], [])
+
+
+class XLSXReaderTests(SimpleTestCase):
+    def workbook(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Code", "Goods Name FA", "Profit", "Rate", "Verified", "Date"])
+        ws.append(["01012100", "اسب زنده", 4, 15.5, True, datetime(2024, 3, 20)])
+        ws.append(["01012900", None, "26%", None, False, date(1900, 1, 15)])
+        ws.append([])
+        ws["C5"] = 7  # sparse row: leading cells missing
+        wb.create_sheet("ignored").append(["not read"])
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        buf.name = "codes.xlsx"
+        return buf
+
+    def test_fast_reader_matches_openpyxl(self):
+        fast = _read_rows(self.workbook(), "fast")
+        self.assertEqual(fast, _read_rows(self.workbook(), "openpyxl"))
+        self.assertEqual(fast[1][0]["profit"], 4)
+        self.assertEqual(fast[1][0]["date"], datetime(2024, 3, 20))
+
+    def test_unsupported_workbook_falls_back(self):
+        with self.assertRaises(xlsx.UnsupportedWorkbook):
+            list(xlsx.iter_rows(io.BytesIO(b"not a zip")))
+        # a workbook the streaming reader gives up on is read by openpyxl instead
+        unsupported = xlsx.UnsupportedWorkbook("not a transitional OOXML workbook")
+        with mock.patch("customs.xlsx._first_sheet_path", side_effect=unsupported) as first_sheet:
+            headers, rows = _read_rows(self.workbook(), "fast")
+        first_sheet.assert_called_once()
+        self.assertEqual((headers, rows), _read_rows(self.workbook(), "openpyxl"))
+        self.assertEqual(rows[0]["code"], "01012100")
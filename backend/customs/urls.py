@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
@@ -5,6 +6,9 @@ from .views import (
     SeasonImportAPIView,
     HeadingImportAPIView,
     HSCodeImportAPIView,
+    ImportErrorReportAPIView,
+    ImportQueueAPIView,
+    HSCodeChangesAPIView,
     HSCodeViewSet,
 )
 
@@ -16,7 +20,35 @@ urlpatterns = [
     path("import/seasons/", SeasonImportAPIView.as_view(), name="import-seasons"),
     path("import/headings/", HeadingImportAPIView.as_view(), name="import-headings"),
     path("import/hscodes/", HSCodeImportAPIView.as_view(), name="import-hscodes"),
+    path("import/errors/<str:token>/", ImportErrorReportAPIView.as_view(), name="import-errors"),
+    path("import/queue/", ImportQueueAPIView.as_view(), name="import-queue"),
+
+    # delta sync; before the router (and the async routes) so "changes" is not taken for a pk
+    path("hs-codes/changes/", HSCodeChangesAPIView.as_view(), name="hscode-changes"),
 
     # ViewSet endpoints
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from core.async_views import route_by_method
+    from .async_views import AsyncHSCodeDetailView, AsyncHSCodeListView
+
+    # matched before the router: GET/HEAD async, writes stay on HSCodeViewSet
+    urlpatterns[-1:-1] = [
+        path(
+            "hs-codes/",
+            route_by_method(AsyncHSCodeListView.as_view(), HSCodeViewSet.as_view({"get": "list", "post": "create"})),
+            name="hscode-list",
+        ),
+        path(
+            "hs-codes/<str:pk>/",
+            route_by_method(
+                AsyncHSCodeDetailView.as_view(),
+                HSCodeViewSet.as_view({
+                    "get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy",
+                }),
+            ),
+            name="hscode-detail",
+        ),
+    ]
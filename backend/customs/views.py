@@ -1,34 +1,38 @@
-# app/views.py
 from __future__ import annotations
 
 import csv
 import io
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
-from .filters import HSCodeFilter  # Import the filter set
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from django.db import transaction
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, models, transaction
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework import viewsets, status, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAdminUser
-from .serializers import HSCodeSerializer
 from openpyxl import load_workbook
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Season, Heading, HSCode
+from core.metrics import record_import
+
+from .filters import HSCodeFilter, HSCodeOrderingFilter
+from .serializers import HSCodeSerializer
+from .pagination import LeanPageNumberPagination, invalidate_counts
+from . import changes, import_lock, xlsx
+from .import_errors import ImportErrorLog, report_path
+from .models import ChangeSequence, Season, Heading, HSCode, ImportRun, parse_rate
 
 
 # ----------------------------
 # Helpers
 # ----------------------------
-class CustomPageNumberPagination(PageNumberPagination):
-    page_size = 50
-    page_size_query_param = 'page_size'
-    max_page_size = 600
 def _norm_header(h: str) -> str:
     # normalize header names like "Season Code" -> "season_code"
     return slugify(str(h or "")).replace("-", "_").strip().lower()
@@ -48,10 +52,45 @@ def _to_int_or_none(v: Any) -> Optional[int]:
     except ValueError:
         return None
 
-def _read_rows(file_obj) -> Tuple[List[str], List[Dict[str, Any]]]:
+def _column(rows: List[Dict[str, Any]], name: str) -> List[Any]:
+    return [r.get(name) for r in rows]
+
+def _clean_column(values: List[Any]) -> List[str]:
+    # _clean_str over a whole column
+    return ["" if v is None else str(v).strip() for v in values]
+
+def _map_distinct(fn, values: List[Any]) -> List[Any]:
+    # for low-cardinality columns (rates, priorities): parse each distinct value once
+    parsed = {v: fn(v) for v in set(values)}
+    return [parsed[v] for v in values]
+
+XLSX_READERS = ("fast", "openpyxl")
+
+
+def _rows_to_dicts(rows_iter) -> Tuple[List[str], List[Dict[str, Any]]]:
+    try:
+        first = next(rows_iter)
+    except StopIteration:
+        return [], []
+
+    headers = [_norm_header(h) for h in first]
+    data_rows = []
+    for r in rows_iter:
+        if r is None:
+            continue
+        if not any(_clean_str(x) for x in r):
+            continue
+        row = {headers[i]: (r[i] if i < len(r) else "") for i in range(len(headers))}
+        data_rows.append(row)
+    return headers, data_rows
+
+
+def _read_rows(file_obj, reader: str = "fast") -> Tuple[List[str], List[Dict[str, Any]]]:
     """
     Returns (headers, rows_as_dicts)
     Supports .csv and .xlsx (first sheet)
+    reader: "fast" (customs.xlsx, streaming; falls back to openpyxl on
+    workbooks it cannot handle) or "openpyxl"
     """
     name = (getattr(file_obj, "name", "") or "").lower()
 
@@ -60,77 +99,98 @@ def _read_rows(file_obj) -> Tuple[List[str], List[Dict[str, Any]]]:
         # handle utf-8 with possible BOM
         text = raw.decode("utf-8-sig", errors="replace")
         f = io.StringIO(text)
-        reader = csv.reader(f)
-        all_rows = list(reader)
-        if not all_rows:
-            return [], []
-
-        headers = [_norm_header(h) for h in all_rows[0]]
-        data_rows = []
-        for r in all_rows[1:]:
-            if not any(_clean_str(x) for x in r):
-                continue
-            row = {headers[i]: (r[i] if i < len(r) else "") for i in range(len(headers))}
-            data_rows.append(row)
-        return headers, data_rows
+        return _rows_to_dicts(csv.reader(f))
 
     if name.endswith(".xlsx"):
-        wb = load_workbook(filename=file_obj, read_only=True, data_only=True)
-        ws = wb.worksheets[0]
-        rows_iter = ws.iter_rows(values_only=True)
+        return _read_xlsx(file_obj, reader)
+
+    raise ValueError("Unsupported file type. Upload .csv or .xlsx")
+
 
+def _read_xlsx(file_obj, reader: str = "fast") -> Tuple[List[str], List[Dict[str, Any]]]:
+    if reader == "fast":
         try:
-            first = next(rows_iter)
-        except StopIteration:
-            return [], []
-
-        headers = [_norm_header(h) for h in first]
-        data_rows = []
-        for r in rows_iter:
-            if r is None:
-                continue
-            if not any(_clean_str(x) for x in r):
-                continue
-            row = {headers[i]: (r[i] if i < len(r) else "") for i in range(len(headers))}
-            data_rows.append(row)
-        return headers, data_rows
+            return _rows_to_dicts(xlsx.iter_rows(file_obj))
+        except xlsx.UnsupportedWorkbook:
+            file_obj.seek(0)
 
-    raise ValueError("Unsupported file type. Upload .csv or .xlsx")
+    wb = load_workbook(filename=file_obj, read_only=True, data_only=True)
+    try:
+        return _rows_to_dicts(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
 
 
 @dataclass
 class ImportReport:
     created: int = 0
     updated: int = 0
+    unchanged: int = 0
     skipped: int = 0
     errors: int = 0
-    row_errors: List[Dict[str, Any]] = None
+    row_errors: List[Dict[str, Any]] = None  # the first max_samples errors; error_log gets all of them
+    error_counts: Dict[str, int] = None  # by error type
+    error_log: Optional[ImportErrorLog] = None
+    max_samples: Optional[int] = 200  # None keeps every error in memory (worker-side reports)
 
     def __post_init__(self):
         if self.row_errors is None:
             self.row_errors = []
+        if self.error_counts is None:
+            self.error_counts = {}
+
+    def error(self, row: int, code: str, message: str, kind: str = "invalid") -> None:
+        self.errors += 1
+        self.error_counts[kind] = self.error_counts.get(kind, 0) + 1
+        if self.max_samples is None or len(self.row_errors) < self.max_samples:
+            self.row_errors.append({"row": row, "code": code, "error_type": kind, "error": message})
+        if self.error_log is not None:
+            self.error_log.write(row, code, kind, message)
+
+
+@dataclass
+class RowPlan:
+    row: int
+    code: str
+    action: str  # "create" | "update" | "unchanged"
+    values: Dict[str, Any]
+    pk: Optional[int] = None
 
 
 class BaseImportAPIView(APIView):
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsAdminUser]  # change if you want
     model_name: str = "UNKNOWN"
+    model = None
     required_columns: List[str] = []
+    import_fields: List[str] = []  # attnames written by the import (besides code)
+    validation_batch_size = 5000
+    lookup_batch_size = 500  # codes per SELECT ... WHERE code IN (...) (SQLite allows 999 params)
+    write_batch_size = 500
+    commit_batch_size: Optional[int] = None  # rows per transaction; None: settings.IMPORT_COMMIT_ROWS
 
     def post(self, request, *args, **kwargs):
         """
         Form-data:
           - file: CSV/XLSX
           - dry_run: "true"/"false" (optional, default false)
+          - reader: "fast"/"openpyxl" for .xlsx (optional, default IMPORT_XLSX_READER)
+          - ticket: the ticket of an earlier 423 response, to keep its place in the import queue
         """
         upload = request.FILES.get("file")
         if not upload:
             return Response({"detail": "file is required (csv/xlsx)."}, status=status.HTTP_400_BAD_REQUEST)
 
         dry_run = str(request.data.get("dry_run", "false")).lower() in ("1", "true", "yes", "y")
+        reader = str(request.data.get("reader") or settings.IMPORT_XLSX_READER).lower()
+        if reader not in XLSX_READERS:
+            return Response(
+                {"detail": f"reader must be one of {list(XLSX_READERS)}."}, status=status.HTTP_400_BAD_REQUEST,
+            )
 
         try:
-            headers, rows = _read_rows(upload)
+            sha256 = None if dry_run else import_lock.file_sha256(upload)
+            headers, rows = _read_rows(upload, reader)
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -145,12 +205,60 @@ class BaseImportAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        report = ImportReport()
-        # Validate + upsert inside a transaction; if dry_run we rollback
-        with transaction.atomic():
-            self.process_rows(rows, report)
-            if dry_run:
-                transaction.set_rollback(True)
+        run = resumed = None
+        if not dry_run:
+            # one writing import at a time; planning happens under the lock so the plan stays current
+            run = import_lock.enqueue(self.model_name, upload.name, sha256, request.user, request.data.get("ticket"))
+            if not import_lock.acquire(run, settings.IMPORT_LOCK_WAIT):
+                return Response(
+                    {
+                        "detail": "Another import is running. Send the file again with this ticket to keep your place.",
+                        "ticket": run.pk,
+                        "queue_position": import_lock.queue_position(run),
+                    },
+                    status=status.HTTP_423_LOCKED,
+                    headers={"Retry-After": "5"},
+                )
+            resumed = import_lock.previous_failure(run)
+
+        # every row error streams to an on-disk CSV; the response carries counts and a sample
+        report = ImportReport(error_log=ImportErrorLog(rows, headers, self.model_name))
+        started = time.perf_counter()
+        try:
+            with report.error_log:
+                # plan with bulk reads only (no writes, no row locks); a dry run stops there
+                plan = self.plan_rows(rows, report)
+                if run is not None:
+                    self.apply_plan(plan, report, run)
+        except DatabaseError as e:
+            if run is None:
+                raise
+            import_lock.release(run, "failed", str(e))
+            record_import(self.model_name, report, len(rows), time.perf_counter() - started, dry_run)
+            return Response(
+                {
+                    "detail": "Import stopped by a database error. Committed chunks were kept; "
+                              "send the same file again to write the rest.",
+                    "error": str(e),
+                    "run": run.pk,
+                    "rows_planned": run.rows_planned,
+                    "rows_committed": run.rows_committed,
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except BaseException as e:
+            if run is not None:
+                import_lock.release(run, "failed", repr(e))
+            raise
+        if run is not None:
+            import_lock.release(run, "done")
+        record_import(self.model_name, report, len(rows), time.perf_counter() - started, dry_run)
+
+        error_report = None
+        if report.error_log.written:
+            error_report = request.build_absolute_uri(
+                reverse("import-errors", kwargs={"token": report.error_log.token})
+            )
 
         return Response(
             {
@@ -159,16 +267,251 @@ class BaseImportAPIView(APIView):
                 "total_rows": len(rows),
                 "created": report.created,
                 "updated": report.updated,
+                "unchanged": report.unchanged,
                 "skipped": report.skipped,
                 "errors": report.errors,
-                "row_errors": report.row_errors[:200],  # limit payload
+                "error_counts": report.error_counts,
+                "row_errors": report.row_errors,  # first ImportReport.max_samples
+                "error_report": error_report,  # CSV with every error and its original cells
+                "run": run.pk if run else None,
+                # an earlier failed import of this file; its committed rows now count as unchanged
+                "resumed_from": {"run": resumed.pk, "rows_committed": resumed.rows_committed} if resumed else None,
             },
             status=status.HTTP_200_OK if report.errors == 0 else status.HTTP_207_MULTI_STATUS,
         )
 
-    def process_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> None:
+    def load_lookups(self) -> Dict[str, Any]:
+        """Reference data for clean_batch (e.g. season ids by code), loaded once per import."""
+        return {}
+
+    def clean_batch(
+        self, batch: List[Dict[str, Any]], first_row: int, lookups: Dict[str, Any], report: ImportReport
+    ) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """Validate one batch; returns (row number, code, field values by attname) for the good rows."""
         raise NotImplementedError
 
+    def clean_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> Iterator[List[Tuple[int, str, Dict[str, Any]]]]:
+        """Yields validated batches of validation_batch_size rows."""
+        lookups = self.load_lookups()
+        for start in range(0, len(rows), self.validation_batch_size):
+            batch = rows[start:start + self.validation_batch_size]
+            yield self.check_lengths(self.clean_batch(batch, start + 2, lookups, report), report)  # header is row 1
+
+    def check_lengths(
+        self, batch: List[Tuple[int, str, Dict[str, Any]]], report: ImportReport
+    ) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """Drops cleaned rows with a value longer than its CharField's max_length."""
+        limits = {
+            f.attname: f.max_length
+            for f in self.model._meta.concrete_fields
+            if isinstance(f, models.CharField) and f.max_length
+        }
+        cleaned = []
+        for idx, code, values in batch:
+            too_long = [k for k, v in {"code": code, **values}.items()
+                        if isinstance(v, str) and k in limits and len(v) > limits[k]]
+            if too_long:
+                report.error(idx, code, f"Value too long for: {too_long}", "value_too_long")
+                continue
+            cleaned.append((idx, code, values))
+        return cleaned
+
+    def write_values(self) -> Dict[str, Any]:
+        """
+        Extra values stamped on every written row (bulk writes bypass auto_now
+        and the HSCode change numbering); called inside each chunk's transaction.
+        """
+        return {}
+
+    def plan_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> List[RowPlan]:
+        """
+        Classify every row as create / update / unchanged / error against the
+        current table, loaded in bulk. Read-only: used as-is for dry runs.
+        One RowPlan per code; later rows repeating a code are duplicate_code errors.
+        """
+        return self.plan_batches(self.clean_rows(rows, report), report)
+
+    def plan_batches(self, batches, report: ImportReport) -> List[RowPlan]:
+        """plan_rows for batches already validated (the import_* commands validate in worker processes)."""
+        existing: Dict[str, Dict[str, Any]] = {}
+        first_row: Dict[str, int] = {}  # code -> row that planned it
+        planned: List[RowPlan] = []
+
+        for cleaned in batches:
+            codes = list({code for _, code, _ in cleaned if code not in first_row})
+            for i in range(0, len(codes), self.lookup_batch_size):
+                chunk = codes[i:i + self.lookup_batch_size]
+                for rec in self.model.objects.filter(code__in=chunk).values("pk", "code", *self.import_fields):
+                    existing[rec["code"]] = rec
+
+            for idx, code, values in cleaned:
+                first = first_row.setdefault(code, idx)
+                if first != idx:
+                    # counted once: which copy should win is the file author's call
+                    report.error(idx, code, f"Duplicate code; already in row {first}", "duplicate_code")
+                    continue
+                current = existing.get(code)
+                if current is None:
+                    planned.append(RowPlan(idx, code, "create", dict(values)))
+                    report.created += 1
+                    continue
+                changed = {k: v for k, v in values.items() if current.get(k) != v}
+                if not changed:
+                    report.unchanged += 1
+                    continue
+                # full row for the UPDATE; fields absent from the file keep their value
+                row = {k: current[k] for k in self.import_fields}
+                row.update(changed)
+                planned.append(RowPlan(idx, code, "update", row, current["pk"]))
+                report.updated += 1
+        return planned
+
+    def apply_plan(self, plan: List[RowPlan], report: ImportReport, run: Optional[ImportRun] = None) -> None:
+        """
+        Writes the plan in transactions of about commit_batch_size rows
+        (IMPORT_COMMIT_ROWS), so a failure keeps every chunk committed before
+        it. With a run, its checkpoint is saved in the same transaction as
+        the rows it covers.
+        """
+        creates = [p for p in plan if p.action == "create"]
+        updates = [p for p in plan if p.action == "update"]
+        size = self.write_batch_size
+        batches = [creates[i:i + size] for i in range(0, len(creates), size)]
+        batches += [updates[i:i + size] for i in range(0, len(updates), size)]
+        per_commit = max(1, (self.commit_batch_size or settings.IMPORT_COMMIT_ROWS) // size)
+
+        if run is not None:
+            run.rows_planned = len(plan)
+            ImportRun.objects.filter(pk=run.pk).update(rows_planned=run.rows_planned, rows_committed=0)
+        committed = 0
+        try:
+            for start in range(0, len(batches), per_commit):
+                with transaction.atomic():
+                    # stamped per chunk, inside the transaction that commits it (hs-codes/changes/ relies on that)
+                    stamp = self.write_values()
+                    for batch in batches[start:start + per_commit]:
+                        self._write_batch(batch, stamp, report)
+                        committed += len(batch)
+                    if run is not None:
+                        import_lock.checkpoint(run, committed)
+        finally:
+            if committed:
+                invalidate_counts()
+
+    # Writes are plain parameterized INSERT / UPDATE statements run with
+    # executemany: bulk_create / bulk_update spend most of their time compiling
+    # SQL (bulk_update's CASE WHEN per field is ~25x slower), see
+    # benchmarks/import_pipeline.py.
+    def _insert_rows(self, batch: List[RowPlan], stamp: Dict[str, Any]) -> None:
+        meta = self.model._meta
+        columns = [f for f in meta.concrete_fields if not f.primary_key]
+        qn = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(meta.db_table), ", ".join(qn(f.column) for f in columns), ", ".join(["%s"] * len(columns)),
+        )
+        # model instances fill in field defaults (e.g. SUQ) for columns the file lacks
+        rows = [self.model(code=p.code, **p.values, **stamp) for p in batch]
+        self._executemany(sql, columns, [{f.attname: getattr(obj, f.attname) for f in columns} for obj in rows])
+
+    def _update_rows(self, batch: List[RowPlan], stamp: Dict[str, Any]) -> None:
+        meta = self.model._meta
+        columns = [meta.get_field(name) for name in sorted(set(self.import_fields) | set(stamp))]
+        qn = connection.ops.quote_name
+        sql = "UPDATE {} SET {} WHERE {} = %s".format(
+            qn(meta.db_table), ", ".join(f"{qn(f.column)} = %s" for f in columns), qn(meta.pk.column),
+        )
+        self._executemany(sql, [*columns, meta.pk], [{**p.values, **stamp, meta.pk.attname: p.pk} for p in batch])
+
+    def _executemany(self, sql: str, columns, rows: List[Dict[str, Any]]) -> None:
+        # prepare each distinct value once per column (timestamps, decimals repeat a lot)
+        prepared = [{} for _ in columns]
+        params = []
+        for values in rows:
+            row = []
+            for f, cache in zip(columns, prepared):
+                value = values[f.attname]
+                try:
+                    row.append(cache[value])
+                except KeyError:
+                    row.append(cache.setdefault(value, f.get_db_prep_save(value, connection)))
+            params.append(row)
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+    def _write_batch(self, batch: List[RowPlan], stamp: Dict[str, Any], report: ImportReport) -> None:
+        try:
+            with transaction.atomic():
+                if batch[0].action == "create":
+                    self._insert_rows(batch, stamp)
+                else:
+                    self._update_rows(batch, stamp)
+            return
+        except IntegrityError:
+            pass  # e.g. a code created concurrently since planning; redo this batch row by row
+        for p in batch:
+            try:
+                with transaction.atomic():
+                    self.model.objects.update_or_create(code=p.code, defaults={**p.values, **stamp})
+            except Exception as e:
+                if p.action == "create":
+                    report.created -= 1
+                else:
+                    report.updated -= 1
+                report.error(p.row, p.code, str(e), "write_failed")
+
+
+class ImportQueueAPIView(APIView):
+    """
+    GET import/queue/: the running import and the callers waiting behind it.
+    ?ticket=<id> adds that ticket's status and queue_position.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        runs = list(import_lock.live_runs().select_related("requested_by").order_by("pk"))
+        data = {
+            "queue": [
+                {
+                    "ticket": r.pk,
+                    "model": r.model_name,
+                    "file": r.file_name,
+                    "status": r.status,
+                    "position": i,
+                    "requested_by": getattr(r.requested_by, "username", None),
+                    "rows_planned": r.rows_planned,
+                    "rows_committed": r.rows_committed,
+                    "created_at": r.created_at,
+                }
+                for i, r in enumerate(runs)
+            ],
+        }
+        ticket = request.query_params.get("ticket")
+        if ticket:
+            run = ImportRun.objects.filter(pk=ticket).first() if ticket.isdigit() else None
+            if run is None:
+                return Response({"detail": "Unknown ticket."}, status=status.HTTP_404_NOT_FOUND)
+            data["ticket"] = {
+                "ticket": run.pk,
+                "status": run.status,
+                "queue_position": import_lock.queue_position(run) if run.status in ("queued", "running") else None,
+                "rows_planned": run.rows_planned,
+                "rows_committed": run.rows_committed,
+            }
+        return Response(data)
+
+
+class ImportErrorReportAPIView(APIView):
+    """GET import/errors/<token>/: the full error CSV of an import (see customs.import_errors)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, token):
+        path = report_path(token)
+        if path is None:
+            return Response({"detail": "Error report not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            open(path, "rb"), as_attachment=True, filename=f"import-errors-{token[:8]}.csv", content_type="text/csv",
+        )
+
 
 # ----------------------------
 # Season Import
@@ -176,29 +519,25 @@ class BaseImportAPIView(APIView):
 
 class SeasonImportAPIView(BaseImportAPIView):
     model_name = "Season"
+    model = Season
     required_columns = ["code"]
+    import_fields = ["description", "season_notes"]
+
+    def clean_batch(self, batch, first_row, lookups, report):
+        codes = _clean_column(_column(batch, "code"))
+        descriptions = _clean_column(_column(batch, "description"))
+        notes = _clean_column(_column(batch, "season_notes"))
 
-    def process_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> None:
-        for idx, r in enumerate(rows, start=2):  # header is row 1
-            code = _clean_str(r.get("code"))
+        cleaned = []
+        for i, code in enumerate(codes):
             if not code:
                 report.skipped += 1
                 continue
-
-            defaults = {
-                "description": _clean_str(r.get("description")) or None,
-                "season_notes": _clean_str(r.get("season_notes")) or None,
-            }
-
-            try:
-                obj, created = Season.objects.update_or_create(code=code, defaults=defaults)
-                if created:
-                    report.created += 1
-                else:
-                    report.updated += 1
-            except Exception as e:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": str(e)})
+            cleaned.append((first_row + i, code, {
+                "description": descriptions[i] or None,
+                "season_notes": notes[i] or None,
+            }))
+        return cleaned
 
 
 # ----------------------------
@@ -207,40 +546,38 @@ class SeasonImportAPIView(BaseImportAPIView):
 
 class HeadingImportAPIView(BaseImportAPIView):
     model_name = "Heading"
+    model = Heading
     required_columns = ["code", "season_code"]
+    import_fields = ["season_id", "description", "heading_notes"]
 
-    def process_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> None:
-        # cache seasons by code for speed
-        season_map = {s.code: s for s in Season.objects.all().only("id", "code")}
+    def load_lookups(self) -> Dict[str, Any]:
+        return {"seasons": dict(Season.objects.values_list("code", "id"))}
 
-        for idx, r in enumerate(rows, start=2):
-            code = _clean_str(r.get("code"))
-            season_code = _clean_str(r.get("season_code"))
+    def clean_batch(self, batch, first_row, lookups, report):
+        season_ids = lookups["seasons"]
+        codes = _clean_column(_column(batch, "code"))
+        season_codes = _clean_column(_column(batch, "season_code"))
+        descriptions = _clean_column(_column(batch, "description"))
+        notes = _clean_column(_column(batch, "heading_notes"))
+
+        cleaned = []
+        for i, code in enumerate(codes):
+            season_code = season_codes[i]
             if not code or not season_code:
                 report.skipped += 1
                 continue
 
-            season = season_map.get(season_code)
-            if not season:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": f"season_code '{season_code}' not found"})
+            season_id = season_ids.get(season_code)
+            if not season_id:
+                report.error(first_row + i, code, f"season_code '{season_code}' not found", "season_not_found")
                 continue
 
-            defaults = {
-                "season": season,
-                "description": _clean_str(r.get("description")) or None,
-                "heading_notes": _clean_str(r.get("heading_notes")) or None,
-            }
-
-            try:
-                obj, created = Heading.objects.update_or_create(code=code, defaults=defaults)
-                if created:
-                    report.created += 1
-                else:
-                    report.updated += 1
-            except Exception as e:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": str(e)})
+            cleaned.append((first_row + i, code, {
+                "season_id": season_id,
+                "description": descriptions[i] or None,
+                "heading_notes": notes[i] or None,
+            }))
+        return cleaned
 
 
 # ----------------------------
@@ -267,87 +604,157 @@ def derive_heading_code_from_hs(code: str) -> str | None:
 
 class HSCodeImportAPIView(BaseImportAPIView):
     model_name = "HSCode"
+    model = HSCode
     required_columns = ["code", "goods_name_fa", "goods_name_en", "profit"]  # removed season_code
-
-    def process_rows(self, rows: List[Dict[str, Any]], report: ImportReport) -> None:
-        season_map = {s.code: s for s in Season.objects.all().only("id", "code")}
-        heading_map = {h.code: h for h in Heading.objects.all().only("id", "code")}
-
-        allowed_suq = {k for (k, _label) in HSCode.SUQ_OPTIONS}
-
-        for idx, r in enumerate(rows, start=2):
-            code = _clean_str(r.get("code"))
+    import_fields = [
+        "goods_name_fa", "goods_name_en", "profit", "customs_duty_rate", "import_duty_rate", "priority",
+        "SUQ", "season_id", "heading_id", "profit_value", "import_duty_rate_value",
+    ]
+
+    def write_values(self) -> Dict[str, Any]:
+        return {"updated_date": timezone.now(), "change_seq": ChangeSequence.allocate()}
+
+    def load_lookups(self) -> Dict[str, Any]:
+        return {
+            "seasons": dict(Season.objects.values_list("code", "id")),
+            "headings": dict(Heading.objects.values_list("code", "id")),
+            "suq": {k for (k, _label) in HSCode.SUQ_OPTIONS},
+        }
+
+    def clean_batch(self, batch, first_row, lookups, report):
+        # column by column: each cell is normalized once, repeated values
+        # (rates, SUQ, chapter / heading prefixes) are parsed once per batch
+        codes = _clean_column(_column(batch, "code"))
+        names_fa = _clean_column(_column(batch, "goods_name_fa"))
+        names_en = _clean_column(_column(batch, "goods_name_en"))
+        profits = _clean_column(_column(batch, "profit"))
+        import_rates = [v or None for v in _clean_column(_column(batch, "import_duty_rate"))]
+        suqs = [v or None for v in _clean_column(_column(batch, "suq"))]
+        duty_rates = _map_distinct(_to_int_or_none, _column(batch, "customs_duty_rate"))
+        priorities = _map_distinct(_to_int_or_none, _column(batch, "priority"))
+        profit_values = _map_distinct(parse_rate, profits)
+        import_rate_values = _map_distinct(parse_rate, import_rates)
+
+        # ---- derive season + heading from HS code, per distinct prefix ----
+        season_ids, heading_ids = lookups["seasons"], lookups["headings"]
+        season_codes = {p: derive_season_code_from_hs(p) for p in {c[:2] for c in codes}}
+        heading_by_prefix = {p: heading_ids.get(derive_heading_code_from_hs(p)) for p in {c[:4] for c in codes}}
+        allowed_suq = lookups["suq"]
+
+        cleaned = []
+        for i, code in enumerate(codes):
+            idx = first_row + i
             if not code:
                 report.skipped += 1
                 continue
 
-            # ---- derive season + heading from HS code ----
-            derived_season_code = derive_season_code_from_hs(code)
+            derived_season_code = season_codes[code[:2]]
             if not derived_season_code:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": "Invalid HS code for season derivation"})
+                report.error(idx, code, "Invalid HS code for season derivation", "invalid_code")
                 continue
 
-            season = season_map.get(derived_season_code)
-            if not season:
-                report.errors += 1
-                report.row_errors.append(
-                    {"row": idx, "code": code, "error": f"Derived season_code '{derived_season_code}' not found"}
-                )
+            season_id = season_ids.get(derived_season_code)
+            if not season_id:
+                report.error(idx, code, f"Derived season_code '{derived_season_code}' not found", "season_not_found")
                 continue
 
-            derived_heading_code = derive_heading_code_from_hs(code)
-            heading = None
-            if derived_heading_code:
-                heading = heading_map.get(derived_heading_code)  # ok if None
-
-
             # ---- SUQ validation (unchanged) ----
-            suq = _clean_str(r.get("suq") or r.get("SUQ"))
-            if suq == "":
-                suq = None
+            suq = suqs[i]
             if suq is not None and suq not in allowed_suq:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": f"Invalid SUQ '{suq}'. Allowed: {sorted(allowed_suq)}"})
+                report.error(idx, code, f"Invalid SUQ '{suq}'. Allowed: {sorted(allowed_suq)}", "invalid_suq")
                 continue
 
-            defaults = {
-                "goods_name_fa": _clean_str(r.get("goods_name_fa")),
-                "goods_name_en": _clean_str(r.get("goods_name_en")),
-                "profit": _clean_str(r.get("profit")),
-                "customs_duty_rate": _to_int_or_none(r.get("customs_duty_rate")),
-                "import_duty_rate": _clean_str(r.get("import_duty_rate")) or None,
-                "priority": _to_int_or_none(r.get("priority")),
-                "season": season,
-                "heading": heading,
-            }
-            if suq is not None:
-                defaults["SUQ"] = suq
-
-            missing_required = [k for k in ("goods_name_fa", "goods_name_en", "profit") if not defaults.get(k)]
+            missing_required = [
+                k for k, col in (("goods_name_fa", names_fa), ("goods_name_en", names_en), ("profit", profits))
+                if not col[i]
+            ]
             if missing_required:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": f"Missing required values: {missing_required}"})
+                report.error(idx, code, f"Missing required values: {missing_required}", "missing_values")
                 continue
 
-            try:
-                obj, created = HSCode.objects.update_or_create(code=code, defaults=defaults)
-                report.created += int(created)
-                report.updated += int(not created)
-            except Exception as e:
-                report.errors += 1
-                report.row_errors.append({"row": idx, "code": code, "error": str(e)})
+            values = {
+                "goods_name_fa": names_fa[i],
+                "goods_name_en": names_en[i],
+                "profit": profits[i],
+                "customs_duty_rate": duty_rates[i],
+                "import_duty_rate": import_rates[i],
+                "priority": priorities[i],
+                "season_id": season_id,
+                "heading_id": heading_by_prefix[code[:4]],  # ok if None
+                # numeric shadows (HSCode.sync_numeric_fields), compared and written like any column
+                "profit_value": profit_values[i],
+                "import_duty_rate_value": import_rate_values[i],
+            }
+            if suq is not None:
+                values["SUQ"] = suq
+            cleaned.append((idx, code, values))
+        return cleaned
 
 class HSCodeViewSet(viewsets.ModelViewSet):
     """
     A ViewSet for managing HSCode objects.
     Provides list, retrieve, create, update, and delete functionality.
     """
-    queryset = HSCode.objects.all().order_by("id")
+    # default order follows HSCode.Meta.ordering (-code) so every supported
+    # filter can be served by its (column, code) index without a sort step
+    queryset = HSCode.objects.all()
     serializer_class = HSCodeSerializer
-    pagination_class = CustomPageNumberPagination  # Apply pagination here
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = LeanPageNumberPagination  # no COUNT(*) per keystroke; see customs/pagination.py
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, HSCodeOrderingFilter]
     filterset_class = HSCodeFilter
+    ordering_fields = ["code", "priority", "customs_duty_rate", "profit_value", "import_duty_rate_value"]
+    ordering = ["-code"]
     search_fields = ["code", "goods_name_fa", "goods_name_en","heading__description","season__description"]
 
+    # cached list counts (customs/pagination.py) are per filter signature; any write starts over
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_counts()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_counts()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_counts()
+
+
+class HSCodeChangesAPIView(APIView):
+    """
+    GET hs-codes/changes/?since=<token>&limit=500
+    Upserts and deletions since the token, oldest first (see customs.changes).
+    Without `since` it only returns a starting token: take it, page through
+    hs-codes/ for the full catalogue, then poll with it. 410 means the token
+    is older than the tombstone retention and the client must resync.
+    """
+    max_limit = 5000
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        try:
+            limit = min(max(int(request.query_params.get("limit", 500)), 1), self.max_limit)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        changes.prune_deletions()
+        current = changes.state()
+        if not since:
+            return Response({"token": changes.encode(current[0]), "has_more": False, "upserts": [], "deleted": []})
+        try:
+            cursor = changes.decode(since)
+        except changes.TokenError:
+            return Response({"detail": "Invalid change token."}, status=status.HTTP_400_BAD_REQUEST)
+        if changes.expired(cursor, current):
+            return Response(
+                {"detail": "Change token expired; resync the full catalogue.", "token": changes.encode(current[0])},
+                status=status.HTTP_410_GONE,
+            )
 
+        page = changes.changes(cursor, limit, until=current[0])
+        return Response({
+            "token": page["token"],
+            "has_more": page["has_more"],
+            "upserts": HSCodeSerializer(page["upserts"], many=True).data,
+            "deleted": [{"id": t.hscode_id, "code": t.code, "deleted_at": t.deleted_at} for t in page["deleted"]],
+        })
@@ -0,0 +1,277 @@
+"""
+Streaming XLSX reader for the import endpoints.
+
+Parses the first worksheet with an expat state machine and yields each row as a
+plain tuple, resolving the shared-strings table, inline strings, booleans,
+numbers (int / float like openpyxl) and date-formatted cells (datetime). No
+cell objects are built and parsed rows are discarded as we go, so memory
+stays flat apart from the shared-strings list.
+
+Anything it does not understand (strict OOXML, missing parts, broken XML)
+raises UnsupportedWorkbook; callers fall back to openpyxl. Benchmark:
+benchmarks/xlsx_reader.py.
+"""
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Set
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+TEXT, RUN = f"{NS}t", f"{NS}r"
+# expat's namespace_separator=" " names, used by the worksheet parser
+_EXPAT_NS = NS[1:-1] + " "
+WORKSHEET, DIMENSION, ROW, CELL, VALUE, INLINE_TEXT, PHONETIC = (
+    _EXPAT_NS + t for t in ("worksheet", "dimension", "row", "c", "v", "t", "rPh")
+)
+CHUNK_SIZE = 64 * 1024
+
+# built-in number formats that display dates / times
+BUILTIN_DATE_FORMATS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_COLUMN = re.compile(r"[A-Z]+")
+
+
+class UnsupportedWorkbook(Exception):
+    pass
+
+
+_column_cache: Dict[str, int] = {}
+
+
+def _column_index(ref: str) -> int:
+    letters = ref.rstrip("0123456789")
+    try:
+        return _column_cache[letters]
+    except KeyError:
+        pass
+    if not _COLUMN.fullmatch(letters):
+        raise UnsupportedWorkbook(f"bad cell reference {ref!r}")
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    _column_cache[letters] = index - 1
+    return index - 1
+
+
+def _text(si) -> str:
+    # plain <t>, or rich-text runs <r><t>; phonetic hints (<rPh>) are skipped
+    parts = []
+    for child in si:
+        if child.tag == TEXT:
+            parts.append(child.text or "")
+        elif child.tag == RUN:
+            t = child.find(TEXT)
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+def _first_sheet_path(zf: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    if not workbook.tag.startswith(NS):
+        raise UnsupportedWorkbook("not a transitional OOXML workbook")
+    sheet = workbook.find(f"{NS}sheets/{NS}sheet")
+    if sheet is None:
+        raise UnsupportedWorkbook("workbook has no sheets")
+    rel_id = sheet.get(f"{REL_NS}id")
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target", "")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise UnsupportedWorkbook("first sheet not found in workbook relationships")
+
+
+def _epoch(zf: zipfile.ZipFile) -> datetime:
+    pr = ElementTree.fromstring(zf.read("xl/workbook.xml")).find(f"{NS}workbookPr")
+    if pr is not None and pr.get("date1904") in ("1", "true"):
+        return datetime(1904, 1, 1)
+    return datetime(1899, 12, 30)
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    try:
+        source = zf.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    strings = []
+    with source:
+        for _event, elem in ElementTree.iterparse(source):
+            if elem.tag == f"{NS}si":
+                strings.append(_text(elem))
+                elem.clear()
+    return strings
+
+
+def _date_styles(zf: zipfile.ZipFile) -> Set[int]:
+    """Indexes of cellXfs styles whose number format is a date / time."""
+    try:
+        root = ElementTree.fromstring(zf.read("xl/styles.xml"))
+    except KeyError:
+        return set()
+    custom = {int(f.get("numFmtId")): f.get("formatCode", "") for f in root.iter(f"{NS}numFmt")}
+    xfs = root.find(f"{NS}cellXfs")
+    dates = set()
+    for i, xf in enumerate(xfs if xfs is not None else []):
+        fmt = int(xf.get("numFmtId", 0))
+        if fmt in BUILTIN_DATE_FORMATS:
+            dates.add(i)
+        elif fmt in custom and re.search(r"[dmyhs]", _FORMAT_LITERALS.sub("", custom[fmt]).lower()):
+            dates.add(i)
+    return dates
+
+
+def iter_rows(file_obj) -> Iterator[tuple]:
+    """Rows of the first worksheet as tuples (None for empty cells)."""
+    try:
+        zf = zipfile.ZipFile(file_obj)
+    except zipfile.BadZipFile as e:
+        raise UnsupportedWorkbook(str(e)) from e
+    with zf:
+        try:
+            sheet_path = _first_sheet_path(zf)
+            shared = _shared_strings(zf)
+            date_styles = _date_styles(zf)
+            epoch = _epoch(zf)
+            source = zf.open(sheet_path)
+        except (KeyError, ElementTree.ParseError, ValueError) as e:
+            raise UnsupportedWorkbook(str(e)) from e
+
+        with source:
+            sheet = _SheetParser(shared, date_styles, epoch)
+            try:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    sheet.parser.Parse(chunk, not chunk)
+                    if not chunk:
+                        sheet.close()
+                    if sheet.rows:
+                        yield from sheet.rows
+                        sheet.rows.clear()
+                    if not chunk:
+                        break
+            except (expat.ExpatError, IndexError, ValueError) as e:
+                raise UnsupportedWorkbook(str(e)) from e
+
+
+class _SheetParser:
+    """
+    expat callbacks for <sheetData>: only <c>, <v> / <t> and <row> matter, so
+    a flat state machine is much cheaper than building elements. Finished
+    rows collect in self.rows until iter_rows drains them after each chunk.
+
+    Like openpyxl's read-only sheets, rows are squared to the <dimension>
+    width and rows missing from the XML come back as empty rows.
+    """
+
+    def __init__(self, shared, date_styles, epoch):
+        self.shared = shared
+        self.date_styles = date_styles
+        self.epoch = epoch
+        self.rows: List[tuple] = []
+        self.values: List = []
+        self.cell: dict = {}
+        self.text: List[str] = []
+        self.collecting = False
+        self.in_phonetic = False
+        self.seen_root = False
+        self.row_number = 0
+        self.max_row = self.empty_row = self.width = None
+
+        parser = expat.ParserCreate(namespace_separator=" ")
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.characters
+        self.parser = parser
+
+    def start(self, name, attrs):
+        if name == CELL:
+            self.cell = attrs
+            self.text = []
+        elif name == VALUE or (name == INLINE_TEXT and not self.in_phonetic):
+            self.collecting = True
+        elif name == ROW:
+            self.values = []
+            number = int(attrs.get("r", self.row_number + 1))
+            if self.empty_row is not None:
+                self.rows.extend([self.empty_row] * (min(number, self.max_row + 1) - self.row_number - 1))
+            self.row_number = number
+        elif name == PHONETIC:
+            self.in_phonetic = True
+        elif name == DIMENSION:
+            self.size(attrs.get("ref", ""))
+        elif not self.seen_root:
+            if name != WORKSHEET:
+                raise UnsupportedWorkbook(f"unexpected root element {name!r}")
+            self.seen_root = True
+
+    def end(self, name):
+        if name == CELL:
+            self.add_cell()
+        elif name == VALUE or name == INLINE_TEXT:
+            self.collecting = False
+        elif name == ROW:
+            if self.width is None:
+                self.rows.append(tuple(self.values))
+            elif self.row_number <= self.max_row:
+                values = self.values[:self.width]
+                self.rows.append(tuple(values) + self.empty_row[len(values):])
+        elif name == PHONETIC:
+            self.in_phonetic = False
+
+    def size(self, ref):
+        last = ref.split(":")[-1]
+        digits = last.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        if digits.isdigit() and last != digits:
+            self.width = _column_index(last) + 1
+            self.max_row = int(digits)
+            self.empty_row = (None,) * self.width
+
+    def close(self):
+        """Trailing empty rows up to the <dimension> height."""
+        if self.empty_row is not None and self.row_number < self.max_row:
+            self.rows.extend([self.empty_row] * (self.max_row - self.row_number))
+            self.row_number = self.max_row
+
+    def characters(self, data):
+        if self.collecting:
+            self.text.append(data)
+
+    def add_cell(self):
+        cell, values = self.cell, self.values
+        ref = cell.get("r")
+        if ref:
+            col = _column_index(ref)
+            if col > len(values):
+                values.extend([None] * (col - len(values)))
+
+        kind = cell.get("t", "n")
+        text = "".join(self.text) if self.text else None
+        if kind == "s":
+            value = self.shared[int(text)] if text is not None else None
+        elif kind == "b":
+            value = text == "1" if text is not None else None
+        elif kind in ("inlineStr", "str", "e"):
+            value = text
+        elif kind == "d":
+            value = datetime.fromisoformat(text) if text else None
+        elif text is None or text == "":
+            value = None
+        elif "." in text or "E" in text or "e" in text:
+            value = float(text)
+        else:
+            value = int(text)
+
+        if kind == "n" and value is not None and self.date_styles and int(cell.get("s", 0)) in self.date_styles:
+            epoch = self.epoch
+            value = epoch + timedelta(days=value)
+            if epoch.year == 1899 and value < datetime(1900, 3, 1):
+                value += timedelta(days=1)  # Excel's phantom 1900-02-29
+        values.append(value)
@@ -4,7 +4,7 @@ set -e
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
 
-exec gunicorn core.wsgi:application \
-  --bind 0.0.0.0:8000 \
-  --workers 3 \
-  --timeout 120
+# workers / threads / timeouts / preload / recycling: see gunicorn.conf.py
+# DJANGO_SERVER_MODE=asgi: uvicorn workers under gunicorn; pair with
+# DJANGO_ASYNC_VIEWS=1 so the hot read endpoints run on the async ORM.
+exec gunicorn --config gunicorn.conf.py
@@ -0,0 +1,113 @@
+# Gunicorn settings, driven by environment variables (see entrypoint.sh).
+#
+#   GUNICORN_WORKERS           default: 2 * CPUs + 1 (capped by GUNICORN_MAX_WORKERS, default 8);
+#                              CPUs is the container's cgroup CPU quota or CPU affinity, not the host count
+#   GUNICORN_THREADS           default: 4 (wsgi mode) -> gthread workers
+#   GUNICORN_WORKER_CLASS      override the worker class
+#   GUNICORN_TIMEOUT           default: 60 (worker heartbeat; with gthread it does not end a running request)
+#   GUNICORN_PRELOAD           default: 1 (import Django once in the master, share pages via copy-on-write)
+#   GUNICORN_MAX_REQUESTS      default: 1000 (recycle workers; 0 disables)
+#   GUNICORN_MAX_REQUESTS_JITTER  default: 100
+#   GUNICORN_ROLE              "web" (default) or "imports": a pool for /api/import/* with
+#                              IMPORT_TIMEOUT (default 900, for sync workers) and fewer workers, for deployments
+#                              where a reverse proxy routes the import endpoints to it
+#   DJANGO_SERVER_MODE         "wsgi" (default) or "asgi" (uvicorn workers on core.asgi)
+import math
+import os
+import shutil
+
+
+def _int(name, default):
+    value = os.getenv(name, "")
+    return int(value) if value.strip() else default
+
+
+def _available_cpus():
+    # multiprocessing.cpu_count() reports the host's CPUs, not what the container may use
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:  # cgroup v2: "<quota> <period>" or "max <period>"
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:  # cgroup v1
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+cpus = _available_cpus()
+server_mode = os.getenv("DJANGO_SERVER_MODE", "wsgi")
+role = os.getenv("GUNICORN_ROLE", "web")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+if server_mode == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+    threads = 1
+else:
+    wsgi_app = "core.wsgi:application"
+    threads = _int("GUNICORN_THREADS", 4)
+    # gthread: the worker's main thread keeps heart-beating while request threads
+    # run, so `timeout` only catches a hung worker process; it does not stop a
+    # long request. Bound request time at the reverse proxy instead.
+    worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync")
+
+if role == "imports":
+    workers = _int("GUNICORN_WORKERS", 2)
+    timeout = _int("IMPORT_TIMEOUT", 900)
+else:
+    workers = _int("GUNICORN_WORKERS", min(2 * cpus + 1, _int("GUNICORN_MAX_WORKERS", 8)))
+    timeout = _int("GUNICORN_TIMEOUT", 60)
+
+graceful_timeout = _int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _int("GUNICORN_KEEPALIVE", 5)
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# recycle workers to cap slow memory growth; jitter avoids all workers restarting at once
+max_requests = _int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# heartbeat files in RAM instead of the container's overlay filesystem
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# METRICS_ENABLED=1: prometheus_client multiprocess mode, one file per worker in
+# PROMETHEUS_MULTIPROC_DIR, aggregated by /metrics. Wiped on every (re)start.
+if os.getenv("METRICS_ENABLED", "0") == "1":
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # with preload_app the master imported Django; make sure no DB connection
+    # opened there is shared with the forked workers
+    from django.db import connections
+
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
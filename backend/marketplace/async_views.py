@@ -0,0 +1,29 @@
+from django.http import Http404
+from rest_framework.response import Response
+
+from core.async_views import AsyncAPIView
+
+from . import order_cache
+from .views import MarketplaceRegisteredOrderDetailAPIView, MarketplaceRegisteredOrderListAPIView
+
+
+class AsyncMarketplaceRegisteredOrderListAPIView(AsyncAPIView, MarketplaceRegisteredOrderListAPIView):
+    """Same queryset / filters / serializer as the sync view, fetched with the async ORM."""
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        orders = [order async for order in queryset]  # goods prefetch runs inside the fetch
+        return Response(self.get_serializer(orders, many=True).data)
+
+
+class AsyncMarketplaceRegisteredOrderDetailAPIView(AsyncAPIView, MarketplaceRegisteredOrderDetailAPIView):
+    async def get(self, request, uuid, *args, **kwargs):
+        data = await order_cache.aget(uuid)
+        if data is None:
+            try:
+                order = await self.get_queryset().aget(uuid=uuid)
+            except self.get_queryset().model.DoesNotExist:
+                raise Http404
+            data = self.get_serializer(order).data
+            await order_cache.aremember(uuid, data)
+        return Response(data)
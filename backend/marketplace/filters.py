@@ -1,6 +1,7 @@
 from django_filters import rest_framework as filters
 from .models import RegisteredOrder
 from django.db.models import Q
+from django.utils import timezone
 
 
 class RegisteredOrderMarketplaceFilter(filters.FilterSet):
@@ -22,6 +23,13 @@ class RegisteredOrderMarketplaceFilter(filters.FilterSet):
     # boolean
     partial_shipment = filters.BooleanFilter(field_name="partial_shipment")
 
+    # order date range (YYYY-MM-DD)
+    date_from = filters.DateFilter(field_name="date", lookup_expr="gte")
+    date_to = filters.DateFilter(field_name="date", lookup_expr="lte")
+
+    # expired orders are hidden unless ?include_expired=true (see filter_queryset)
+    include_expired = filters.BooleanFilter(method="filter_include_expired")
+
     # HSCode filter (supports single code OR comma-separated list)
     hs_code = filters.CharFilter(method="filter_hscode")
     def filter_q(self, queryset, name, value):
@@ -43,6 +51,16 @@ class RegisteredOrderMarketplaceFilter(filters.FilterSet):
             # q_obj |= Q(user__username__icontains=term)
 
         return queryset.filter(q_obj).distinct()
+    def filter_include_expired(self, queryset, name, value):
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.form.cleaned_data.get("include_expired"):
+            # (verified, expire_date) index
+            queryset = queryset.filter(expire_date__gte=timezone.localdate())
+        return queryset
+
     def filter_hscode(self, queryset, name, value):
         # allow: ?hscode=01012100  OR  ?hscode=01012100,02011000
         raw = (value or "").strip()
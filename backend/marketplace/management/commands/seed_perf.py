@@ -0,0 +1,309 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import accumulate
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import User
+from customs.models import ChangeSequence, Heading, HSCode, Season
+from marketplace.models import OrderGood, RegisteredOrder
+
+FA_WORDS = [
+    "پارچه", "نخ", "پنبه", "فولاد", "آهن", "مس", "آلومینیوم", "لوله", "ورق", "پیچ",
+    "مهره", "موتور", "پمپ", "شیر", "قطعات", "یدکی", "خودرو", "لاستیک", "کاغذ", "مقوا",
+    "چای", "برنج", "روغن", "شکر", "دارو", "تجهیزات", "پزشکی", "کابل", "سیم", "لامپ",
+    "پلاستیک", "پلی‌اتیلن", "رنگ", "چسب", "شیشه", "سرامیک", "کاشی", "چوب", "مبلمان", "ماشین‌آلات",
+]
+EN_WORDS = [
+    "fabric", "yarn", "cotton", "steel", "iron", "copper", "aluminium", "pipe", "sheet", "screw",
+    "nut", "engine", "pump", "valve", "parts", "spare", "vehicle", "tyre", "paper", "board",
+    "tea", "rice", "oil", "sugar", "medicine", "equipment", "medical", "cable", "wire", "lamp",
+    "plastic", "polyethylene", "paint", "adhesive", "glass", "ceramic", "tile", "wood", "furniture", "machinery",
+]
+COUNTRIES = ["CN", "AE", "TR", "IN", "DE", "IT", "KR", "JP", "RU", "MY"]
+CURRENCIES = ["دلار", "یورو", "درهم", "یوان"]
+INCOTERMS = ["FOB", "CFR", "CIF", "EXW", "FCA", "CPT"]
+PAYMENTS = ["LC", "TT", "CAD", "حواله"]
+TRANSPORT = ["دریایی", "زمینی", "هوایی", "ریلی"]
+SUQ_CHOICES = [k for k, _ in HSCode.SUQ_OPTIONS]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic performance data set: chapters (Season), headings, "
+        "HS codes, users, registered orders and goods. Re-running adds another batch of "
+        "users and orders next to the existing ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chapters", type=int, default=97)
+        parser.add_argument("--headings", type=int, default=1200)
+        parser.add_argument("--codes", type=int, default=20000)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--goods-min", type=int, default=1)
+        parser.add_argument("--goods-max", type=int, default=50)
+        parser.add_argument(
+            "--skew", type=float, default=1.1,
+            help="Zipf exponent for orders per user and HS code popularity (0 = uniform)",
+        )
+        parser.add_argument("--verified-ratio", type=float, default=0.7)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy", action="store_true",
+            help="Postgres: load with COPY instead of INSERT (fastest for millions of rows)",
+        )
+        parser.add_argument(
+            "--epoch", default="2026-01-01",
+            help="timestamps are spread over the two years before this date (keeps output seed-deterministic)",
+        )
+        parser.add_argument("--skip-catalogue", action="store_true", help="reuse the existing HS code catalogue")
+
+    def handle(self, *args, **opts):
+        if opts["chapters"] > 99 or opts["headings"] < opts["chapters"]:
+            raise CommandError("--chapters must be <= 99 and --headings >= --chapters")
+        if opts["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy needs PostgreSQL")
+
+        self.rng = random.Random(opts["seed"])
+        self.opts = opts
+        try:
+            self.now = timezone.make_aware(datetime.fromisoformat(opts["epoch"]))
+        except ValueError:
+            raise CommandError("--epoch must be an ISO date, e.g. 2026-01-01")
+        started = time.perf_counter()
+
+        with self._manual_timestamps(), transaction.atomic():
+            if not opts["skip_catalogue"]:
+                self._seed_catalogue()
+            codes = list(HSCode.objects.values_list("id", flat=True).order_by("code"))
+            if not codes:
+                raise CommandError("no HS codes to reference; drop --skip-catalogue")
+            # users / orders / uuids from a stream keyed by the first free user id as well:
+            # the same database and --seed give the same rows, a re-run gets new ones
+            first_user_id = self._next_id(User)
+            self.rng = random.Random(f"{opts['seed']}:{first_user_id}")
+            users = self._seed_users(first_user_id)
+            self._seed_orders(users, codes)
+
+        self.stdout.write(self.style.SUCCESS(f"done in {time.perf_counter() - started:.1f}s"))
+
+    # ----------------------------
+    # Catalogue
+    # ----------------------------
+    def _seed_catalogue(self):
+        o = self.opts
+        seasons = [
+            Season(code=str(c), description=f"فصل {c} / Chapter {c}")
+            for c in range(1, o["chapters"] + 1)
+        ]
+        self._insert(Season, seasons, ignore_conflicts=True)
+        season_ids = dict(Season.objects.values_list("code", "id"))
+
+        headings = []
+        per_chapter = self._split(o["headings"], o["chapters"])
+        for chapter, count in zip(range(1, o["chapters"] + 1), per_chapter):
+            for h in range(1, min(count, 99) + 1):
+                headings.append(Heading(
+                    code=f"{chapter:02d}{h:02d}",
+                    season_id=season_ids[str(chapter)],
+                    description=self._name(FA_WORDS, 3),
+                ))
+        self._insert(Heading, headings, ignore_conflicts=True)
+        heading_rows = list(Heading.objects.values_list("code", "id", "season_id").order_by("code"))
+
+        codes = []
+        change_seq = ChangeSequence.allocate()  # one change number for the whole seeded catalogue
+        per_heading = self._split(o["codes"], len(heading_rows))
+        for (h_code, h_id, s_id), count in zip(heading_rows, per_heading):
+            for n in range(1, min(count, 9999) + 1):
+                obj = HSCode(
+                    code=f"{h_code}{n:04d}",
+                    goods_name_fa=self._name(FA_WORDS, 4),
+                    goods_name_en=self._name(EN_WORDS, 4),
+                    profit=str(self.rng.choice([1, 4, 5, 10, 15, 20, 26, 32, 40])),
+                    customs_duty_rate=self.rng.choice([None, 4, 5, 10, 15, 20, 26, 32, 40, 55]),
+                    import_duty_rate=self.rng.choice([None, "4", "10", "15%", "۲۰"]),
+                    priority=self.rng.choice([None, None, 1, 2, 3, 4]),
+                    SUQ=self.rng.choice(SUQ_CHOICES),
+                    updated_date=self.now,
+                    change_seq=change_seq,
+                    season_id=s_id,
+                    heading_id=h_id,
+                )
+                obj.sync_numeric_fields()
+                codes.append(obj)
+        self._insert(HSCode, codes, ignore_conflicts=True)
+
+    # ----------------------------
+    # Users / orders
+    # ----------------------------
+    def _seed_users(self, start):
+        o = self.opts
+        password = make_password("perf-pass-123", salt="perfseed")  # one hash, reused
+        users = [
+            User(
+                id=start + i,
+                # keyed by id, not position, so a re-run with the same --seed does not collide
+                username=f"perf_{o['seed']}_{start + i}",
+                email=f"perf_{o['seed']}_{start + i}@example.com",
+                password=password,
+                role=User.Role.USER,
+                first_name=self._name(FA_WORDS, 1),
+                date_joined=self.now,
+            )
+            for i in range(o["users"])
+        ]
+        self._insert(User, users)
+        return [u.id for u in users]
+
+    def _seed_orders(self, user_ids, code_ids):
+        o = self.opts
+        user_weights = self._zipf_weights(len(user_ids))
+        # cumulative once: choices(weights=...) re-accumulates all codes on every call
+        code_weights = self._zipf_weights(len(code_ids))
+        code_cum_weights = list(accumulate(code_weights)) if code_weights else None
+        next_order_id = self._next_id(RegisteredOrder)
+        next_good_id = self._next_id(OrderGood)
+
+        done = goods_total = 0
+        t0 = time.perf_counter()
+        while done < o["orders"]:
+            n = min(o["batch_size"], o["orders"] - done)
+            owners = self.rng.choices(user_ids, weights=user_weights, k=n)
+            orders, goods = [], []
+            for i, user_id in enumerate(owners):
+                order_id = next_order_id + done + i
+                lines = []
+                n_goods = self.rng.randint(o["goods_min"], o["goods_max"])
+                hs_code_ids = self.rng.choices(code_ids, cum_weights=code_cum_weights, k=n_goods)
+                for hs_code_id in hs_code_ids:
+                    lines.append(OrderGood(
+                        id=next_good_id,
+                        uuid=self._uuid(),
+                        description=self._name(FA_WORDS, 2),
+                        hs_code_id=hs_code_id,
+                        order_id=order_id,
+                        quantity=Decimal(self.rng.randint(1, 5000)),
+                        origin=self.rng.choice(COUNTRIES),
+                        unit_price=Decimal(self.rng.randint(50, 500000)) / 100,
+                        unit=self.rng.choice(["U", "Kg", "m"]),
+                        nw_kg=Decimal(self.rng.randint(1, 20000)) / 10,
+                        gw_kg=Decimal(self.rng.randint(1, 22000)) / 10,
+                    ))
+                    next_good_id += 1
+                total_value = sum((g.quantity * g.unit_price for g in lines), Decimal("0"))
+                freight = Decimal(self.rng.randint(0, 500000)) / 100
+                created = self.now - timedelta(minutes=self.rng.randint(0, 2 * 365 * 24 * 60))
+                start = created.date() - timedelta(days=self.rng.randint(0, 30))
+                orders.append(RegisteredOrder(
+                    id=order_id,
+                    uuid=self._uuid(),
+                    verified=self.rng.random() < o["verified_ratio"],
+                    order_number=f"P{o['seed']}-{order_id}",
+                    user_id=user_id,
+                    created_at=created,
+                    total_value=total_value.quantize(Decimal("0.01")),
+                    freight_price=freight,
+                    sub_total=(total_value + freight).quantize(Decimal("0.01")),
+                    currency_type=self.rng.choice(CURRENCIES),
+                    seller_country=self.rng.choice(COUNTRIES),
+                    date=start,
+                    expire_date=start + timedelta(days=self.rng.choice([90, 180, 365])),
+                    terms_of_delivery=self.rng.choice(INCOTERMS),
+                    terms_of_payment=self.rng.choice(PAYMENTS),
+                    partial_shipment=self.rng.random() < 0.3,
+                    means_of_transport=self.rng.choice(TRANSPORT),
+                    country_of_origin=self.rng.choice(COUNTRIES),
+                    standard=self.rng.choice(["ISO", "CE", "GOST", "-"]),
+                    total_gw=sum((g.gw_kg for g in lines), Decimal("0")),
+                    total_nw=sum((g.nw_kg for g in lines), Decimal("0")),
+                    total_qty=sum((g.quantity for g in lines), Decimal("0")),
+                ))
+                goods.extend(lines)
+            self._insert(RegisteredOrder, orders)
+            self._insert(OrderGood, goods)
+            done += n
+            goods_total += len(goods)
+            rate = done / max(time.perf_counter() - t0, 1e-9)
+            self.stdout.write(f"orders {done}/{o['orders']}, goods {goods_total} ({rate:.0f} orders/s)")
+
+        self._reset_sequences(User, RegisteredOrder, OrderGood)
+
+    # ----------------------------
+    # Helpers
+    # ----------------------------
+    def _insert(self, model, objs, ignore_conflicts=False):
+        if not objs:
+            return
+        t0 = time.perf_counter()
+        if self.opts["copy"] and not ignore_conflicts:
+            self._copy(model, objs)
+        else:
+            model.objects.bulk_create(objs, batch_size=self.opts["batch_size"], ignore_conflicts=ignore_conflicts)
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(f"  {model._meta.db_table}: {len(objs)} rows in {elapsed:.2f}s ({len(objs) / max(elapsed, 1e-9):.0f} rows/s)")
+
+    def _copy(self, model, objs):
+        fields = [f for f in model._meta.concrete_fields]
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for obj in objs:
+                    copy.write_row([f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields])
+
+    def _reset_sequences(self, *models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    @contextmanager
+    def _manual_timestamps(self):
+        # keep the generated created_at / updated_date instead of "now" (determinism, realistic spread)
+        fields = [RegisteredOrder._meta.get_field("created_at"), HSCode._meta.get_field("updated_date")]
+        saved = [(f.auto_now, f.auto_now_add) for f in fields]
+        for f in fields:
+            f.auto_now = f.auto_now_add = False
+        try:
+            yield
+        finally:
+            for f, (auto_now, auto_now_add) in zip(fields, saved):
+                f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+    def _next_id(self, model) -> int:
+        return (model.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _name(self, words, n):
+        return " ".join(self.rng.choice(words) for _ in range(self.rng.randint(1, n)))
+
+    def _split(self, total, parts):
+        """Spread `total` over `parts` buckets with some variance, deterministically."""
+        weights = [self.rng.uniform(0.5, 1.5) for _ in range(parts)]
+        scale = total / sum(weights)
+        counts = [max(1, int(w * scale)) for w in weights]
+        counts[-1] += total - sum(counts)
+        return [max(1, c) for c in counts]
+
+    def _zipf_weights(self, n):
+        skew = self.opts["skew"]
+        if skew <= 0:
+            return None
+        ranks = list(range(1, n + 1))
+        self.rng.shuffle(ranks)
+        return [1 / (r ** skew) for r in ranks]
@@ -0,0 +1,147 @@
+# Generated by Django 6.0 on 2026-10-19 10:00
+
+import datetime
+import logging
+import re
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+# Frozen copy of core.dates.parse_date as of this migration: later changes to
+# the live parser must not change what this data migration produces.
+JALALI_YEAR_LIMIT = 1700
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+_DATE = re.compile(r"(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})")
+
+
+def _jalali_days(jy, jm, jd):
+    jy += 1595
+    days = -355668 + 365 * jy + (jy // 33) * 8 + ((jy % 33) + 3) // 4 + jd
+    return days + ((jm - 1) * 31 if jm < 7 else (jm - 7) * 30 + 186)
+
+
+_JALALI_ORDINAL_OFFSET = datetime.date(2025, 3, 21).toordinal() - _jalali_days(1404, 1, 1)
+
+
+def _to_jalali(value):
+    gy, gm, gd = value.year, value.month, value.day
+    gy2 = gy + 1 if gm > 2 else gy
+    month_days = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+    days = (
+        355666 + 365 * gy + (gy2 + 3) // 4 - (gy2 + 99) // 100 + (gy2 + 399) // 400
+        + gd + month_days[gm - 1]
+    )
+    jy = -1595 + 33 * (days // 12053)
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jy, 1 + days // 31, 1 + days % 31
+    return jy, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def _from_jalali(jy, jm, jd):
+    if not (1 <= jm <= 12 and 1 <= jd <= (31 if jm < 7 else 30)):
+        raise ValueError(f"invalid Jalali date {jy}/{jm}/{jd}")
+    value = datetime.date.fromordinal(_jalali_days(jy, jm, jd) + _JALALI_ORDINAL_OFFSET)
+    if _to_jalali(value) != (jy, jm, jd):
+        raise ValueError(f"invalid Jalali date {jy}/{jm}/{jd}")
+    return value
+
+
+def parse_date(text):
+    match = _DATE.fullmatch(str(text).strip().translate(_DIGITS))
+    if match is None:
+        raise ValueError(f"not a YYYY/MM/DD date: {text!r}")
+    y, m, d = (int(part) for part in match.groups())
+    if y < JALALI_YEAR_LIMIT:
+        return _from_jalali(y, m, d)
+    return datetime.date(y, m, d)
+
+
+def parse_dates(apps, schema_editor):
+    # the text columns hold whatever users typed: Jalali or Gregorian YYYY/MM/DD.
+    # Unreadable ones get the field default and keep their text in <field>_raw for review.
+    RegisteredOrder = apps.get_model("marketplace", "RegisteredOrder")
+    defaults = {"date": datetime.date(2026, 1, 1), "expire_date": datetime.date(2028, 1, 1)}
+    columns = ["date_parsed", "expire_date_parsed", "date_raw", "expire_date_raw"]
+    unreadable = {field: [] for field in defaults}
+    batch = []
+    for order in RegisteredOrder.objects.only("id", "date", "expire_date").iterator(chunk_size=2000):
+        for field, default in defaults.items():
+            text = getattr(order, field)
+            try:
+                value = parse_date(text)
+            except ValueError:
+                value = default
+                setattr(order, f"{field}_raw", text)
+                unreadable[field].append(order.pk)
+            setattr(order, f"{field}_parsed", value)
+        batch.append(order)
+        if len(batch) >= 2000:
+            RegisteredOrder.objects.bulk_update(batch, columns)
+            batch = []
+    RegisteredOrder.objects.bulk_update(batch, columns)
+    for field, ids in unreadable.items():
+        if ids:
+            logger.warning(
+                "%d orders had an unreadable %s, set to %s; the text is kept in %s_raw (order ids: %s)",
+                len(ids), field, defaults[field], field, ", ".join(map(str, ids)),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0006_registeredorder_verified"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="registeredorder",
+            name="date_parsed",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="registeredorder",
+            name="expire_date_parsed",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="registeredorder",
+            name="date_raw",
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name="registeredorder",
+            name="expire_date_raw",
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.RunPython(parse_dates, migrations.RunPython.noop),
+        migrations.RemoveField(model_name="registeredorder", name="date"),
+        migrations.RemoveField(model_name="registeredorder", name="expire_date"),
+        migrations.RenameField(model_name="registeredorder", old_name="date_parsed", new_name="date"),
+        migrations.RenameField(model_name="registeredorder", old_name="expire_date_parsed", new_name="expire_date"),
+        migrations.AlterField(
+            model_name="registeredorder",
+            name="date",
+            field=models.DateField(default=datetime.date(2026, 1, 1)),
+        ),
+        migrations.AlterField(
+            model_name="registeredorder",
+            name="expire_date",
+            field=models.DateField(default=datetime.date(2028, 1, 1)),
+        ),
+        migrations.AddIndex(
+            model_name="registeredorder",
+            index=models.Index(fields=["verified", "date"], name="order_verified_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="registeredorder",
+            index=models.Index(fields=["verified", "expire_date"], name="order_verified_expire_idx"),
+        ),
+    ]
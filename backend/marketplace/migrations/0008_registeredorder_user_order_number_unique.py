@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-19 10:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def renumber_duplicates(apps, schema_editor):
+    # keep the oldest order per (user, order_number); later copies get "-<id>" so the constraint can be added
+    RegisteredOrder = apps.get_model("marketplace", "RegisteredOrder")
+    duplicates = (
+        RegisteredOrder.objects.values("user_id", "order_number")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates:
+        orders = RegisteredOrder.objects.filter(user_id=dup["user_id"], order_number=dup["order_number"]).order_by("id")
+        for order in orders[1:]:
+            suffix = f"-{order.pk}"
+            order.order_number = order.order_number[:55 - len(suffix)] + suffix
+            order.save(update_fields=["order_number"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0007_registeredorder_date_columns"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="registeredorder",
+            constraint=models.UniqueConstraint(fields=("user", "order_number"), name="order_user_number_uniq"),
+        ),
+        migrations.AddIndex(
+            model_name="registeredorder",
+            index=models.Index(fields=["user", "-created_at"], name="order_user_created_idx"),
+        ),
+        migrations.AlterField(
+            model_name="registeredorder",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -1,22 +1,27 @@
+import datetime
 import uuid
 from django.db import models
 from customs.models import HSCode
 from accounts.models import User
 
 
-class RegisteredOrder(models.Model):
-    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, db_index=True)
-    verified = models.BooleanField(default=False, db_index=True)
-    order_number = models.CharField(max_length=55)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, )
+class RegisteredOrder(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, db_index=True)
+    verified = models.BooleanField(default=False, db_index=True)
+    order_number = models.CharField(max_length=55)
+    # db_index=False: the (user, ...) constraint / index below lead with user_id
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     total_value = models.DecimalField(max_digits=20, decimal_places=2, default=1)
     freight_price = models.DecimalField(max_digits=20, decimal_places=2, default=1)
     sub_total = models.DecimalField(max_digits=20, decimal_places=2, default=1)
     currency_type = models.CharField(max_length=55, default="دلار")
     seller_country = models.CharField(max_length=255, default="asd")
-    date = models.CharField(max_length=20,default='2026/01/01')
-    expire_date = models.CharField(max_length=20,default='2028/01/01')
+    date = models.DateField(default=datetime.date(2026, 1, 1))
+    expire_date = models.DateField(default=datetime.date(2028, 1, 1))
+    # text the date migration (0007) could not read, kept for review; the date above got its default
+    date_raw = models.CharField(max_length=20, null=True, blank=True)
+    expire_date_raw = models.CharField(max_length=20, null=True, blank=True)
     terms_of_delivery = models.CharField(max_length=50)
     terms_of_payment = models.CharField(max_length=50)
     partial_shipment = models.BooleanField(default=False)
@@ -27,6 +32,19 @@ class RegisteredOrder(models.Model):
     total_nw = models.DecimalField(default=0, max_digits=20, decimal_places=2,)
     total_qty = models.DecimalField(default=0, max_digits=20, decimal_places=2,)
 
+    class Meta:
+        indexes = [
+            # marketplace listing: verified=True ORDER BY -date, expired orders cut by expire_date
+            models.Index(fields=["verified", "date"], name="order_verified_date_idx"),
+            models.Index(fields=["verified", "expire_date"], name="order_verified_expire_idx"),
+            # owner's list: user=... ORDER BY -created_at
+            models.Index(fields=["user", "-created_at"], name="order_user_created_idx"),
+        ]
+        constraints = [
+            # also the (user, order_number) lookup index; duplicates are caught on write
+            models.UniqueConstraint(fields=["user", "order_number"], name="order_user_number_uniq"),
+        ]
+
 class OrderGood(models.Model): 
     uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, db_index=True)
     description = models.CharField(max_length=255)
@@ -41,4 +59,4 @@ class OrderGood(models.Model):
 
     @property
     def line_total(self):
-        return self.quantity * self.unit_price
+        return self.quantity * self.unit_price
@@ -0,0 +1,44 @@
+"""
+Serialized public order detail (marketplace/orders/<uuid>/), cached per uuid.
+
+Filled by the detail views on a miss and dropped by marketplace.signals
+after any write to the order commits (edit, goods replacement, verify,
+delete). With the default per-process cache other workers can serve the old
+version for up to MARKETPLACE_ORDER_CACHE_TTL seconds.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from core.metrics import record_cache_lookup
+
+
+def _key(uuid) -> str:
+    return f"marketplace-order:{uuid}"
+
+
+def _ttl() -> int:
+    return getattr(settings, "MARKETPLACE_ORDER_CACHE_TTL", 60)
+
+
+def get(uuid):
+    data = cache.get(_key(uuid))
+    record_cache_lookup("marketplace_order", data is not None)
+    return data
+
+
+async def aget(uuid):
+    data = await cache.aget(_key(uuid))
+    record_cache_lookup("marketplace_order", data is not None)
+    return data
+
+
+def remember(uuid, data) -> None:
+    cache.set(_key(uuid), data, _ttl())
+
+
+async def aremember(uuid, data) -> None:
+    await cache.aset(_key(uuid), data, _ttl())
+
+
+def forget(uuid) -> None:
+    cache.delete(_key(uuid))
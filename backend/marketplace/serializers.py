@@ -1,14 +1,60 @@
 # marketplace/serializers.py
+from datetime import date, datetime
 from decimal import Decimal
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 from .models import RegisteredOrder, OrderGood
+from core.dates import parse_date
 from customs.models import HSCode
 
+DATE_FORMAT = "%Y/%m/%d"
+DUPLICATE_ORDER_NUMBER = "این شماره ثبت سفارش قبلا برای شما ثبت شده است."
+
+
+class HSCodeRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves hs_code_id from the batch loaded by RegisteredOrderCreateUpdateSerializer
+    (context["hs_codes"]) so a goods list costs one query, not one per line.
+    """
+
+    def to_internal_value(self, data):
+        hs_codes = self.context.get("hs_codes")
+        if hs_codes is not None and not isinstance(data, bool):
+            try:
+                obj = hs_codes.get(int(data))
+            except (TypeError, ValueError):
+                self.fail("incorrect_type", data_type=type(data).__name__)
+            if obj is None:
+                self.fail("does_not_exist", pk_value=data)
+            return obj
+        return super().to_internal_value(data)
+
+
+class OrderDateField(serializers.DateField):
+    """
+    Jalali or Gregorian YYYY/MM/DD in (core.dates.parse_date), stored as a
+    Gregorian date and returned as YYYY/MM/DD.
+    """
+    default_error_messages = {
+        "invalid": "تاریخ نامعتبر است؛ به شکل YYYY/MM/DD (شمسی یا میلادی) وارد کنید.",
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("format", DATE_FORMAT)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, value):
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return value
+        try:
+            return parse_date(value)
+        except ValueError:
+            self.fail("invalid")
+
 
 class OrderGoodWriteSerializer(serializers.ModelSerializer):
-    hs_code_id = serializers.PrimaryKeyRelatedField(
+    hs_code_id = HSCodeRelatedField(
         source="hs_code",
         queryset=HSCode.objects.all(),
         write_only=True,
@@ -53,6 +99,8 @@ class OrderGoodReadSerializer(serializers.ModelSerializer):
 
 class RegisteredOrderCreateUpdateSerializer(serializers.ModelSerializer):
     goods = OrderGoodWriteSerializer(many=True, write_only=True)
+    date = OrderDateField(required=False)
+    expire_date = OrderDateField(required=False)
 
     class Meta:
         model = RegisteredOrder
@@ -93,22 +141,43 @@ class RegisteredOrderCreateUpdateSerializer(serializers.ModelSerializer):
             "total_qty",
         ]
 
-    def validate_order_number(self, value):
-        request = self.context["request"]
-        qs = RegisteredOrder.objects.filter(user=request.user, order_number=value)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            raise serializers.ValidationError("این شماره ثبت سفارش قبلا برای شما ثبت شده است.")
-        return value
-
-    def _recalc_totals(self, order: RegisteredOrder) -> None:
+    def to_internal_value(self, data):
+        goods = data.get("goods") if hasattr(data, "get") else None
+        if isinstance(goods, list):
+            ids = set()
+            for item in goods:
+                raw = item.get("hs_code_id") if isinstance(item, dict) else None
+                try:
+                    ids.add(int(raw))
+                except (TypeError, ValueError):
+                    continue
+            self.context["hs_codes"] = HSCode.objects.in_bulk(ids)
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        start = attrs.get("date", getattr(self.instance, "date", None))
+        end = attrs.get("expire_date", getattr(self.instance, "expire_date", None))
+        if start and end and end < start:
+            raise serializers.ValidationError({"expire_date": "تاریخ انقضا نباید قبل از تاریخ ثبت سفارش باشد."})
+        return attrs
+
+    @staticmethod
+    def _raise_if_duplicate_number(error: IntegrityError):
+        """order_user_number_uniq replaces an EXISTS pre-check, and also holds for concurrent submits."""
+        message = str(error)
+        # Postgres / MySQL name the constraint, SQLite the columns
+        if "order_user_number_uniq" in message or "registeredorder.order_number" in message:
+            raise serializers.ValidationError({"order_number": [DUPLICATE_ORDER_NUMBER]}) from error
+        raise error
+
+    def _recalc_totals(self, order: RegisteredOrder, goods=None) -> None:
         total_value = Decimal("0")
         total_qty = Decimal("0")
         total_nw = Decimal("0")
         total_gw = Decimal("0")
 
-        for g in order.goods.all():
+        # goods: the just-written lines (no query); otherwise read them back
+        for g in (goods if goods is not None else order.goods.all()):
             qty = g.quantity or Decimal("0")
             unit_price = g.unit_price or Decimal("0")
             total_value += qty * unit_price
@@ -127,13 +196,16 @@ class RegisteredOrderCreateUpdateSerializer(serializers.ModelSerializer):
         goods_data = validated_data.pop("goods", [])
         request = self.context["request"]
 
-        order = RegisteredOrder.objects.create(user=request.user, **validated_data)
+        try:
+            order = RegisteredOrder.objects.create(user=request.user, **validated_data)
+        except IntegrityError as e:
+            self._raise_if_duplicate_number(e)
 
-        OrderGood.objects.bulk_create(
+        goods = OrderGood.objects.bulk_create(
             [OrderGood(order=order, **item) for item in goods_data]
         )
 
-        self._recalc_totals(order)
+        self._recalc_totals(order, goods)
         order.save(update_fields=["total_value", "sub_total", "total_qty", "total_nw", "total_gw"])
         return order
 
@@ -143,15 +215,20 @@ class RegisteredOrderCreateUpdateSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        try:
+            instance.save()
+        except IntegrityError as e:
+            self._raise_if_duplicate_number(e)
 
+        goods = None
         if goods_data is not None:
             instance.goods.all().delete()
-            OrderGood.objects.bulk_create(
+            goods = OrderGood.objects.bulk_create(
                 [OrderGood(order=instance, **item) for item in goods_data]
             )
+            getattr(instance, "_prefetched_objects_cache", {}).pop("goods", None)
 
-        self._recalc_totals(instance)
+        self._recalc_totals(instance, goods)
         instance.save(update_fields=["total_value", "sub_total", "total_qty", "total_nw", "total_gw"])
         return instance
 
@@ -159,6 +236,8 @@ class RegisteredOrderCreateUpdateSerializer(serializers.ModelSerializer):
 class RegisteredOrderReadSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
     goods = OrderGoodReadSerializer(many=True)
+    date = serializers.DateField(format=DATE_FORMAT, read_only=True)
+    expire_date = serializers.DateField(format=DATE_FORMAT, read_only=True)
 
     class Meta:
         model = RegisteredOrder
@@ -199,6 +278,8 @@ class PublicRegisteredOrderSerializer(serializers.ModelSerializer):
     # safer than StringRelatedField if User.__str__ returns phone/email
     user = serializers.SerializerMethodField()
     goods = OrderGoodReadSerializer(many=True, read_only=True)
+    date = serializers.DateField(format=DATE_FORMAT, read_only=True)
+    expire_date = serializers.DateField(format=DATE_FORMAT, read_only=True)
 
     class Meta:
         model = RegisteredOrder
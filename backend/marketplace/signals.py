@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import order_cache
+from .models import RegisteredOrder
+
+
+@receiver(post_save, sender=RegisteredOrder)
+@receiver(post_delete, sender=RegisteredOrder)
+def drop_cached_order(sender, instance, **kwargs):
+    # on commit: dropped any earlier, a concurrent read could cache the old rows again
+    uuid = instance.uuid
+    transaction.on_commit(lambda: order_cache.forget(uuid))
@@ -1,3 +1,181 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from core.testing import ORDER_SIZES, QueryBudgetMixin, order_payload, seed_catalogue, seed_orders
+from marketplace.models import RegisteredOrder
+
+
+class RegisteredOrderQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.codes = seed_catalogue(200)
+
+    def setUp(self):
+        self.owner = self.make_user("owner")
+        self.admin = self.make_user("admin", role="admin")
+        self.owner_client = self.client_for(self.owner)
+        self.admin_client = self.client_for(self.admin)
+
+    def test_lists_load_goods_and_hs_codes_once(self):
+        counts = {"owner": {}, "admin": {}}
+        for size in ORDER_SIZES:
+            seed_orders(self.owner, size, self.codes)  # order i has (i % 50) + 1 goods
+            for label, client in (("owner", self.owner_client), ("admin", self.admin_client)):
+                queries, response = self.capture(lambda: client.get("/api/registered-orders/"))
+                # the orders (user joined), then every order's goods (hs_code joined)
+                self.assertIn('JOIN "customs_hscode"', queries[-1])
+                self.assertEqual(len(response.data), size)
+                counts[label][size] = len(queries)
+        for label, by_size in counts.items():
+            self.assertConstantQueries(by_size, f"GET registered-orders/ ({label})")
+            self.assertEqual(by_size[1], 2, label)
+
+    def test_detail_and_verify_load_goods_once(self):
+        orders = seed_orders(self.owner, 50, self.codes)
+        detail, verify = {}, {}
+        for order in (orders[0], orders[9], orders[49]):  # 1, 10 and 50 goods
+            goods = order.goods.count()
+            detail[goods], _ = self.measure(lambda: self.owner_client.get(f"/api/registered-orders/{order.uuid}/"))
+            verify[goods], _ = self.measure(
+                lambda: self.admin_client.patch(f"/api/registered-orders/{order.uuid}/verify/", {"verified": False}, format="json"),
+                warmup=lambda: self.admin_client.get(f"/api/registered-orders/{order.uuid}/"),
+            )
+        self.assertConstantQueries(detail, "GET registered-orders/<uuid>/")
+        self.assertConstantQueries(verify, "PATCH registered-orders/<uuid>/verify/")
+        self.assertEqual((detail[1], verify[1]), (2, 3))  # order + goods; verify adds the UPDATE
+
+    def test_goods_writes_batch_hs_code_lookups(self):
+        payload = order_payload("batch", self.codes, 50)
+        for goods, code in zip(payload["goods"], self.codes):  # 50 distinct codes
+            goods["hs_code_id"] = code.pk
+        queries, response = self.capture(
+            lambda: self.owner_client.post("/api/registered-orders/", payload, format="json"),
+            expected_status=201, warmup=lambda: self.owner_client.get("/api/me/"),
+        )
+        # hs_code_id values in one in_bulk; totals from the inserted goods, which
+        # are read back once, for the response
+        self.assertEqual(sum('FROM "customs_hscode"' in sql for sql in queries), 1, queries)
+        self.assertEqual(sum(sql.startswith("SELECT") and 'FROM "marketplace_ordergood"' in sql for sql in queries), 1, queries)
+
+        payload["goods"].reverse()
+        queries, _ = self.capture(
+            lambda: self.owner_client.put(f"/api/registered-orders/{response.data['uuid']}/", payload, format="json"),
+            warmup=lambda: self.owner_client.get("/api/me/"),
+        )
+        self.assertEqual(sum('FROM "customs_hscode"' in sql for sql in queries), 1, queries)
+
+    def test_update_recalculates_totals(self):
+        response = self.owner_client.post(
+            "/api/registered-orders/", order_payload("totals", self.codes, 2), format="json",
+        )
+        url = f"/api/registered-orders/{response.data['uuid']}/"
+        response = self.owner_client.put(url, order_payload("totals", self.codes, 3), format="json")
+        self.assertEqual(response.status_code, 200)
+        order = RegisteredOrder.objects.get(uuid=response.data["uuid"])
+        self.assertEqual(order.goods.count(), 3)
+        self.assertEqual(str(order.total_value), "90.00")
+        self.assertEqual(str(order.sub_total), "190.00")
+
+    def test_jalali_and_gregorian_dates(self):
+        payload = order_payload("dates", self.codes, 1)
+        payload.update(date="۱۴۰۴/۱۰/۱۱", expire_date="2027-01-05")
+        response = self.owner_client.post("/api/registered-orders/", payload, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data["date"], response.data["expire_date"]), ("2026/01/01", "2027/01/05"))
+        order = RegisteredOrder.objects.get(uuid=response.data["uuid"])
+        self.assertEqual(order.date, date(2026, 1, 1))
+
+        url = f"/api/registered-orders/{order.uuid}/"
+        for bad in ({"date": "1404/12/30"}, {"expire_date": "not a date"}, {"expire_date": "2025/12/31"}):
+            response = self.owner_client.patch(url, bad, format="json")
+            self.assertEqual(response.status_code, 400, bad)
+
+    def test_duplicate_order_number_is_rejected(self):
+        first = self.owner_client.post("/api/registered-orders/", order_payload("dup", self.codes, 1), format="json")
+        self.assertEqual(first.status_code, 201)
+        second = self.owner_client.post("/api/registered-orders/", order_payload("dup", self.codes, 1), format="json")
+        self.assertEqual(second.status_code, 400)
+        self.assertIn("order_number", second.data)
+
+        other = self.owner_client.post("/api/registered-orders/", order_payload("other", self.codes, 1), format="json")
+        response = self.owner_client.patch(
+            f"/api/registered-orders/{other.data['uuid']}/", {"order_number": "dup"}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("order_number", response.data)
+        # another user may reuse the number
+        response = self.admin_client.post("/api/registered-orders/", order_payload("dup", self.codes, 1), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(RegisteredOrder.objects.filter(order_number="dup").count(), 2)
+
+    def test_unknown_hs_code_is_rejected(self):
+        payload = order_payload("bad-code", self.codes, 2)
+        payload["goods"][1]["hs_code_id"] = 10**9
+        response = self.owner_client.post("/api/registered-orders/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("goods", response.data)
+
+
+class MarketplaceQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.codes = seed_catalogue(200)
+
+    def setUp(self):
+        self.seller = self.make_user("seller")
+        self.anon = self.client_for()
+
+    def test_public_list_filters_keep_goods_prefetched(self):
+        orders = seed_orders(self.seller, 20, self.codes)
+        urls = (
+            "/api/marketplace/orders/?q=seller",
+            f"/api/marketplace/orders/?hs_code={self.codes[0].code}",
+            "/api/marketplace/orders/?total_value_min=1&total_value_max=100000&seller_country=a",
+        )
+        for url in urls:
+            # filters that join goods must not drop the goods prefetch
+            queries, response = self.capture(lambda: self.anon.get(url))
+            self.assertEqual(len(queries), 2, (url, queries))
+        # an uncached detail with 20 goods: the order, then its goods
+        queries, _ = self.capture(
+            lambda: self.anon.get(f"/api/marketplace/orders/{orders[-1].uuid}/"),
+            warmup=lambda: self.anon.get("/api/marketplace/orders/"),  # leave the detail uncached
+        )
+        self.assertEqual(len(queries), 2, queries)
+
+    def test_public_detail_cache_is_dropped_on_writes(self):
+        order = seed_orders(self.seller, 1, self.codes)[0]
+        url = f"/api/marketplace/orders/{order.uuid}/"
+        owner = self.client_for(self.seller)
+        admin = self.client_for(self.make_user("admin", role="admin"))
+        queries, response = self.measure(lambda: self.anon.get(url))
+        self.assertEqual(queries, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            owner.patch(f"/api/registered-orders/{order.uuid}/", {"freight_price": "7.00"}, format="json")
+        self.assertEqual(self.anon.get(url).data["freight_price"], "7.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.patch(f"/api/registered-orders/{order.uuid}/verify/", {"verified": False}, format="json")
+        self.assertEqual(self.anon.get(url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.patch(f"/api/registered-orders/{order.uuid}/verify/", {"verified": True}, format="json")
+        self.assertEqual(self.anon.get(url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            owner.delete(f"/api/registered-orders/{order.uuid}/")
+        self.assertEqual(self.anon.get(url).status_code, 404)
+
+    def test_unverified_orders_are_hidden(self):
+        order = seed_orders(self.seller, 1, self.codes, verified=False)[0]
+        self.assertEqual(self.anon.get("/api/marketplace/orders/").data, [])
+        self.assertEqual(self.anon.get(f"/api/marketplace/orders/{order.uuid}/").status_code, 404)
 
-# Create your tests here.
+    def test_expired_orders_are_hidden_by_default(self):
+        current, expired = seed_orders(self.seller, 2, self.codes)
+        RegisteredOrder.objects.filter(pk=expired.pk).update(expire_date=timezone.localdate() - timedelta(days=1))
+        listed = lambda url: [o["uuid"] for o in self.anon.get(url).data]
+        self.assertEqual(listed("/api/marketplace/orders/"), [str(current.uuid)])
+        self.assertEqual(len(listed("/api/marketplace/orders/?include_expired=true")), 2)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     RegisteredOrderListCreateAPIView,
@@ -14,3 +15,11 @@ urlpatterns = [
     path("marketplace/orders/", MarketplaceRegisteredOrderListAPIView.as_view()),
     path("marketplace/orders/<uuid:uuid>/", MarketplaceRegisteredOrderDetailAPIView.as_view()),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import AsyncMarketplaceRegisteredOrderDetailAPIView, AsyncMarketplaceRegisteredOrderListAPIView
+
+    urlpatterns[-2:] = [
+        path("marketplace/orders/", AsyncMarketplaceRegisteredOrderListAPIView.as_view()),
+        path("marketplace/orders/<uuid:uuid>/", AsyncMarketplaceRegisteredOrderDetailAPIView.as_view()),
+    ]
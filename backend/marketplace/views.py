@@ -2,42 +2,51 @@
 from rest_framework.views import APIView
 from rest_framework import generics, permissions, status
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .filters import RegisteredOrderMarketplaceFilter
+from accounts.premissions import is_admin_user  # claims-based, no user row fetch
+from core.metrics import record_verification
+
+from . import order_cache
 
 from .models import RegisteredOrder, OrderGood
 from .serializers import RegisteredOrderCreateUpdateSerializer, RegisteredOrderReadSerializer, PublicRegisteredOrderSerializer
 
 
-def is_admin_user(user):
-    return bool(
-        user
-        and user.is_authenticated
-        and (
-            getattr(user, "role", "") == "admin"
-            or getattr(user, "is_staff", False)
-            or getattr(user, "is_superuser", False)
-        )
-    )
-
-
+def goods_prefetch():
+    return Prefetch("goods", queryset=OrderGood.objects.select_related("hs_code"))
+
+
+def read_queryset():
+    # everything RegisteredOrderReadSerializer touches, in a constant number of queries
+    return RegisteredOrder.objects.select_related("user").prefetch_related(goods_prefetch())
+
+
+def read_data(order):
+    """Serialize a single (possibly just written) order without per-good queries."""
+    if hasattr(order, "_prefetched_objects_cache"):
+        order._prefetched_objects_cache.pop("goods", None)
+    prefetch_related_objects([order], goods_prefetch())
+    return RegisteredOrderReadSerializer(order).data
+
+
 class RegisteredOrderListCreateAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         if is_admin_user(request.user):
-            qs = RegisteredOrder.objects.select_related("user").order_by("-created_at")
+            qs = read_queryset().order_by("-created_at")
         else:
-            qs = RegisteredOrder.objects.filter(user=request.user).select_related("user").order_by("-created_at")
+            qs = read_queryset().filter(user=request.user).order_by("-created_at")
         return Response(RegisteredOrderReadSerializer(qs, many=True).data)
 
     def post(self, request):
         ser = RegisteredOrderCreateUpdateSerializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
         order = ser.save()
-        return Response(RegisteredOrderReadSerializer(order).data, status=status.HTTP_201_CREATED)
+        return Response(read_data(order), status=status.HTTP_201_CREATED)
 
 
 class RegisteredOrderDetailAPIView(APIView):
@@ -47,8 +56,8 @@ class RegisteredOrderDetailAPIView(APIView):
 
     def get_object(self, request, uuid):
         if is_admin_user(request.user):
-            return get_object_or_404(RegisteredOrder, uuid=uuid)
-        return get_object_or_404(RegisteredOrder, uuid=uuid, user=request.user)
+            return get_object_or_404(read_queryset(), uuid=uuid)
+        return get_object_or_404(read_queryset(), uuid=uuid, user=request.user)
 
     def get(self, request, uuid):
         order = self.get_object(request, uuid)
@@ -59,14 +68,14 @@ class RegisteredOrderDetailAPIView(APIView):
         ser = RegisteredOrderCreateUpdateSerializer(order, data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
         order = ser.save()
-        return Response(RegisteredOrderReadSerializer(order).data)
+        return Response(read_data(order))
 
     def patch(self, request, uuid):
         order = self.get_object(request, uuid)
         ser = RegisteredOrderCreateUpdateSerializer(order, data=request.data, partial=True, context={"request": request})
         ser.is_valid(raise_exception=True)
         order = ser.save()
-        return Response(RegisteredOrderReadSerializer(order).data)
+        return Response(read_data(order))
 
     def delete(self, request, uuid):
         order = self.get_object(request, uuid)
@@ -84,7 +93,7 @@ class RegisteredOrderVerifyAPIView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        order = get_object_or_404(RegisteredOrder, uuid=uuid)
+        order = get_object_or_404(read_queryset(), uuid=uuid)
         raw = request.data.get("verified", None)
 
         if not isinstance(raw, bool):
@@ -95,6 +104,7 @@ class RegisteredOrderVerifyAPIView(APIView):
 
         order.verified = raw
         order.save(update_fields=["verified"])
+        record_verification(raw)
         return Response(RegisteredOrderReadSerializer(order).data, status=status.HTTP_200_OK)
 
 
@@ -122,11 +132,19 @@ class MarketplaceRegisteredOrderListAPIView(generics.ListAPIView):
 
 
 class MarketplaceRegisteredOrderDetailAPIView(generics.RetrieveAPIView):
+    """Served from order_cache when possible; writes to the order drop the entry (marketplace.signals)."""
     permission_classes = [permissions.AllowAny]
     serializer_class = PublicRegisteredOrderSerializer
     lookup_field = "uuid"
     lookup_url_kwarg = "uuid"
 
+    def retrieve(self, request, uuid, *args, **kwargs):
+        data = order_cache.get(uuid)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            order_cache.remember(uuid, data)
+        return Response(data)
+
     def get_queryset(self):
         return (
             RegisteredOrder.objects
@@ -15,6 +15,7 @@ import {
   Info,
   CheckCircle2,
   AlertTriangle,
+  Download,
 } from "lucide-react";
 
 import { authFetch, clearTokens, getMe } from "@/lib/auth-api";
@@ -52,11 +53,15 @@ type ImportResponse = {
   updated: number;
   skipped: number;
   errors: number;
+  error_counts?: Record<string, number>;
   row_errors?: Array<{
     row: number;
     code?: string;
+    error_type?: string;
     error: any;
   }>;
+  // full CSV of every failed row with its original cells (admin-only download)
+  error_report?: string | null;
 };
 
 const endpoints: Record<FormData["target"], string> = {
@@ -145,16 +150,33 @@ export default function ImportHsPage() {
         return;
       }
 
-      const fd = new FormData();
-      fd.append("file", values.file);
-      fd.append("dry_run", values.dry_run ? "true" : "false");
-
-      const res = await authFetch(`${API}${endpoints[values.target]}`, {
-        method: "POST",
-        body: fd,
-        // IMPORTANT: do NOT set Content-Type manually for FormData
-        headers: {},
-      });
+      // Only one import writes at a time: while another runs the API answers
+      // 423 with a ticket; resending with it keeps our place in the queue.
+      let ticket: string | null = null;
+      let res: Response;
+      while (true) {
+        const fd = new FormData();
+        fd.append("file", values.file);
+        fd.append("dry_run", values.dry_run ? "true" : "false");
+        if (ticket) fd.append("ticket", ticket);
+
+        res = await authFetch(`${API}${endpoints[values.target]}`, {
+          method: "POST",
+          body: fd,
+          // IMPORTANT: do NOT set Content-Type manually for FormData
+          headers: {},
+        });
+        if (res.status !== 423) break;
+
+        const queued = await res.json().catch(() => ({}));
+        ticket = queued.ticket != null ? String(queued.ticket) : null;
+        setMessage(
+          `ایمپورت دیگری در حال اجراست. جایگاه شما در صف: ${queued.queue_position ?? "?"}`,
+        );
+        const retryAfter = Number(res.headers.get("Retry-After")) || 5;
+        await new Promise((r) => setTimeout(r, retryAfter * 1000));
+      }
+      setMessage(null);
 
       // Handle auth/permission centrally
       if (res.status === 401) {
@@ -191,6 +213,22 @@ export default function ImportHsPage() {
     }
   }
 
+  async function downloadErrorReport(url: string) {
+    try {
+      const res = await authFetch(url, { headers: {} });
+      if (!res.ok) throw new Error("گزارش خطا پیدا نشد یا منقضی شده است.");
+
+      const href = URL.createObjectURL(await res.blob());
+      const a = document.createElement("a");
+      a.href = href;
+      a.download = "import-errors.csv";
+      a.click();
+      URL.revokeObjectURL(href);
+    } catch (e: any) {
+      setError(e?.message ?? "خطا در دانلود گزارش");
+    }
+  }
+
   const target = form.watch("target");
   const dryRun = form.watch("dry_run");
   const file = form.watch("file") as File | undefined;
@@ -338,6 +376,31 @@ export default function ImportHsPage() {
                             <AlertTriangle className="h-4 w-4" />
                             خطاهای ردیفی (تا ۲۰۰ مورد)
                           </div>
+                          {result.error_counts && (
+                            <div className="mb-2 flex flex-wrap gap-2">
+                              {Object.entries(result.error_counts).map(
+                                ([kind, count]) => (
+                                  <Badge key={kind} variant="outline">
+                                    {kind}: {count}
+                                  </Badge>
+                                ),
+                              )}
+                            </div>
+                          )}
+                          {result.error_report && (
+                            <Button
+                              type="button"
+                              variant="outline"
+                              size="sm"
+                              className="mb-2 rounded-xl"
+                              onClick={() =>
+                                downloadErrorReport(result.error_report!)
+                              }
+                            >
+                              <Download className="ml-2 h-4 w-4" />
+                              دانلود گزارش کامل خطاها (CSV)
+                            </Button>
+                          )}
                           <div className="max-h-56 overflow-auto text-xs leading-5">
                             <ul className="list-disc space-y-1 pr-5">
                               {result.row_errors.slice(0, 20).map((re, i) => (